@@ -0,0 +1,128 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Simulate a traffic spike against an agent with a concurrency and rate quota and
+compare sending every prompt directly with the admission controller.
+
+    python benchmarks/admission_control.py --users 40 --turns 5 --quota-concurrency 8 --quota-rate 20
+
+The agent is the offline fake from fake_agent.py. It throws ThrottlingException
+like Bedrock when a call exceeds the quota, so no AWS access is needed.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "frontend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AGENT_ID", "FAKEAGENT")
+os.environ.setdefault("AGENT_ALIAS_ID", "FAKEALIAS")
+
+from botocore.exceptions import ClientError  # noqa: E402
+
+import chatbot  # noqa: E402
+from admission import AdmissionController  # noqa: E402
+from fake_agent import FakeAgentClient, StreamProfile  # noqa: E402
+from trace_analyzer import percentile  # noqa: E402
+
+chatbot.logger.disabled = True
+
+
+class QuotaAgentClient(FakeAgentClient):
+    """Fake agent that throttles calls beyond ``concurrency`` in flight or ``rate`` per second."""
+
+    def __init__(self, profile: StreamProfile, concurrency: int, rate: float):
+        super().__init__(profile)
+        self.concurrency = concurrency
+        self.rate = rate
+        self.in_flight = 0
+        self.tokens = rate
+        self.refilled_at = time.monotonic()
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _admit(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+            if self.in_flight >= self.concurrency or self.tokens < 1:
+                self.throttled += 1
+                raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "InvokeAgent")
+            self.tokens -= 1
+            self.in_flight += 1
+
+    def _release(self, events):
+        try:
+            yield from events
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def invoke_agent(self, **kwargs):
+        self._admit()
+        response = super().invoke_agent(**kwargs)
+        response["completion"] = self._release(response["completion"])
+        return response
+
+
+def run(mode: str, args) -> None:
+    profile = StreamProfile(parts=4, first_event_delay=args.latency, chunk_delay=0.001)
+    client = QuotaAgentClient(profile, args.quota_concurrency, args.quota_rate)
+    chatbot.client = client
+    if mode == "direct":
+        # Unlimited admission and no retries is the previous behavior
+        chatbot.admission = AdmissionController(rate=1e9, burst=1e9, limit=1e9, max_limit=1e9,
+                                                max_queue=10**6, max_retries=0)
+    else:
+        chatbot.admission = AdmissionController(rate=args.quota_rate, burst=args.quota_rate,
+                                                limit=args.quota_concurrency * 2, max_limit=64,
+                                                max_queue=args.users * 2, max_wait=120)
+
+    latencies, errors, busy = [], [], []
+
+    def user(index: int) -> None:
+        for turn in range(args.turns):
+            started = time.perf_counter()
+            response, trace = chatbot.ask_question("Which wipers fit?", f"user-{index}")
+            latencies.append(time.perf_counter() - started)
+            if response == chatbot.BUSY_MESSAGE:
+                busy.append(index)
+            elif not trace:
+                errors.append(response)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.users) as executor:
+        list(executor.map(user, range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    completed = len(latencies) - len(errors) - len(busy)
+    metrics = chatbot.admission.metrics()
+    print(f"{mode:>9} {completed / elapsed:>8.1f} {len(errors):>7} {len(busy):>5} {client.throttled:>9} "
+          f"{percentile(latencies, 50) * 1000:>8.0f} {percentile(latencies, 95) * 1000:>8.0f} "
+          f"{metrics['max_queue_depth']:>9} {metrics['concurrency_limit']:>6.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the agent's first event")
+    parser.add_argument("--quota-concurrency", type=int, default=8)
+    parser.add_argument("--quota-rate", type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.users} users x {args.turns} turns, quota {args.quota_concurrency} concurrent / {args.quota_rate:g} per second")
+    print(f"{'mode':>9} {'turns/s':>8} {'errors':>7} {'busy':>5} {'throttled':>9} {'p50 ms':>8} {'p95 ms':>8} {'max queue':>9} {'limit':>6}")
+    for mode in ("direct", "admission"):
+        run(mode, args)
@@ -0,0 +1,137 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Compare load time, lookup latency and RSS of the JSON preload files against the
+memory-mapped binary catalog.
+
+    python benchmarks/catalog_load.py --scale 1 10 100
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUP_DIR = os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch")
+sys.path.insert(0, os.path.join(ROOT_DIR, "infra"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "backend"))
+
+LOOKUPS = 1000
+
+
+def current_rss_kib() -> int:
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        # ru_maxrss is KiB on Linux and bytes on macOS; only used where /proc is missing
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def scaled_catalog(scale: int):
+    with open(os.path.join(SETUP_DIR, "inventory-index", "preload.json"), 'r') as f:
+        inventory = json.load(f)
+    with open(os.path.join(SETUP_DIR, "compatible-parts-index", "preload.json"), 'r') as f:
+        compatible_parts = json.load(f)
+
+    scaled_inventory, scaled_compatible_parts = [], []
+    for copy in range(scale):
+        suffix = f"-S{copy:05d}" if copy else ""
+        for data in inventory:
+            scaled_inventory.append(dict(data, part_number=data['part_number'] + suffix))
+        for data in compatible_parts:
+            scaled_compatible_parts.append(dict(
+                data,
+                model=data['model'] + suffix,
+                parts=[dict(part, part_number=part['part_number'] + suffix) for part in data['parts']],
+            ))
+    return scaled_inventory, scaled_compatible_parts
+
+
+def measure(mode: str, inventory_file: str, compatible_parts_file: str, catalog_file: str, sample_file: str) -> dict:
+    with open(sample_file, 'r') as f:
+        sample = json.load(f)
+    baseline = current_rss_kib()
+    started = time.perf_counter()
+
+    if mode == "json":
+        with open(inventory_file, 'r') as f:
+            inventory = json.load(f)
+        with open(compatible_parts_file, 'r') as f:
+            json.load(f)
+        by_part_number = {}
+        for data in inventory:
+            by_part_number.setdefault(data['part_number'], []).append(data)
+        lookup = lambda part_number: by_part_number.get(part_number, [])
+    else:
+        from catalog import Catalog
+        catalog = Catalog(catalog_file)
+        lookup = catalog.get
+
+    loaded = time.perf_counter()
+    for part_number in sample:
+        assert lookup(part_number)
+    finished = time.perf_counter()
+
+    return {
+        "load_ms": (loaded - started) * 1000,
+        "lookup_us": (finished - loaded) / len(sample) * 1e6,
+        "rss_kib": current_rss_kib() - baseline,
+    }
+
+
+def run(scale: int, work_dir: str) -> None:
+    from pipeline.catalog import compile_catalog
+
+    inventory, compatible_parts = scaled_catalog(scale)
+    inventory_file = os.path.join(work_dir, "inventory.json")
+    compatible_parts_file = os.path.join(work_dir, "compatible-parts.json")
+    catalog_file = os.path.join(work_dir, "catalog.bin")
+    sample_file = os.path.join(work_dir, "sample.json")
+
+    # Pretty-printed like the shipped preload files
+    with open(inventory_file, 'w') as f:
+        json.dump(inventory, f, indent=4)
+    with open(compatible_parts_file, 'w') as f:
+        json.dump(compatible_parts, f, indent=2)
+    compile_catalog(inventory, compatible_parts, catalog_file)
+    with open(sample_file, 'w') as f:
+        json.dump([random.choice(inventory)['part_number'] for _ in range(LOOKUPS)], f)
+
+    json_bytes = os.path.getsize(inventory_file) + os.path.getsize(compatible_parts_file)
+    binary_bytes = os.path.getsize(catalog_file)
+
+    for mode, size in (("json", json_bytes), ("binary", binary_bytes)):
+        # A fresh interpreter per measurement keeps RSS and page cache effects separate
+        output = subprocess.check_output([
+            sys.executable, __file__, "--measure", mode,
+            inventory_file, compatible_parts_file, catalog_file, sample_file,
+        ])
+        result = json.loads(output)
+        print(f"{len(inventory):>10} {mode:>7} {size / 1024:>10.1f} {result['load_ms']:>10.2f} "
+              f"{result['lookup_us']:>10.2f} {result['rss_kib']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--measure", nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        sys.exit(0)
+
+    random.seed(0)
+    print(f"{'records':>10} {'format':>7} {'size KiB':>10} {'load ms':>10} {'lookup us':>10} {'RSS KiB':>10}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in args.scale:
+            run(scale, work_dir)
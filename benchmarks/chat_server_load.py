@@ -0,0 +1,102 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Load test for the headless chat API server (src/frontend/server.py).
+
+Steps through increasing numbers of concurrent sessions, each sending a few turns
+back to back, and reports time to first chunk, turn latency and errors per step.
+The highest step that stays within the time-to-first-chunk SLO without errors is
+reported as concurrent sessions per vCPU of the server.
+
+    python src/frontend/server.py &
+    python benchmarks/chat_server_load.py --url http://localhost:8080 --vcpus 0.25
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+import aiohttp
+
+
+def p95(samples):
+    ordered = sorted(samples)
+    return ordered[max(int(len(ordered) * 0.95) - 1, 0)] if ordered else 0.0
+
+
+async def run_turn(http: aiohttp.ClientSession, url: str, session_id: str, prompt: str):
+    started = time.perf_counter()
+    first_chunk = None
+    error = None
+    async with http.post(f"{url}/sessions/{session_id}/messages", json={"prompt": prompt}) as response:
+        if response.status != 200:
+            return None, None, f"HTTP {response.status}"
+        event = None
+        async for raw_line in response.content:
+            line = raw_line.decode('utf-8').rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "chunk" and first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                elif event == "error":
+                    error = json.loads(line[len("data: "):]).get("error")
+    return first_chunk, time.perf_counter() - started, error
+
+
+async def run_session(http: aiohttp.ClientSession, url: str, turns: int, prompt: str, results: dict):
+    async with http.post(f"{url}/sessions") as response:
+        session_id = (await response.json())["session_id"]
+    for _ in range(turns):
+        try:
+            first_chunk, total, error = await run_turn(http, url, session_id, prompt)
+        except aiohttp.ClientError as e:
+            first_chunk, total, error = None, None, str(e)
+        if error or first_chunk is None:
+            results["errors"] += 1
+        else:
+            results["first_chunk"].append(first_chunk * 1000)
+            results["total"].append(total * 1000)
+
+
+async def run_step(url: str, sessions: int, turns: int, prompt: str) -> dict:
+    results = {"first_chunk": [], "total": [], "errors": 0}
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None, sock_read=300)
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        await asyncio.gather(*(run_session(http, url, turns, prompt, results) for _ in range(sessions)))
+    results["seconds"] = time.perf_counter() - started
+    return results
+
+
+async def main(args) -> None:
+    print(f"{'sessions':>9} {'turns/s':>9} {'ttfc p50':>9} {'ttfc p95':>9} {'turn p95':>9} {'errors':>7}")
+    sustained = 0
+    for sessions in args.sessions:
+        results = await run_step(args.url, sessions, args.turns, args.prompt)
+        completed = len(results["total"])
+        ttfc_p95 = p95(results["first_chunk"])
+        print(f"{sessions:>9} {completed / results['seconds']:>9.1f} "
+              f"{statistics.median(results['first_chunk']) if completed else 0:>9.0f} {ttfc_p95:>9.0f} "
+              f"{p95(results['total']):>9.0f} {results['errors']:>7}")
+        if results["errors"] == 0 and ttfc_p95 <= args.slo_ms:
+            sustained = sessions
+    print(f"\nSustained {sustained} concurrent sessions within a {args.slo_ms} ms p95 time to first chunk: "
+          f"{sustained / args.vcpus:.1f} sessions per vCPU ({args.vcpus} vCPU)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 100, 200, 400])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--prompt", default="What wiper blades fit a 2021 Honda CR-V?")
+    parser.add_argument("--slo-ms", type=float, default=5000)
+    parser.add_argument("--vcpus", type=float, default=float(os.cpu_count() or 1),
+                        help="vCPUs available to the server, e.g. 0.25 for a 256 CPU unit Fargate task")
+    asyncio.run(main(parser.parse_args()))
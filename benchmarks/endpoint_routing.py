@@ -0,0 +1,118 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Simulate three OpenSearch endpoints with injected latency and compare pinning
+every search to the primary with latency-aware routing.
+
+    python benchmarks/endpoint_routing.py --requests 3000
+
+The primary is the fastest endpoint until the middle third of the run. Then it
+degrades with slow responses and errors. It goes fully down for a while and
+recovers for the last third. No network access is needed.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "backend"))
+
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError  # noqa: E402
+
+from routing import EndpointRouter, RoutedClient  # noqa: E402
+
+PHASES = ("healthy", "degraded", "down", "recovered")
+
+
+class SimulatedEndpoint:
+    """Stand-in OpenSearch client whose latency and errors depend on the current phase."""
+
+    def __init__(self, name: str, base_ms: float, jitter_ms: float, degradation=None):
+        self.name = name
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.degradation = degradation or {}
+        self.phase = "healthy"
+
+    def search(self, **kwargs):
+        slow_rate, slow_ms, error_rate = self.degradation.get(self.phase, (0.0, 0.0, 0.0))
+        if random.random() < error_rate:
+            time.sleep(self.base_ms / 1000)
+            raise OpenSearchConnectionError("N/A", f"{self.name} unavailable", None)
+        latency = self.base_ms + random.expovariate(1 / self.jitter_ms)
+        if random.random() < slow_rate:
+            latency += slow_ms
+        time.sleep(latency / 1000)
+        return {"hits": {"total": {"value": 0}, "hits": []}, "_endpoint": self.name}
+
+    mget = search
+
+
+def run(mode: str, args) -> None:
+    random.seed(1)
+    endpoints = {
+        "us-east-1": SimulatedEndpoint("us-east-1", 8, 4, {
+            "degraded": (0.3, 250, 0.1),
+            "down": (0.0, 0.0, 1.0),
+        }),
+        "us-west-2": SimulatedEndpoint("us-west-2", 20, 5),
+        "eu-west-1": SimulatedEndpoint("eu-west-1", 45, 8),
+    }
+    router = None
+    if mode == "direct":
+        client = endpoints["us-east-1"]
+    else:
+        router = EndpointRouter(endpoints, probe=lambda endpoint: endpoint.search(), probe_interval=args.probe_interval)
+        client = RoutedClient(router)
+
+    latencies, errors, served = [], [], {}
+    lock = threading.Lock()
+    counter = iter(range(args.requests))
+
+    def worker() -> None:
+        for index in counter:
+            # Each phase covers a quarter of the run
+            phase = PHASES[min(index * len(PHASES) // args.requests, len(PHASES) - 1)]
+            endpoints["us-east-1"].phase = phase
+            started = time.perf_counter()
+            try:
+                result = client.search(index="inventory", body={"query": {"match_all": {}}})
+                name = result["_endpoint"]
+            except Exception:
+                name = None
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if name is None:
+                    errors.append(index)
+                else:
+                    served[name] = served.get(name, 0) + 1
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for _ in range(args.concurrency):
+            executor.submit(worker)
+    if router:
+        router.close()
+
+    latencies.sort()
+    quantile = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+    print(f"{mode:>8} {quantile(0.5):>8.1f} {quantile(0.95):>8.1f} {quantile(0.99):>8.1f} {len(errors):>7}   "
+          + ", ".join(f"{name} {count}" for name, count in sorted(served.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}   requests served")
+    for mode in ("direct", "routed"):
+        run(mode, args)
@@ -0,0 +1,181 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Local stand-in for the bedrock-agent-runtime client.
+
+``FakeAgentClient.invoke_agent`` accepts the same arguments as the boto3 call and
+returns a response whose ``completion`` stream yields the same ``chunk`` and
+``trace`` events, either synthesized with configurable sizes or replayed from a
+JSON lines recording. Delays between events are simulated with ``time.sleep`` so
+the frontend code sees the same pacing as a real stream.
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INVENTORY_FILE = os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch", "inventory-index", "preload.json")
+
+
+@dataclass
+class StreamProfile:
+    """Shape and timing of a synthetic agent turn."""
+    parts: int = 8
+    orchestration_steps: int = 2
+    chunk_size: int = 64
+    answer_words: int = 60
+    first_event_delay: float = 0.0
+    step_delay: float = 0.0
+    chunk_delay: float = 0.0
+    input_tokens: int = 1500
+    output_tokens: int = 200
+
+
+def _trace(session_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"trace": {"agentId": "FAKEAGENT", "agentAliasId": "FAKEALIAS", "sessionId": session_id, "trace": body}}
+
+
+def _model_output(trace_id: str, profile: StreamProfile) -> Dict[str, Any]:
+    return {"modelInvocationOutput": {"traceId": trace_id, "metadata": {
+        "usage": {"inputTokens": profile.input_tokens, "outputTokens": profile.output_tokens}}}}
+
+
+def synthetic_events(session_id: str, question: str, profile: StreamProfile,
+                     inventory: Optional[List[Dict]] = None) -> List[Dict[str, Any]]:
+    """
+    Build the completion events of one turn: a preprocessing trace, orchestration
+    steps with action group calls, the final answer trace and the answer chunks
+    with a <structured_data> block of ``profile.parts`` inventory hits.
+    """
+    if inventory is None:
+        with open(INVENTORY_FILE, 'r') as f:
+            inventory = json.load(f)
+    hits = [{"_index": "inventory", "_id": part['part_number'], "_source": part}
+            for part in (inventory[i % len(inventory)] for i in range(profile.parts))]
+
+    events = [_trace(session_id, {"preProcessingTrace": {
+        "modelInvocationInput": {"traceId": "pre-0", "text": question},
+        "modelInvocationOutput": {"traceId": "pre-0", "parsedResponse": {"isValid": True, "rationale": "Valid question"}},
+    }})]
+
+    for step in range(profile.orchestration_steps):
+        trace_id = f"orch-{step}"
+        events.append(_trace(session_id, {"orchestrationTrace": {"modelInvocationInput": {"traceId": trace_id, "text": question}}}))
+        events.append(_trace(session_id, {"orchestrationTrace": _model_output(trace_id, profile)}))
+        events.append(_trace(session_id, {"orchestrationTrace": {"rationale": {"traceId": trace_id, "text": "Look up the parts."}}}))
+        events.append(_trace(session_id, {"orchestrationTrace": {"invocationInput": {
+            "traceId": trace_id, "invocationType": "ACTION_GROUP",
+            "actionGroupInvocationInput": {"actionGroupName": "CarPartsApi", "verb": "post", "apiPath": "/get_part_from_inventory"},
+        }}}))
+        events.append(_trace(session_id, {"orchestrationTrace": {"observation": {
+            "traceId": trace_id, "type": "ACTION_GROUP",
+            "actionGroupInvocationOutput": {"text": json.dumps({"results": hits})},
+        }}}))
+
+    final_id = f"orch-{profile.orchestration_steps}"
+    answer = " ".join(random.choice(["These", "parts", "fit", "your", "vehicle", "and", "are", "in", "stock."])
+                      for _ in range(profile.answer_words))
+    answer += "\n\n<structured_data>\n" + json.dumps(hits) + "\n</structured_data>"
+    events.append(_trace(session_id, {"orchestrationTrace": _model_output(final_id, profile)}))
+    events.append(_trace(session_id, {"orchestrationTrace": {"observation": {
+        "traceId": final_id, "type": "FINISH", "finalResponse": {"text": answer}}}}))
+
+    for start in range(0, len(answer), profile.chunk_size):
+        events.append({"chunk": {"bytes": answer[start:start + profile.chunk_size].encode('utf-8')}})
+    return events
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """
+    Load a recorded completion stream. Each line is one event: ``{"chunk": "<text>"}``
+    or ``{"trace": {...}}``, with an optional ``"delayMs"`` to wait before it.
+    """
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            event = {"delayMs": record.get("delayMs", 0)}
+            if "chunk" in record:
+                event["chunk"] = {"bytes": record["chunk"].encode('utf-8')}
+            if "trace" in record:
+                event["trace"] = record["trace"]
+            events.append(event)
+    return events
+
+
+def record_completion(response: Dict[str, Any], path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Pass a real completion stream through while writing it in the replay format.
+    """
+    last = time.perf_counter()
+    with open(path, 'w') as f:
+        for event in response.get('completion', []):
+            now = time.perf_counter()
+            record = {"delayMs": round((now - last) * 1000, 1)}
+            last = now
+            if "chunk" in event:
+                record["chunk"] = event["chunk"]["bytes"].decode('utf-8')
+            if "trace" in event:
+                record["trace"] = event["trace"]
+            f.write(json.dumps(record, default=str) + "\n")
+            yield event
+
+
+class FakeAgentClient:
+    """
+    Drop-in replacement for ``boto3.client('bedrock-agent-runtime')`` in the frontend.
+
+    Args:
+        profile (StreamProfile): Shape and timing of synthetic turns.
+        events_factory (Optional[Callable]): Returns fresh events of a turn given the
+            session ID and question, e.g. ``lambda *_: load_recording(path)``. The
+            frontend mutates trace events, so events must not be shared across turns.
+    """
+
+    def __init__(self, profile: Optional[StreamProfile] = None,
+                 events_factory: Optional[Callable[[str, str], List[Dict[str, Any]]]] = None):
+        self.profile = profile or StreamProfile()
+        self.events_factory = events_factory
+        self._inventory = None
+
+    def _events(self, session_id: str, question: str) -> List[Dict[str, Any]]:
+        if self.events_factory:
+            return self.events_factory(session_id, question)
+        if self._inventory is None:
+            with open(INVENTORY_FILE, 'r') as f:
+                self._inventory = json.load(f)
+        return synthetic_events(session_id, question, self.profile, self._inventory)
+
+    def _stream(self, events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        profile = self.profile
+        if profile.first_event_delay:
+            time.sleep(profile.first_event_delay)
+        for event in events:
+            delay = event.get("delayMs", 0) / 1000
+            if not delay:
+                delay = profile.chunk_delay if "chunk" in event else profile.step_delay
+            if delay:
+                time.sleep(delay)
+            event.pop("delayMs", None)
+            yield event
+
+    def invoke_agent(self, agentId: str, agentAliasId: str, sessionId: str, inputText: str,
+                     endSession: bool = False, enableTrace: bool = False, **kwargs) -> Dict[str, Any]:
+        events = self._events(sessionId, inputText)
+        if not enableTrace:
+            events = [event for event in events if "trace" not in event]
+        return {
+            "completion": self._stream(events),
+            "contentType": "application/json",
+            "sessionId": sessionId,
+            "ResponseMetadata": {"RequestId": str(uuid.uuid4()), "HTTPStatusCode": 200},
+        }
+
@@ -0,0 +1,134 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Report compatible-parts index size and query latency for explicit year lists
+with nested parts (before) against year ranges with a shared parts table (after).
+
+The demo catalog is expanded to 30-year model runs with per-trim variants, which
+is where repeated years and parts dominate. Size is always reported from the
+documents; pass --live with OPENSEARCH_ENDPOINT and AWS_REGION set to also load
+both layouts into temporary indices and time the vehicle queries.
+
+    python benchmarks/fitment_index.py --trims 8 --first-year 1995
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import random
+import argparse
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUP_DIR = os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch")
+sys.path.insert(0, SETUP_DIR)
+
+from fitment import build_fitment_documents  # noqa: E402
+
+TRIMS = ["LX", "EX", "EX-L", "Sport", "Touring", "Limited", "SE", "XLT", "Platinum", "Base"]
+
+
+def expand_catalog(trims: int, first_year: int, last_year: int):
+    with open(os.path.join(SETUP_DIR, "compatible-parts-index", "preload.json"), 'r') as f:
+        data_array = json.load(f)
+    expanded = []
+    for data in data_array:
+        for trim in TRIMS[:trims]:
+            doc = copy.deepcopy(data)
+            doc['model'] = f"{data['model']} {trim}"
+            doc['years'] = list(range(last_year, first_year - 1, -1))
+            expanded.append(doc)
+    return expanded
+
+
+def size_report(before, after_docs, parts_table):
+    before_bytes = sum(len(json.dumps(doc)) for doc in before)
+    after_bytes = sum(len(json.dumps(doc)) for doc in after_docs) + sum(len(json.dumps(part)) for part in parts_table)
+    before_years = sum(len(doc['years']) for doc in before)
+    after_ranges = sum(len(doc['year_ranges']) for doc in after_docs)
+    nested_parts = sum(len(doc['parts']) for doc in before)
+
+    print(f"{'':<28} {'before':>12} {'after':>12}")
+    print(f"{'fitment documents':<28} {len(before):>12} {len(after_docs):>12}")
+    print(f"{'nested / table parts':<28} {nested_parts:>12} {len(parts_table):>12}")
+    print(f"{'year values / ranges':<28} {before_years:>12} {after_ranges:>12}")
+    print(f"{'source bytes':<28} {before_bytes:>12} {after_bytes:>12}")
+    print(f"{'size ratio':<28} {'1.00':>12} {after_bytes / before_bytes:>12.2f}")
+
+
+def live_report(before, after_docs, parts_table, queries: int) -> None:
+    sys.path.insert(0, os.path.join(ROOT_DIR, "src", "backend"))
+    from opensearchpy import helpers
+    from index import get_search_client, expand_fitment_hits
+
+    client = get_search_client()
+    with open(os.path.join(SETUP_DIR, "compatible-parts-index", "schema.json"), 'r') as f:
+        after_mapping = json.load(f)
+    with open(os.path.join(SETUP_DIR, "compatible-parts-index", "parts-schema.json"), 'r') as f:
+        parts_mapping = json.load(f)
+    before_mapping = copy.deepcopy(after_mapping)
+    properties = before_mapping['mappings']['properties']
+    for field in ('year_ranges', 'part_ids', 'part_names'):
+        properties.pop(field)
+    properties['years'] = {"type": "integer"}
+    properties['parts'] = {"type": "nested", "properties": {
+        "part_name": {"type": "text", "analyzer": "keyword_analyzer"},
+        "part_number": {"type": "keyword"},
+        "description": {"type": "text", "analyzer": "standard"},
+    }}
+
+    indices = {
+        "fitment-bench-before": (before_mapping, before, None),
+        "fitment-bench-after": (after_mapping, after_docs, None),
+        "fitment-bench-table": (parts_mapping, parts_table, "part_id"),
+    }
+    os.environ['COMPATIBLE_PARTS_TABLE_INDEX'] = "fitment-bench-table"
+    try:
+        for index_name, (mapping, docs, id_field) in indices.items():
+            client.indices.create(index=index_name, body=mapping)
+            helpers.bulk(client, (
+                {"_index": index_name, "_source": doc, **({"_id": doc[id_field]} if id_field else {})} for doc in docs
+            ))
+        # Serverless collections do not support refresh; wait for documents to become searchable
+        time.sleep(60)
+
+        vehicles = [(doc['make'], doc['model'], random.choice(doc['years'])) for doc in random.sample(before, queries)]
+        timings = {"before": [], "after": []}
+        for make, model, year in vehicles:
+            for label, index_name, year_clause in (
+                ("before", "fitment-bench-before", {"term": {"years": year}}),
+                ("after", "fitment-bench-after", {"term": {"year_ranges": year}}),
+            ):
+                query = {"query": {"bool": {"must": [{"match": {"make": make}}, {"match": {"model": model}}, year_clause]}}}
+                started = time.perf_counter()
+                hits = client.search(index=index_name, body=query)['hits']['hits']
+                if label == "after":
+                    expand_fitment_hits(client, hits)
+                timings[label].append((time.perf_counter() - started) * 1000)
+
+        for label, samples in timings.items():
+            samples.sort()
+            print(f"{label:<8} query p50 {statistics.median(samples):>8.1f} ms   p95 {samples[int(len(samples) * 0.95) - 1]:>8.1f} ms")
+    finally:
+        for index_name in indices:
+            client.indices.delete(index=index_name, ignore=[404])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trims", type=int, default=8)
+    parser.add_argument("--first-year", type=int, default=1995)
+    parser.add_argument("--last-year", type=int, default=2024)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    before = expand_catalog(args.trims, args.first_year, args.last_year)
+    after_docs, parts_table = build_fitment_documents(before)
+    size_report(before, after_docs, parts_table)
+    if args.live:
+        live_report(before, after_docs, parts_table, args.queries)
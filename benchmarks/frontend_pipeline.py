@@ -0,0 +1,142 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Offline benchmarks for the frontend response pipeline: process_response,
+process_trace, extract_structured_data and the card preparation done by
+render_structured_data, fed by the fake agent stream in fake_agent.py.
+
+    python benchmarks/frontend_pipeline.py
+    python benchmarks/frontend_pipeline.py --recording turn.jsonl
+
+Reports parsing throughput by response size, time to first card under a
+simulated stream pace, and memory growth per turn as a session gets longer.
+No network access or AWS credentials are needed.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import contextlib
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "frontend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# chatbot validates these at import; the client is replaced below
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AGENT_ID", "FAKEAGENT")
+os.environ.setdefault("AGENT_ALIAS_ID", "FAKEALIAS")
+# Measure the pipeline itself, not the admission controller's agent quota
+os.environ.setdefault("AGENT_RATE_LIMIT", "1e9")
+os.environ.setdefault("AGENT_BURST", "1e9")
+os.environ.setdefault("AGENT_CONCURRENCY_LIMIT", "1e9")
+
+import chatbot  # noqa: E402
+from fake_agent import FakeAgentClient, StreamProfile, synthetic_events, load_recording  # noqa: E402
+from structured_data import extract_structured_data, collect_parts, card_text  # noqa: E402
+from trace_analyzer import build_waterfall  # noqa: E402
+
+chatbot.logger.disabled = True
+
+
+def run_turn(session_id: str, prompt: str, first_card_at: List[float] = None) -> Dict:
+    """Run one turn the way web.get_agent_response and render_structured_data do."""
+    started = time.perf_counter()
+    response, trace = chatbot.get_chat_response(prompt, session_id)
+    waterfall = build_waterfall(trace)
+    markdown_response, structured_data = extract_structured_data(response)
+    parts, _ = collect_parts(structured_data) if structured_data else ([], [])
+    for index, part in enumerate(parts):
+        card_text(part)
+        if index == 0 and first_card_at is not None:
+            first_card_at.append(time.perf_counter() - started)
+    return {"role": "assistant", "content": markdown_response, "structured_data": structured_data,
+            "trace": trace, "waterfall": waterfall}
+
+
+def throughput(sizes: List[int], turns: int, recording: str = None) -> None:
+    print("Parsing throughput (no stream delays)")
+    print(f"{'parts':>7} {'events':>7} {'KiB/turn':>9} {'turns/s':>9} {'MiB/s':>8} {'us/event':>9}")
+    for parts in sizes:
+        profile = StreamProfile(parts=parts)
+        # Events are built up front so only the frontend code is timed
+        if recording:
+            prepared = [load_recording(recording) for _ in range(turns)]
+        else:
+            prepared = [synthetic_events("bench", "Which parts fit?", profile) for _ in range(turns)]
+        events = len(prepared[0])
+        size = sum(len(event["chunk"]["bytes"]) for event in prepared[0] if "chunk" in event)
+        size += sum(len(str(event["trace"])) for event in prepared[0] if "trace" in event)
+        chatbot.client = FakeAgentClient(profile, events_factory=lambda *_: prepared.pop())
+
+        started = time.perf_counter()
+        for _ in range(turns):
+            run_turn("bench", "Which parts fit?")
+        elapsed = time.perf_counter() - started
+
+        print(f"{parts:>7} {events:>7} {size / 1024:>9.1f} {turns / elapsed:>9.0f} "
+              f"{size * turns / elapsed / 2**20:>8.1f} {elapsed / (turns * events) * 1e6:>9.1f}")
+        if recording:
+            break
+
+
+def time_to_first_card(parts: int, turns: int, first_event_delay: float, step_delay: float, chunk_delay: float) -> None:
+    profile = StreamProfile(parts=parts, first_event_delay=first_event_delay, step_delay=step_delay, chunk_delay=chunk_delay)
+    chatbot.client = FakeAgentClient(profile)
+    first_card_at: List[float] = []
+    for _ in range(turns):
+        run_turn("bench", "Which parts fit?", first_card_at)
+    first_card_at.sort()
+    print(f"\nTime to first card ({parts} parts, first event {first_event_delay * 1000:.0f} ms, "
+          f"{step_delay * 1000:.0f} ms per trace, {chunk_delay * 1000:.0f} ms per chunk)")
+    print(f"  p50 {first_card_at[len(first_card_at) // 2] * 1000:.1f} ms   max {first_card_at[-1] * 1000:.1f} ms")
+
+
+def memory_growth(parts: int, turns: int) -> None:
+    chatbot.client = FakeAgentClient(StreamProfile(parts=parts))
+    messages = []
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    checkpoints = []
+    for turn in range(1, turns + 1):
+        messages.append({"role": "user", "content": "Which parts fit?"})
+        messages.append(run_turn("bench", "Which parts fit?"))
+        if turn in (1, turns // 4, turns // 2, turns):
+            checkpoints.append((turn, tracemalloc.get_traced_memory()[0] - baseline))
+    tracemalloc.stop()
+
+    print(f"\nSession memory growth ({parts} parts per turn, messages kept as in st.session_state)")
+    for turn, size in checkpoints:
+        print(f"  after {turn:>4} turns: {size / 1024:>9.1f} KiB")
+    (first_turn, first_size), (last_turn, last_size) = checkpoints[0], checkpoints[-1]
+    print(f"  growth per turn: {(last_size - first_size) / max(last_turn - first_turn, 1) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 32, 256])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--session-turns", type=int, default=100)
+    parser.add_argument("--first-event-delay", type=float, default=0.5)
+    parser.add_argument("--step-delay", type=float, default=0.01)
+    parser.add_argument("--chunk-delay", type=float, default=0.002)
+    parser.add_argument("--recording", help="JSON lines recording to replay instead of synthetic turns")
+    args = parser.parse_args()
+
+    # extract_structured_data prints the detected format on every turn, so each
+    # benchmark runs with stdout captured and only its report lines are printed
+    for function, function_args in (
+        (throughput, (args.sizes, args.turns, args.recording)),
+        (time_to_first_card, (8, 10, args.first_event_delay, args.step_delay, args.chunk_delay)),
+        (memory_growth, (8, args.session_turns)),
+    ):
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            function(*function_args)
+        print("\n".join(line for line in buffer.getvalue().splitlines()
+                        if not line.startswith(("Response uses", "JSON parsing error"))))
@@ -0,0 +1,80 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Measure the inventory change feed on synthetic price and stock changes drawn from
+the preload part numbers, with repeated keys so merging has work to do.
+
+    python benchmarks/inventory_feed.py --changes 100000
+
+Without --live only merging and bulk request serialization are timed. With
+--live the changes are applied to the deployed collection, so
+OPENSEARCH_ENDPOINT and AWS_REGION must be set.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETUP_DIR = os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch")
+sys.path.insert(0, SETUP_DIR)
+
+from feed import (  # noqa: E402
+    INVENTORY_INDEX, FEED_BULK_SIZE, updatable_fields, merge_changes, bulk_body, run_feed,
+)
+
+PRELOAD_FILE = os.path.join(SETUP_DIR, "inventory-index", "preload.json")
+
+
+def synthetic_changes(part_numbers, count):
+    changes = []
+    for _ in range(count):
+        change = {"part_number": random.choice(part_numbers)}
+        if random.random() < 0.7:
+            change["price"] = round(random.uniform(5, 500), 2)
+        else:
+            change["in_stock"] = random.random() < 0.8
+        changes.append(change)
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--changes", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=10000, help="Distinct part numbers the changes touch")
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--index", default=INVENTORY_INDEX)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with open(PRELOAD_FILE, 'r') as f:
+        part_numbers = sorted({data['part_number'] for data in json.load(f)})
+    if not args.live:
+        # Locally the key space can be larger than the demo inventory
+        part_numbers += [f"SYN-{i:06d}" for i in range(max(args.keys - len(part_numbers), 0))]
+    changes = synthetic_changes(part_numbers, args.changes)
+    fields = updatable_fields()
+
+    started = time.perf_counter()
+    updates, rejected = merge_changes(changes, fields)
+    merged = time.perf_counter()
+    items = list(updates.items())
+    size = 0
+    for start in range(0, len(items), FEED_BULK_SIZE):
+        size += sum(len(json.dumps(line)) + 1 for line in bulk_body(args.index, items[start:start + FEED_BULK_SIZE]))
+    serialized = time.perf_counter()
+
+    print(f"{len(changes)} changes -> {len(updates)} updates ({rejected} rejected)")
+    print(f"merge:      {(merged - started) * 1000:8.1f} ms  {len(changes) / (merged - started):>12,.0f} changes/s")
+    print(f"serialize:  {(serialized - merged) * 1000:8.1f} ms  {size / 2**20:8.2f} MiB of bulk requests "
+          f"({size / max(len(updates), 1):.0f} bytes per update)")
+
+    if args.live:
+        from index import create_opensearch_client
+        client = create_opensearch_client(os.environ['OPENSEARCH_ENDPOINT'], os.environ['AWS_REGION'])
+        totals = run_feed(client, iter(changes), args.index, fields, sinks=(), batch_size=len(changes))
+        print(json.dumps(totals))
@@ -0,0 +1,69 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Compare the keyed, chunked _mget inventory lookup against the previous single
+`terms` search for 1, 10, 100 and 1,000 part IDs. Runs against the deployed
+collection, so OPENSEARCH_ENDPOINT and AWS_REGION must be set.
+
+    OPENSEARCH_ENDPOINT=<id>.<region>.aoss.amazonaws.com AWS_REGION=<region> \\
+        python benchmarks/inventory_lookup.py
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "backend"))
+
+from index import get_search_client, get_documents_by_id  # noqa: E402
+
+PRELOAD_FILE = os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch", "inventory-index", "preload.json")
+
+
+def terms_lookup(client, index_name, part_ids):
+    search_query = {"size": len(part_ids), "query": {"terms": {"part_number": part_ids}}}
+    return client.search(index=index_name, body=search_query)['hits']['hits']
+
+
+def sample_ids(known_ids, count):
+    # The demo inventory is small, so large requests are padded with unknown IDs
+    ids = random.sample(known_ids, min(count, len(known_ids)))
+    ids += [f"UNKNOWN-{i:05d}" for i in range(count - len(ids))]
+    random.shuffle(ids)
+    return ids
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(int(len(samples) * 0.95) - 1, 0)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--index", default=os.environ.get('INVENTORY_INDEX', "inventory"))
+    args = parser.parse_args()
+
+    with open(PRELOAD_FILE, 'r') as f:
+        known_ids = sorted({data['part_number'] for data in json.load(f)})
+
+    random.seed(0)
+    client = get_search_client()
+    print(f"{'ids':>6} {'terms p50':>10} {'terms p95':>10} {'mget p50':>10} {'mget p95':>10}")
+    for size in args.sizes:
+        part_ids = sample_ids(known_ids, size)
+        terms_p50, terms_p95 = timed(lambda: terms_lookup(client, args.index, part_ids), args.repeat)
+        mget_p50, mget_p95 = timed(lambda: get_documents_by_id(client, args.index, part_ids), args.repeat)
+        print(f"{size:>6} {terms_p50:>10.1f} {terms_p95:>10.1f} {mget_p50:>10.1f} {mget_p95:>10.1f}")
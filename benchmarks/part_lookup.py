@@ -0,0 +1,91 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Measure build time, memory and warm lookup latency of the part-number index for
+exact, partial ('76622-T0A') and mistyped ('FD3Z13O08A') queries.
+
+    python benchmarks/part_lookup.py --scale 1 100 1000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "infra"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src", "backend"))
+
+from catalog_load import scaled_catalog, current_rss_kib  # noqa: E402
+from pipeline.catalog import compile_catalog  # noqa: E402
+from catalog import Catalog  # noqa: E402
+from part_lookup import PartNumberIndex  # noqa: E402
+
+QUERIES = 2000
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def prefix_query(part_number: str) -> str:
+    return part_number[:max(len(part_number) * 2 // 3, 3)].lower()
+
+
+def typo_query(part_number: str) -> str:
+    characters = list(part_number.replace("-", ""))
+    position = random.randrange(len(characters))
+    edit = random.choice(("substitute", "delete", "insert", "transpose"))
+    if edit == "substitute":
+        characters[position] = random.choice(ALPHABET)
+    elif edit == "delete" and len(characters) > 1:
+        del characters[position]
+    elif edit == "insert":
+        characters.insert(position, random.choice(ALPHABET))
+    elif position + 1 < len(characters):
+        characters[position], characters[position + 1] = characters[position + 1], characters[position]
+    return "".join(characters)
+
+
+def latency(index: PartNumberIndex, queries) -> tuple:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.lookup(query)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def run(scale: int, work_dir: str) -> None:
+    inventory, compatible_parts = scaled_catalog(scale)
+    catalog_file = os.path.join(work_dir, "catalog.bin")
+    compile_catalog(inventory, compatible_parts, catalog_file)
+    catalog = Catalog(catalog_file)
+
+    baseline = current_rss_kib()
+    started = time.perf_counter()
+    index = PartNumberIndex(catalog)
+    build_ms = (time.perf_counter() - started) * 1000
+    memory = (current_rss_kib() - baseline) * 1024
+
+    sample = [random.choice(inventory)['part_number'] for _ in range(QUERIES)]
+    found = sum(1 for query in sample[:200] if index.lookup(typo_query(query))["suggestions"])
+    row = f"{len(index):>9} {build_ms:>9.0f} {memory / 2**20:>8.1f}"
+    for make_query in (lambda part_number: part_number, prefix_query, typo_query):
+        p50, p99 = latency(index, [make_query(part_number) for part_number in sample])
+        row += f" {p50:>7.0f} {p99:>7.0f}"
+    print(row + f" {found / 2:>7.0f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'':>28} {'exact us':>15} {'prefix us':>15} {'typo us':>15}")
+    print(f"{'keys':>9} {'build ms':>9} {'MiB':>8} {'p50':>7} {'p99':>7} {'p50':>7} {'p99':>7} {'p50':>7} {'p99':>7} {'typo hit':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in args.scale:
+            run(scale, work_dir)
@@ -0,0 +1,279 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+"""
+Apply a stream of inventory changes as partial document updates.
+
+Each change is a JSON object with the part number and the fields that changed:
+
+    {"part_number": "FD3Z-13008-A", "price": 27.49}
+    {"part_number": "FD3Z-13008-A", "in_stock": false}
+
+Changes are merged per part number, sent as bulk ``update`` actions that carry
+only the changed fields, and the part numbers whose documents actually changed
+are passed to the invalidation sinks so caches can drop them.
+
+    OPENSEARCH_ENDPOINT=<id>.<region>.aoss.amazonaws.com AWS_REGION=<region> \\
+        python feed.py changes.jsonl
+    tail -f changes.jsonl | python feed.py - --event-bus default
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import boto3
+
+INVENTORY_INDEX = 'inventory'
+ID_FIELD = 'part_number'
+MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inventory-index', 'schema.json')
+FEED_BULK_SIZE = int(os.environ.get('FEED_BULK_SIZE', '500'))
+FEED_MAX_WORKERS = int(os.environ.get('FEED_MAX_WORKERS', '4'))
+# EventBridge accepts up to 10 entries of 256 KB per call
+EVENT_KEYS_PER_ENTRY = 1000
+EVENT_ENTRIES_PER_CALL = 10
+
+
+def updatable_fields(mapping_file=MAPPING_FILE, id_field=ID_FIELD):
+    """
+    Fields of the index mapping a change may set. The document ID cannot change,
+    and fields that are stored but not indexed, such as the variants of a part
+    number, are only written by the setup handler.
+    """
+    with open(mapping_file, 'r') as f:
+        mapping = json.load(f)
+    return {field for field, spec in mapping['mappings']['properties'].items()
+            if field != id_field and spec.get('enabled', True)}
+
+
+def read_changes(lines):
+    """Parse JSON lines, skipping blank and malformed ones."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f'Skipping malformed change {line[:80]!r}: {e}')
+
+
+def iter_batches(changes, batch_size, max_wait=None):
+    """
+    Group a change stream into batches of ``batch_size``. With ``max_wait`` a
+    batch is also flushed once it has been open that many seconds, even while
+    the stream is idle, so a slow producer such as ``tail -f`` still gets applied.
+    """
+    if max_wait is None:
+        batch = []
+        for change in changes:
+            batch.append(change)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        return
+
+    # Changes are read on a separate thread so waiting for input does not hold back a due batch
+    pending = queue.Queue(maxsize=batch_size * 2)
+    done = object()
+
+    def read():
+        try:
+            for change in changes:
+                pending.put(change)
+        except Exception as e:
+            pending.put(e)
+        pending.put(done)
+
+    threading.Thread(target=read, name='feed-reader', daemon=True).start()
+
+    batch, deadline = [], None
+    while True:
+        try:
+            item = pending.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            yield batch
+            batch, deadline = [], None
+            continue
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        if not batch:
+            deadline = time.monotonic() + max_wait
+        batch.append(item)
+        if len(batch) >= batch_size or time.monotonic() >= deadline:
+            yield batch
+            batch, deadline = [], None
+    if batch:
+        yield batch
+
+
+def merge_changes(changes, fields, id_field=ID_FIELD):
+    """
+    Merge changes into one partial document per key. Later changes win, and fields
+    outside ``fields`` are dropped.
+
+    Returns:
+        tuple: ({key: partial document}, number of rejected changes)
+    """
+    updates = {}
+    rejected = 0
+    for change in changes:
+        key = change.get(id_field) if isinstance(change, dict) else None
+        doc = {field: value for field, value in change.items() if field in fields} if key else None
+        if not doc:
+            rejected += 1
+            continue
+        updates.setdefault(key, {}).update(doc)
+    return updates, rejected
+
+
+def bulk_body(index_name, updates):
+    body = []
+    for key, doc in updates:
+        body.append({'update': {'_index': index_name, '_id': key}})
+        body.append({'doc': doc})
+    return body
+
+
+def apply_chunk(client, index_name, updates):
+    """
+    Send one bulk request of partial updates.
+
+    Returns:
+        dict: Keys by outcome: 'updated', 'noop' (values were already current),
+            'missing' (no document with that ID) and 'failed'.
+    """
+    outcome = {'updated': [], 'noop': [], 'missing': [], 'failed': []}
+    response = client.bulk(body=bulk_body(index_name, updates))
+    for item in response['items']:
+        result = item['update']
+        if result.get('result') in ('updated', 'noop'):
+            outcome[result['result']].append(result['_id'])
+        elif result.get('status') == 404:
+            outcome['missing'].append(result['_id'])
+        else:
+            print(f"Failed to update {result['_id']}: {result.get('error')}")
+            outcome['failed'].append(result['_id'])
+    return outcome
+
+
+def apply_updates(client, index_name, updates, sinks=(), bulk_size=FEED_BULK_SIZE, max_workers=FEED_MAX_WORKERS):
+    """
+    Apply merged updates in parallel bulk requests and notify the sinks of the keys
+    whose documents changed as each request completes.
+
+    Returns:
+        dict: Counts by outcome.
+    """
+    items = list(updates.items())
+    chunks = [items[start:start + bulk_size] for start in range(0, len(items), bulk_size)]
+    counts = {'updated': 0, 'noop': 0, 'missing': 0, 'failed': 0}
+    if not chunks:
+        return counts
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = [executor.submit(apply_chunk, client, index_name, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            outcome = future.result()
+            for name, keys in outcome.items():
+                counts[name] += len(keys)
+            if outcome['updated']:
+                for sink in sinks:
+                    try:
+                        sink(index_name, outcome['updated'])
+                    except Exception as e:
+                        print(f'Invalidation sink failed: {e}')
+    return counts
+
+
+def print_sink(index_name, keys):
+    print(f'{len(keys)} stale keys in {index_name}')
+
+
+def file_sink(path):
+    """Append stale keys to a JSON lines file, one record per bulk request."""
+    def sink(index_name, keys):
+        with open(path, 'a') as f:
+            f.write(json.dumps({'timestamp': time.time(), 'index': index_name, 'keys': keys}) + '\n')
+    return sink
+
+
+def eventbridge_sink(bus_name, region=None, source='car-parts.inventory-feed'):
+    """Publish stale keys as 'Inventory keys stale' events on an EventBridge bus."""
+    events = boto3.client('events', region_name=region)
+
+    def sink(index_name, keys):
+        entries = [{
+            'EventBusName': bus_name,
+            'Source': source,
+            'DetailType': 'Inventory keys stale',
+            'Detail': json.dumps({'index': index_name, 'keys': keys[start:start + EVENT_KEYS_PER_ENTRY]}),
+        } for start in range(0, len(keys), EVENT_KEYS_PER_ENTRY)]
+        for start in range(0, len(entries), EVENT_ENTRIES_PER_CALL):
+            response = events.put_events(Entries=entries[start:start + EVENT_ENTRIES_PER_CALL])
+            if response.get('FailedEntryCount'):
+                print(f"Failed to publish {response['FailedEntryCount']} invalidation events")
+    return sink
+
+
+def run_feed(client, changes, index_name=INVENTORY_INDEX, fields=None, sinks=(print_sink,),
+             batch_size=10000, max_wait=None):
+    """
+    Merge and apply a change stream batch by batch.
+
+    Returns:
+        dict: Totals of changes read, rejected, merged updates, outcomes and
+            the changes applied per second.
+    """
+    fields = fields or updatable_fields()
+    totals = {'changes': 0, 'rejected': 0, 'updates': 0, 'updated': 0, 'noop': 0, 'missing': 0, 'failed': 0}
+    started = time.perf_counter()
+    for batch in iter_batches(changes, batch_size, max_wait):
+        updates, rejected = merge_changes(batch, fields)
+        counts = apply_updates(client, index_name, updates, sinks)
+        totals['changes'] += len(batch)
+        totals['rejected'] += rejected
+        totals['updates'] += len(updates)
+        for name, count in counts.items():
+            totals[name] += count
+        print(f'Applied {len(batch)} changes as {len(updates)} updates: {counts}')
+    elapsed = time.perf_counter() - started
+    totals['seconds'] = round(elapsed, 3)
+    totals['changesPerSecond'] = round(totals['changes'] / elapsed, 1) if elapsed else 0.0
+    return totals
+
+
+if __name__ == '__main__':
+    from index import create_opensearch_client
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('changes', help="JSON lines file of changes, or '-' to read a stream from stdin")
+    parser.add_argument('--index', default=INVENTORY_INDEX)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--max-wait', type=float, help='Flush a partial batch after this many seconds')
+    parser.add_argument('--invalidation-file', help='Append stale keys to this JSON lines file')
+    parser.add_argument('--event-bus', help='Publish stale keys to this EventBridge bus')
+    args = parser.parse_args()
+
+    region = os.environ['AWS_REGION']
+    sinks = [print_sink]
+    if args.invalidation_file:
+        sinks.append(file_sink(args.invalidation_file))
+    if args.event_bus:
+        sinks.append(eventbridge_sink(args.event_bus, region))
+
+    client = create_opensearch_client(os.environ['OPENSEARCH_ENDPOINT'], region)
+    source = sys.stdin if args.changes == '-' else open(args.changes, 'r')
+    with source:
+        totals = run_feed(client, read_changes(source), args.index, sinks=sinks,
+                          batch_size=args.batch_size, max_wait=args.max_wait)
+    print(json.dumps(totals))
@@ -0,0 +1,54 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import hashlib
+
+
+def merge_year_ranges(years):
+    """Merge a list of model years into sorted, inclusive integer_range intervals."""
+    ranges = []
+    for year in sorted(set(years)):
+        if ranges and year == ranges[-1]['lte'] + 1:
+            ranges[-1]['lte'] = year
+        else:
+            ranges.append({'gte': year, 'lte': year})
+    return ranges
+
+
+def part_id(part):
+    # Content-derived so identical parts listed under many vehicles share one table entry
+    canonical = json.dumps(part, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def build_fitment_documents(data_array):
+    """
+    Split compatible-parts preload documents into fitment documents and a shared
+    parts table.
+
+    Each fitment document keeps make, model and category, stores its years as
+    merged ranges and references its parts by ID. Part names are kept alongside
+    so category searches can still match on them.
+    """
+    fitment_documents = []
+    parts_table = {}
+
+    for data in data_array:
+        part_ids = []
+        for part in data.get('parts', []):
+            key = part_id(part)
+            parts_table.setdefault(key, dict(part, part_id=key))
+            part_ids.append(key)
+
+        fitment_documents.append({
+            'manufacturer': data.get('manufacturer'),
+            'make': data['make'],
+            'model': data['model'],
+            'year_ranges': merge_year_ranges(data.get('years', [])),
+            'category': data.get('category'),
+            'part_ids': part_ids,
+            'part_names': [part.get('part_name') for part in data.get('parts', [])],
+        })
+
+    return fitment_documents, list(parts_table.values())
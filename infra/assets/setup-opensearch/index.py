@@ -7,6 +7,10 @@ import boto3
 from opensearchpy import OpenSearch, RequestsHttpConnection
 from requests_aws4auth import AWS4Auth
 import time
+from fitment import build_fitment_documents
+
+# Records that share an ID with the indexed document but differ from it, stored but not indexed
+VARIANTS_FIELD = 'variants'
 
 def create_aws_auth(region):
     credentials = boto3.Session(region_name=region).get_credentials()
@@ -28,9 +32,55 @@ def create_index(client, index_name, mapping):
     response = client.indices.create(index=index_name, body=mapping)
     print(f'Creating index {index_name}:', response)
 
-def add_data_to_index(client, index_name, data_array):
+def field_types(spec):
+    # Sub-fields such as category.raw only exist for documents indexed after they were mapped
+    return (spec.get('type', 'object'), {name: sub.get('type') for name, sub in spec.get('fields', {}).items()},
+            spec.get('enabled', True))
+
+def ensure_index(client, index_name, mapping, id_field=None):
+    # The ID scheme is recorded in the mapping metadata, so documents indexed under another scheme are not left behind
+    mapping = {**mapping, 'mappings': {**mapping['mappings'], '_meta': {'id_field': id_field}}}
+    if client.indices.exists(index=index_name):
+        current = client.indices.get_mapping(index=index_name)[index_name]['mappings']
+        properties = current.get('properties', {})
+        # Fields cannot change type in place, so a changed schema means rebuilding the index
+        if (all(field_types(properties.get(field, {})) == field_types(spec)
+                for field, spec in mapping['mappings']['properties'].items())
+                and current.get('_meta', {}).get('id_field') == id_field):
+            return
+        print(f'Mapping or document IDs of {index_name} changed, recreating index')
+        client.indices.delete(index=index_name)
+    create_index(client, index_name, mapping)
+
+def group_records(data_array, id_field):
+    """
+    Build one document per ``id_field`` value. Identical duplicates are dropped;
+    records that differ are kept in the ``variants`` list of the first one, so a
+    lookup by ID still returns every record.
+
+    Returns:
+        tuple: The documents to index and a dict of conflicting IDs to the fields that differ.
+    """
+    groups = {}
     for data in data_array:
-        response = client.index(index=index_name, body=data)
+        records = groups.setdefault(data[id_field], [])
+        if data not in records:
+            records.append(data)
+
+    documents, conflicts = [], {}
+    for key, (first, *others) in groups.items():
+        if others:
+            conflicts[key] = sorted({field for other in others for field in set(first) | set(other)
+                                     if first.get(field) != other.get(field)})
+            first = {**first, VARIANTS_FIELD: others}
+        documents.append(first)
+    return documents, conflicts
+
+def add_data_to_index(client, index_name, data_array, id_field=None):
+    for data in data_array:
+        # Keyed documents can be fetched with _mget and are overwritten, not duplicated, on update
+        doc_id = data[id_field] if id_field else None
+        response = client.index(index=index_name, body=data, id=doc_id)
         print(f'Adding document to {index_name}:', response)
 
 def handler(event, context):
@@ -45,6 +95,8 @@ def handler(event, context):
         index_name = event['ResourceProperties']['IndexName']
         mapping_file = event['ResourceProperties']['MappingFile']
         data_file = event['ResourceProperties']['DataFile']
+        id_field = event['ResourceProperties'].get('IdField')
+        transform = event['ResourceProperties'].get('Transform')
         
         # Read mapping and data files from the Lambda package
         with open(mapping_file, 'r') as f:
@@ -54,10 +106,24 @@ def handler(event, context):
             data_array = json.load(f)
         
         client = create_opensearch_client(host, region)
-        
-        if not client.indices.exists(index=index_name):
-            create_index(client, index_name, mapping)
-        add_data_to_index(client, index_name, data_array)
+
+        if transform == 'fitment':
+            # Year lists become ranges and parts move to a shared table referenced by ID
+            data_array, parts_table = build_fitment_documents(data_array)
+            parts_index_name = event['ResourceProperties']['PartsIndexName']
+            with open(event['ResourceProperties']['PartsMappingFile'], 'r') as f:
+                parts_mapping = json.load(f)
+            ensure_index(client, parts_index_name, parts_mapping, 'part_id')
+            add_data_to_index(client, parts_index_name, parts_table, 'part_id')
+
+        if id_field:
+            # A keyed index holds one document per ID, so records sharing an ID are grouped rather than overwritten by the last write
+            data_array, conflicts = group_records(data_array, id_field)
+            for key, fields in conflicts.items():
+                print(f'Records for {id_field} {key} differ in {", ".join(fields)}; keeping them as variants')
+
+        ensure_index(client, index_name, mapping, id_field)
+        add_data_to_index(client, index_name, data_array, id_field)
         
         return {
             'PhysicalResourceId': index_name,
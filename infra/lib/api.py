@@ -13,8 +13,11 @@ from aws_cdk import (
 )
 import os
 
+from pipeline.bm25 import build_manual_index
+from pipeline.catalog import compile_catalog_files
+
 class LambdaConstruct(Construct):
-    def __init__(self, scope: Construct, construct_id: str, src_dir: str, opensearch_collection, stack_name: str, **kwargs):
+    def __init__(self, scope: Construct, construct_id: str, src_dir: str, asset_dir: str, opensearch_collection, stack_name: str, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
 
         # Consistent naming
@@ -27,6 +30,20 @@ class LambdaConstruct(Construct):
             Aws.URL_SUFFIX,
         )
 
+        # Precompute the BM25 manual index so it ships inside the Lambda package
+        build_manual_index(
+            os.path.join(asset_dir, "manual-chunks"),
+            os.path.join(src_dir, "backend", "manual_index.bin"),
+        )
+
+        # Compile the parts catalog into the memory-mapped binary format read by catalog.py
+        setup_dir = os.path.join(asset_dir, "setup-opensearch")
+        compile_catalog_files(
+            os.path.join(setup_dir, "inventory-index", "preload.json"),
+            os.path.join(setup_dir, "compatible-parts-index", "preload.json"),
+            os.path.join(src_dir, "backend", "catalog.bin"),
+        )
+
         try:
             self.lookup_function = _lambda.Function(
                 self,
@@ -46,9 +63,12 @@ class LambdaConstruct(Construct):
                     ),
                 ),
                 timeout=Duration.seconds(900),
+                # The part number typo index is built in memory on first use, roughly 1.7 KB per catalog part number
+                memory_size=1024,
                 environment={
                     "OPENSEARCH_ENDPOINT": collectionEndpoint,
                     "COMPATIBLE_PARTS_INDEX": "compatible-parts",
+                    "COMPATIBLE_PARTS_TABLE_INDEX": "compatible-parts-table",
                     "INVENTORY_INDEX": "inventory",
                 },
             )
@@ -39,9 +39,8 @@ class BedrockConstruct(Construct):
                 bucket=manuals_bucket,
                 knowledge_base=self.kb,
                 data_source_name="car-manuals",
-                chunking_strategy=bedrock.ChunkingStrategy.FIXED_SIZE,
-                max_tokens=500,
-                overlap_percentage=20,
+                # Manuals are chunked section-aware by StorageConstruct before upload
+                chunking_strategy=bedrock.ChunkingStrategy.NONE,
             )
 
             self.agent = bedrock.Agent(
@@ -82,7 +81,7 @@ class BedrockConstruct(Construct):
                 self,
                 "CarPartsActionGroup",
                 action_group_name="CarPartsApi",
-                description="Use these functions to search for compatible car parts or details about a specific part.",
+                description="Use these functions to search for compatible car parts, details about a specific part, or exact specifications from the owners' manuals.",
                 action_group_executor=executor_group,
                 action_group_state="ENABLED",
                 api_schema=bedrock.ApiSchema.from_asset(
@@ -11,18 +11,48 @@ from aws_cdk import (
     aws_cognito as cognito,
     aws_elasticloadbalancingv2 as elbv2,
     aws_elasticloadbalancingv2_actions as elbv2_actions,
+    aws_elasticache as elasticache,
+    aws_secretsmanager as secretsmanager,
+    Duration,
     RemovalPolicy,
     CfnOutput,
 )
 import os
+from typing import Optional
+
+from pipeline.thumbnails import build_thumbnails_if_available
 
 class FrontendConstruct(Construct):
-    def __init__(self, scope: Construct, construct_id: str, vpc: ec2.Vpc, agent_id: str, agent_alias_id: str, aws_region: str, src_dir: str, **kwargs):
+    def __init__(self, scope: Construct, construct_id: str, vpc: ec2.Vpc, agent_id: str, agent_alias_id: str, aws_region: str, src_dir: str, asset_dir: str,
+                 desired_count: int = 1, max_count: int = 1, session_store_url: Optional[str] = None, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
 
+        # More than one task needs conversations in a shared store instead of task memory
+        scaled_out = max(desired_count, max_count) > 1
+        session_cache = None
+        if scaled_out and not session_store_url:
+            session_cache = self.create_session_cache(vpc)
+            session_store_url = "redis://{}:{}/0".format(
+                session_cache.attr_redis_endpoint_address, session_cache.attr_redis_endpoint_port)
+
+        # Signs the session tokens in page URLs; shared so every task accepts tokens issued by the others
+        session_secret = secretsmanager.Secret(
+            self, "SessionSecret",
+            description="Signing key for Car Parts Assistant session tokens",
+            generate_secret_string=secretsmanager.SecretStringGenerator(exclude_punctuation=True, password_length=64),
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
         # ECS Cluster
         cluster = ecs.Cluster(self, "CarPartsAssistantCluster", vpc=vpc)
 
+        # Pre-size part images into content-addressed thumbnails shipped with the image
+        build_thumbnails_if_available(
+            image_dir=os.path.join(asset_dir, "part-images"),
+            output_dir=os.path.join(src_dir, "frontend", "static", "thumbnails"),
+            data_file=os.path.join(asset_dir, "setup-opensearch", "inventory-index", "preload.json"),
+        )
+
         # Frontend Docker image
         frontend_image = ecs.ContainerImage.from_asset(
             directory=os.path.join(src_dir, 'frontend'),  # Ensure this path points to your application code with Dockerfile
@@ -36,7 +66,7 @@ class FrontendConstruct(Construct):
             cluster=cluster,
             cpu=256,
             memory_limit_mib=512,
-            desired_count=1,
+            desired_count=desired_count,
             task_image_options=ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
                 image=frontend_image,
                 container_port=8501,
@@ -45,11 +75,32 @@ class FrontendConstruct(Construct):
                     "AGENT_ID": agent_id,
                     "AGENT_ALIAS_ID": agent_alias_id,
                     "AWS_REGION": aws_region,
+                    "SESSION_STORE_URL": session_store_url or "memory://",
+                },
+                secrets={
+                    "SESSION_SECRET": ecs.Secret.from_secrets_manager(session_secret),
                 },
             ),
             public_load_balancer=True,
         )
 
+        if session_cache:
+            self.fargate_service.service.connections.allow_to_default_port(self.session_cache_connections)
+
+        if scaled_out:
+            # Keep a browser on one task between reconnects; history survives a move either way
+            self.fargate_service.target_group.enable_cookie_stickiness(Duration.hours(1))
+
+        if max_count > desired_count:
+            scaling = self.fargate_service.service.auto_scale_task_count(
+                min_capacity=desired_count, max_capacity=max_count)
+            scaling.scale_on_cpu_utilization(
+                "CpuScaling",
+                target_utilization_percent=60,
+                scale_in_cooldown=Duration.seconds(300),
+                scale_out_cooldown=Duration.seconds(60),
+            )
+
         # Grant permissions to invoke Bedrock
         self.fargate_service.task_definition.add_to_task_role_policy(
             iam.PolicyStatement(
@@ -64,4 +115,29 @@ class FrontendConstruct(Construct):
         # Outputs
         CfnOutput(self, "FrontendURL", 
                   value=f"http://{self.fargate_service.load_balancer.load_balancer_dns_name}",
-                  description="URL of the Car Parts Assistant frontend")
\ No newline at end of file
+                  description="URL of the Car Parts Assistant frontend")
+
+    def create_session_cache(self, vpc: ec2.Vpc) -> elasticache.CfnCacheCluster:
+        security_group = ec2.SecurityGroup(
+            self, "SessionCacheSecurityGroup",
+            vpc=vpc,
+            description="Session store for the Car Parts Assistant frontend",
+            allow_all_outbound=False,
+        )
+        self.session_cache_connections = ec2.Connections(
+            security_groups=[security_group], default_port=ec2.Port.tcp(6379))
+
+        subnet_group = elasticache.CfnSubnetGroup(
+            self, "SessionCacheSubnets",
+            description="Private subnets of the session store",
+            subnet_ids=vpc.select_subnets(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids,
+        )
+
+        return elasticache.CfnCacheCluster(
+            self, "SessionCache",
+            engine="redis",
+            cache_node_type="cache.t4g.micro",
+            num_cache_nodes=1,
+            cache_subnet_group_name=subnet_group.ref,
+            vpc_security_group_ids=[security_group.security_group_id],
+        )
\ No newline at end of file
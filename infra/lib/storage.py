@@ -11,6 +11,8 @@ from aws_cdk import (
 )
 import os
 
+from pipeline.manuals import process_manuals, MANIFEST_FILE
+
 class StorageConstruct(Construct):
     def __init__(self, scope: Construct, construct_id: str, asset_dir: str, stack_name: str, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
@@ -33,10 +35,15 @@ class StorageConstruct(Construct):
 
         # Deploy assets with error handling
         try:
+            # Pre-process manuals locally into content-addressed chunk files, so only
+            # changed chunks are uploaded and re-embedded on the next knowledge base sync
+            chunks_dir = os.path.join(asset_dir, "manual-chunks")
+            process_manuals(os.path.join(asset_dir, "owners-manuals"), chunks_dir)
+
             s3deploy.BucketDeployment(
                 self,
                 "DeployManuals",
-                sources=[s3deploy.Source.asset(os.path.join(asset_dir, "owners-manuals"))],
+                sources=[s3deploy.Source.asset(chunks_dir, exclude=[MANIFEST_FILE, ".gitignore"])],
                 destination_bucket=self.manuals_bucket,
                 memory_limit=1024,
                 retain_on_delete=False,  # Ensure cleanup on stack deletion
@@ -14,5 +14,10 @@ def add_suppressions(stack):
         {"id": "AwsSolutions-ELB2", "reason": "ELB access logs not required for this demo"},
         {"id": "AwsSolutions-EC23", "reason": "Open inbound access is acceptable for this demo"},
         {"id": "AwsSolutions-ECS2", "reason": "Direct environment variable specification is acceptable for this demo"},
+        {"id": "AwsSolutions-AEC3", "reason": "The session cache holds demo conversations that expire after a day"},
+        {"id": "AwsSolutions-AEC4", "reason": "A single-AZ session cache is acceptable for this demo"},
+        {"id": "AwsSolutions-AEC5", "reason": "The session cache is only reachable from the frontend tasks"},
+        {"id": "AwsSolutions-AEC6", "reason": "The session cache is only reachable from the frontend tasks"},
+        {"id": "AwsSolutions-SMG4", "reason": "Rotating the session signing secret would end all open conversations"},
         {"id": "CdkNagValidationFailure", "reason": "Suppressing validation failures for this demo"},
     ])
\ No newline at end of file
@@ -102,6 +102,9 @@ class OpenSearchConstruct(Construct):
                     "IndexName": "compatible-parts",
                     "MappingFile": "./compatible-parts-index/schema.json",
                     "DataFile": "./compatible-parts-index/preload.json",
+                    "Transform": "fitment",
+                    "PartsIndexName": "compatible-parts-table",
+                    "PartsMappingFile": "./compatible-parts-index/parts-schema.json",
                 },
             )
 
@@ -117,6 +120,7 @@ class OpenSearchConstruct(Construct):
                     "IndexName": "inventory",
                     "MappingFile": "./inventory-index/schema.json",
                     "DataFile": "./inventory-index/preload.json",
+                    "IdField": "part_number",
                 },
             )
 
@@ -38,7 +38,7 @@ class CarPartsAgentStack(Stack):
         opensearch = OpenSearchConstruct(self, "OpenSearch", asset_dir=asset_dir, stack_name=self.stack_name)
 
         # Create Lambda Construct
-        api = LambdaConstruct(self, "API", src_dir=src_dir, opensearch_collection=opensearch.collection, stack_name=self.stack_name)
+        api = LambdaConstruct(self, "API", src_dir=src_dir, asset_dir=asset_dir, opensearch_collection=opensearch.collection, stack_name=self.stack_name)
 
         # Create Bedrock Construct
         bedrock = BedrockConstruct(self, "Bedrock", 
@@ -55,15 +55,23 @@ class CarPartsAgentStack(Stack):
                                      agent_id=bedrock.agent.agent_id,
                                      agent_alias_id=bedrock.agent.alias_id,
                                      aws_region=self.region,
-                                     src_dir=src_dir)
+                                     src_dir=src_dir,
+                                     asset_dir=asset_dir,
+                                     # e.g. cdk deploy -c frontend_max_count=4 to autoscale on a shared session store
+                                     desired_count=int(self.node.try_get_context("frontend_desired_count") or 1),
+                                     max_count=int(self.node.try_get_context("frontend_max_count") or 1),
+                                     session_store_url=self.node.try_get_context("session_store_url"))
 
         # Add suppressions
         add_suppressions(self)
 
-app = App()
-stack = CarPartsAgentStack(app, "CarPartsAgentStack")
+# Manual processing runs in worker processes during synth; where they are started with spawn
+# (macOS, Windows) each worker re-imports this module, which must not build and synth the app again
+if __name__ == "__main__":
+    app = App()
+    stack = CarPartsAgentStack(app, "CarPartsAgentStack")
 
-# Adding CDK Nag Checks
-Aspects.of(app).add(AwsSolutionsChecks(report_formats=[NagReportFormat.CSV]))
+    # Adding CDK Nag Checks
+    Aspects.of(app).add(AwsSolutionsChecks(report_formats=[NagReportFormat.CSV]))
 
-app.synth()
\ No newline at end of file
+    app.synth()
\ No newline at end of file
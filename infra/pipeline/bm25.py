@@ -0,0 +1,145 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import re
+import json
+import struct
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+# The on-disk layout and tokenizer must stay in sync with src/backend/manual_search.py
+MAGIC = b"CPBM25\x00\x01"
+HEADER = struct.Struct("<8sIIfQQQQQ")
+TERM_ENTRY = struct.Struct("<IIII")
+POSTING = struct.Struct("<IH")
+DOC_ENTRY = struct.Struct("<IQI")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        # Compound tokens such as "cr-v" or "5w-30" are also indexed by their parts
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[.\-/]", token) if part and part not in STOPWORDS)
+    return tokens
+
+
+def read_chunks(chunks_dir: str) -> Iterable[Dict]:
+    """
+    Read the chunk files written by ``pipeline.manuals`` together with their metadata.
+    """
+    for file_name in sorted(os.listdir(chunks_dir)):
+        if not file_name.endswith(".txt"):
+            continue
+        with open(os.path.join(chunks_dir, file_name), 'r', encoding='utf-8') as f:
+            text = f.read()
+        try:
+            with open(os.path.join(chunks_dir, f"{file_name}.metadata.json"), 'r') as f:
+                metadata = json.load(f).get("metadataAttributes", {})
+        except (OSError, json.JSONDecodeError):
+            metadata = {}
+        yield {
+            "source": metadata.get("source", ""),
+            "section": metadata.get("section", ""),
+            "page": metadata.get("page", 0),
+            "text": text,
+        }
+
+
+def write_index(passages: Iterable[Dict], output_path: str) -> Tuple[int, int]:
+    """
+    Write a BM25 inverted index over the passages in the binary layout read by
+    ``src/backend/manual_search.py``.
+
+    Layout (little-endian): header, term table sorted by term bytes, term blob,
+    postings (doc id, term frequency) grouped by term, document table and a blob
+    of JSON-encoded passages.
+
+    Returns:
+        Tuple[int, int]: The number of passages and distinct terms written.
+    """
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    doc_lengths: List[int] = []
+    doc_blobs: List[bytes] = []
+
+    for doc_id, passage in enumerate(passages):
+        tokens = tokenize(passage["text"])
+        doc_lengths.append(len(tokens))
+        doc_blobs.append(json.dumps(passage, separators=(",", ":")).encode('utf-8'))
+        for term, frequency in Counter(tokens).items():
+            postings[term].append((doc_id, min(frequency, 0xFFFF)))
+
+    terms = sorted(postings, key=lambda term: term.encode('utf-8'))
+    average_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+
+    term_table, term_blob, posting_bytes = bytearray(), bytearray(), bytearray()
+    posting_index = 0
+    for term in terms:
+        encoded = term.encode('utf-8')
+        term_table += TERM_ENTRY.pack(len(term_blob), len(encoded), posting_index, len(postings[term]))
+        term_blob += encoded
+        for doc_id, frequency in postings[term]:
+            posting_bytes += POSTING.pack(doc_id, frequency)
+        posting_index += len(postings[term])
+
+    doc_table, doc_blob = bytearray(), bytearray()
+    for length, blob in zip(doc_lengths, doc_blobs):
+        doc_table += DOC_ENTRY.pack(length, len(doc_blob), len(blob))
+        doc_blob += blob
+
+    off_term_table = HEADER.size
+    off_term_blob = off_term_table + len(term_table)
+    off_postings = off_term_blob + len(term_blob)
+    off_doc_table = off_postings + len(posting_bytes)
+    off_doc_blob = off_doc_table + len(doc_table)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(doc_lengths), len(terms), average_length,
+                            off_term_table, off_term_blob, off_postings, off_doc_table, off_doc_blob))
+        f.write(term_table)
+        f.write(term_blob)
+        f.write(posting_bytes)
+        f.write(doc_table)
+        f.write(doc_blob)
+    os.replace(tmp_path, output_path)
+
+    return len(doc_lengths), len(terms)
+
+
+def build_manual_index(chunks_dir: str, output_path: str) -> Tuple[int, int]:
+    """
+    Build the manual search index from the pre-processed manual chunks.
+
+    Args:
+        chunks_dir (str): Directory written by ``pipeline.manuals.process_manuals``.
+        output_path (str): Where to write the index file.
+
+    Returns:
+        Tuple[int, int]: The number of passages and distinct terms written.
+    """
+    passages, terms = write_index(read_chunks(chunks_dir), output_path)
+    print(f"Built manual index with {passages} passages and {terms} terms at {output_path}")
+    return passages, terms
+
+
+if __name__ == "__main__":
+    assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+    repo_dir = os.path.dirname(os.path.dirname(assets_dir))
+
+    parser = argparse.ArgumentParser(description="Build the BM25 index over owners' manual chunks.")
+    parser.add_argument("--chunks", default=os.path.join(assets_dir, "manual-chunks"))
+    parser.add_argument("--output", default=os.path.join(repo_dir, "src", "backend", "manual_index.bin"))
+    args = parser.parse_args()
+
+    build_manual_index(args.chunks, args.output)
@@ -0,0 +1,161 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import json
+import struct
+import argparse
+from typing import Dict, List, Tuple
+
+# The on-disk layout must stay in sync with src/backend/catalog.py
+MAGIC = b"CPCAT\x00\x00\x01"
+HEADER = struct.Struct("<8sIIIIIQQQQQQQQ")
+STRING_OFFSET = struct.Struct("<I")
+INVENTORY_RECORD = struct.Struct("<IIIIIIIIHB")
+FITMENT_DOC = struct.Struct("<IIIIIIII")
+FITMENT_PART = struct.Struct("<III")
+FITMENT_KEY = struct.Struct("<IHII")
+POSTING = struct.Struct("<I")
+YEAR = struct.Struct("<H")
+
+NONE = 0xFFFFFFFF
+KEY_SEPARATOR = "\x1f"
+
+
+class StringTable:
+    """Interns strings so every distinct value is stored once."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value) -> int:
+        if value is None:
+            return NONE
+        value = str(value)
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+def fitment_key(make: str, model: str) -> str:
+    return f"{make.lower()}{KEY_SEPARATOR}{model.lower()}"
+
+
+def compile_catalog(inventory: List[Dict], compatible_parts: List[Dict], output_path: str) -> Dict[str, int]:
+    """
+    Compile the inventory and compatible-parts preload data into the binary catalog
+    read by ``src/backend/catalog.py``.
+
+    Layout (little-endian): header; string offsets and a shared UTF-8 string blob;
+    fixed-size inventory records sorted by part number; fitment documents, their
+    parts and years; fitment keys sorted by (make, model, year) with postings into
+    the fitment documents.
+
+    Returns:
+        Dict[str, int]: Section counts and the file size in bytes.
+    """
+    strings = StringTable()
+
+    records = []
+    for data in sorted(inventory, key=lambda data: str(data['part_number']).encode('utf-8')):
+        price = data.get('price')
+        rating = data.get('rating')
+        in_stock = data.get('in_stock')
+        records.append(INVENTORY_RECORD.pack(
+            strings.add(data['part_number']),
+            strings.add(data.get('manufacturer')),
+            strings.add(data.get('category')),
+            strings.add(data.get('part_name')),
+            strings.add(data.get('description')),
+            strings.add(data.get('currency')),
+            strings.add(data.get('images')),
+            NONE if price is None else round(price * 100),
+            0xFFFF if rating is None else round(rating * 100),
+            2 if in_stock is None else int(bool(in_stock)),
+        ))
+
+    docs, parts, years = [], [], []
+    postings: Dict[Tuple[str, int], List[int]] = {}
+    for doc_id, data in enumerate(compatible_parts):
+        docs.append(FITMENT_DOC.pack(
+            strings.add(data.get('manufacturer')),
+            strings.add(data['make']),
+            strings.add(data['model']),
+            strings.add(data.get('category')),
+            len(parts), len(data.get('parts', [])),
+            len(years), len(data.get('years', [])),
+        ))
+        for part in data.get('parts', []):
+            parts.append(FITMENT_PART.pack(
+                strings.add(part.get('part_name')),
+                strings.add(part['part_number']),
+                strings.add(part.get('description')),
+            ))
+        for year in data.get('years', []):
+            years.append(YEAR.pack(year))
+            postings.setdefault((fitment_key(data['make'], data['model']), year), []).append(doc_id)
+
+    keys, posting_bytes = [], bytearray()
+    posting_count = 0
+    for (key, year), doc_ids in sorted(postings.items(), key=lambda item: (item[0][0].encode('utf-8'), item[0][1])):
+        keys.append(FITMENT_KEY.pack(strings.add(key), year, posting_count, len(doc_ids)))
+        for doc_id in doc_ids:
+            posting_bytes += POSTING.pack(doc_id)
+        posting_count += len(doc_ids)
+
+    blob, offsets = bytearray(), bytearray()
+    for value in strings.values:
+        offsets += STRING_OFFSET.pack(len(blob))
+        blob += value.encode('utf-8')
+    offsets += STRING_OFFSET.pack(len(blob))
+
+    sections = [offsets, blob, b"".join(records), b"".join(docs), b"".join(parts), b"".join(years), b"".join(keys), posting_bytes]
+    section_offsets = []
+    position = HEADER.size
+    for section in sections:
+        section_offsets.append(position)
+        position += len(section)
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(strings.values), len(records), len(docs), len(parts), len(keys), *section_offsets))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, output_path)
+
+    return {
+        "strings": len(strings.values),
+        "inventory": len(records),
+        "fitment_documents": len(docs),
+        "fitment_parts": len(parts),
+        "fitment_keys": len(keys),
+        "bytes": position,
+    }
+
+
+def compile_catalog_files(inventory_file: str, compatible_parts_file: str, output_path: str) -> Dict[str, int]:
+    with open(inventory_file, 'r') as f:
+        inventory = json.load(f)
+    with open(compatible_parts_file, 'r') as f:
+        compatible_parts = json.load(f)
+
+    stats = compile_catalog(inventory, compatible_parts, output_path)
+    print(f"Compiled catalog with {stats['inventory']} inventory records and "
+          f"{stats['fitment_documents']} fitment documents ({stats['bytes']} bytes) at {output_path}")
+    return stats
+
+
+if __name__ == "__main__":
+    assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+    repo_dir = os.path.dirname(os.path.dirname(assets_dir))
+    setup_dir = os.path.join(assets_dir, "setup-opensearch")
+
+    parser = argparse.ArgumentParser(description="Compile the parts catalog into the binary format used by the lookup Lambda.")
+    parser.add_argument("--inventory", default=os.path.join(setup_dir, "inventory-index", "preload.json"))
+    parser.add_argument("--compatible-parts", default=os.path.join(setup_dir, "compatible-parts-index", "preload.json"))
+    parser.add_argument("--output", default=os.path.join(repo_dir, "src", "backend", "catalog.bin"))
+    args = parser.parse_args()
+
+    compile_catalog_files(args.inventory, args.compatible_parts, args.output)
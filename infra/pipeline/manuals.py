@@ -0,0 +1,371 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+MAX_TOKENS = 500
+OVERLAP_PERCENTAGE = 20
+PAGES_PER_TASK = 25
+MANIFEST_FILE = ".chunk-manifest.json"
+# Bumped when the chunk files or their metadata change shape, so unchanged manuals are processed again
+CHUNK_FORMAT = 2
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+NUMBERED_HEADING = re.compile(r"^(\d+(\.\d+)*\.?|[A-Z]\.)\s+\S")
+PAGE_NUMBER_LINE = re.compile(r"^\s*(page\s*)?\d{1,4}(\s*/\s*\d{1,4})?\s*$", re.IGNORECASE)
+
+
+@dataclass
+class Chunk:
+    source: str
+    section: str
+    page: int
+    text: str
+
+    @property
+    def digest(self) -> str:
+        # The source is part of the identity so identical boilerplate keeps its attribution
+        return hashlib.sha256(f"{self.source}\x00{self.section}\x00{self.text}".encode('utf-8')).hexdigest()
+
+
+@dataclass
+class PipelineReport:
+    manuals: int = 0
+    manuals_reused: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    chunks: int = 0
+    chunks_reused: int = 0
+    chunks_written: int = 0
+    chunks_removed: int = 0
+    files: List[str] = field(default_factory=list)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Processed {self.manuals} manuals ({self.manuals_reused} unchanged), "
+            f"{self.pages} pages in {self.seconds:.2f}s ({self.pages_per_second:.1f} pages/s); "
+            f"{self.chunks} chunks: {self.chunks_reused} reused, {self.chunks_written} written, "
+            f"{self.chunks_removed} removed"
+        )
+
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_pages(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(task: Tuple[str, int, int]) -> List[Tuple[int, str]]:
+    """
+    Extract the text of a page range of a PDF. Runs in a worker process.
+
+    Args:
+        task (Tuple[str, int, int]): The PDF path and the [start, stop) page range.
+
+    Returns:
+        List[Tuple[int, str]]: 1-based page numbers and their raw text.
+    """
+    from pypdf import PdfReader
+
+    path, start, stop = task
+    reader = PdfReader(path)
+    pages = []
+    for number in range(start, stop):
+        try:
+            text = reader.pages[number].extract_text() or ""
+        except Exception as e:
+            print(f"Failed to extract page {number + 1} of {path}: {e}")
+            text = ""
+        pages.append((number + 1, text))
+    return pages
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize extracted PDF text: unicode forms, hyphenation, page numbers and whitespace.
+    Line breaks are kept because headings are detected per line.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\u00ad", "")
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[ \t]+", " ", line).strip()
+        if PAGE_NUMBER_LINE.match(line):
+            continue
+        lines.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def is_heading(line: str) -> bool:
+    if not line or len(line) > 80 or line.endswith((".", ",", ";", ":")):
+        return False
+    words = line.split()
+    if len(words) > 10 or not any(c.isalpha() for c in line):
+        return False
+    if NUMBERED_HEADING.match(line) or line.isupper():
+        return True
+    return all(word[0].isupper() or not word[0].isalpha() for word in words)
+
+
+def split_sections(pages: List[Tuple[int, str]]) -> List[Tuple[str, List[Tuple[int, str]]]]:
+    """
+    Group normalized page text into sections of paragraphs.
+
+    Returns:
+        List[Tuple[str, List[Tuple[int, str]]]]: Section heading and its paragraphs,
+        each with the page it starts on.
+    """
+    sections = []
+    heading, paragraphs, current = "", [], []
+    current_page = 1
+
+    def close_paragraph():
+        if current:
+            paragraphs.append((current_page, " ".join(current)))
+            current.clear()
+
+    for page, text in pages:
+        for line in text.split("\n"):
+            if not line:
+                close_paragraph()
+            elif is_heading(line):
+                close_paragraph()
+                if paragraphs:
+                    sections.append((heading, paragraphs))
+                heading, paragraphs = line, []
+            else:
+                if not current:
+                    current_page = page
+                current.append(line)
+        close_paragraph()
+
+    if paragraphs:
+        sections.append((heading, paragraphs))
+    return sections
+
+
+def split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    if count_tokens(paragraph) <= max_tokens:
+        return [paragraph]
+    pieces, current = [], []
+    for sentence in SENTENCE_BOUNDARY.split(paragraph):
+        words = sentence.split()
+        # A single run-on sentence larger than a chunk is cut on word boundaries
+        if current and count_tokens(sentence) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        while count_tokens(" ".join(words)) > max_tokens:
+            pieces.append(" ".join(words[:max_tokens // 2]))
+            words = words[max_tokens // 2:]
+        sentence = " ".join(words)
+        if current and count_tokens(" ".join(current + [sentence])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(sentence)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_sections(source: str, sections: List[Tuple[str, List[Tuple[int, str]]]],
+                   max_tokens: int = MAX_TOKENS, overlap_percentage: int = OVERLAP_PERCENTAGE) -> List[Chunk]:
+    """
+    Pack paragraphs into chunks that never cross a section boundary.
+
+    Consecutive chunks of the same section overlap by whole trailing paragraphs
+    of up to ``overlap_percentage`` of ``max_tokens``, and every chunk is prefixed
+    with its section heading so it reads on its own. A chunk's page is the page
+    its first paragraph starts on.
+    """
+    overlap_tokens = max_tokens * overlap_percentage // 100
+    chunks = []
+
+    for heading, paragraphs in sections:
+        budget = max_tokens - count_tokens(heading)
+        units = [(page, piece) for page, paragraph in paragraphs for piece in split_oversized(paragraph, budget)]
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+
+        def emit():
+            body = "\n\n".join(text for _, text in current)
+            text = f"{heading}\n\n{body}" if heading else body
+            chunks.append(Chunk(source=source, section=heading, page=current[0][0], text=text))
+
+        for unit in units:
+            tokens = count_tokens(unit[1])
+            if current and current_tokens + tokens > budget:
+                emit()
+                carry, carry_tokens = [], 0
+                for previous in reversed(current):
+                    previous_tokens = count_tokens(previous[1])
+                    if carry_tokens + previous_tokens > overlap_tokens or carry_tokens + previous_tokens + tokens > budget:
+                        break
+                    carry.insert(0, previous)
+                    carry_tokens += previous_tokens
+                current, current_tokens = carry, carry_tokens
+            current.append(unit)
+            current_tokens += tokens
+        if current:
+            emit()
+
+    return chunks
+
+
+def load_manifest(output_dir: str) -> Dict[str, Dict]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def chunk_file_name(chunk: Chunk) -> str:
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "-", os.path.splitext(chunk.source)[0]).strip("-")
+    return f"{stem}-{chunk.digest[:20]}.txt"
+
+
+def write_chunk(output_dir: str, chunk: Chunk, file_name: str) -> None:
+    with open(os.path.join(output_dir, file_name), 'w', encoding='utf-8') as f:
+        f.write(chunk.text)
+    write_chunk_metadata(output_dir, chunk, file_name)
+
+
+def write_chunk_metadata(output_dir: str, chunk: Chunk, file_name: str) -> None:
+    # Bedrock knowledge bases pick up "<object>.metadata.json" sidecars as filterable attributes
+    with open(os.path.join(output_dir, f"{file_name}.metadata.json"), 'w') as f:
+        json.dump({"metadataAttributes": {"source": chunk.source, "section": chunk.section, "page": chunk.page}}, f)
+
+
+def process_manuals(manuals_dir: str, output_dir: str, max_tokens: int = MAX_TOKENS,
+                    overlap_percentage: int = OVERLAP_PERCENTAGE, max_workers: Optional[int] = None) -> PipelineReport:
+    """
+    Turn the PDF manuals into section-aware chunk files ready for a knowledge base
+    with chunking disabled.
+
+    Manuals whose content hash is unchanged since the last run are not extracted
+    again, and chunk files are named by content hash so unchanged chunks keep the
+    same object key and are not re-uploaded or re-embedded.
+
+    Args:
+        manuals_dir (str): Directory with the source PDF manuals.
+        output_dir (str): Directory the chunk files are written to.
+        max_tokens (int): Approximate maximum tokens per chunk.
+        overlap_percentage (int): Overlap between consecutive chunks of a section.
+        max_workers (Optional[int]): Extraction processes, defaults to the CPU count.
+
+    Returns:
+        PipelineReport: Throughput and reuse statistics.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    report = PipelineReport()
+    started = time.perf_counter()
+
+    previous = load_manifest(output_dir)
+    settings = {"max_tokens": max_tokens, "overlap_percentage": overlap_percentage, "format": CHUNK_FORMAT}
+    manifest: Dict[str, Dict] = {}
+    digests: Dict[str, str] = {}
+    stale: List[str] = []
+
+    pdfs = sorted(name for name in os.listdir(manuals_dir) if name.lower().endswith(".pdf"))
+    report.manuals = len(pdfs)
+
+    for name in pdfs:
+        digest = digests[name] = file_digest(os.path.join(manuals_dir, name))
+        entry = previous.get(name)
+        if entry and entry["digest"] == digest and entry.get("settings") == settings and all(
+            os.path.exists(os.path.join(output_dir, file_name)) for file_name in entry["files"]
+        ):
+            manifest[name] = entry
+            report.manuals_reused += 1
+        else:
+            stale.append(name)
+
+    tasks = []
+    for name in stale:
+        path = os.path.join(manuals_dir, name)
+        pages = count_pages(path)
+        tasks.extend((path, start, min(start + PAGES_PER_TASK, pages)) for start in range(0, pages, PAGES_PER_TASK))
+
+    extracted: Dict[str, List[Tuple[int, str]]] = {name: [] for name in stale}
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for task, pages in zip(tasks, executor.map(extract_pages, tasks)):
+                extracted[os.path.basename(task[0])].extend(pages)
+
+    existing = set(os.listdir(output_dir))
+    for name in stale:
+        pages = [(number, normalize_text(text)) for number, text in sorted(extracted[name])]
+        report.pages += len(pages)
+        files = []
+        for chunk in chunk_sections(name, split_sections(pages), max_tokens, overlap_percentage):
+            file_name = chunk_file_name(chunk)
+            if file_name in files:
+                continue
+            if file_name in existing:
+                # The text is unchanged, but the page it starts on may have moved
+                write_chunk_metadata(output_dir, chunk, file_name)
+                report.chunks_reused += 1
+            else:
+                write_chunk(output_dir, chunk, file_name)
+                report.chunks_written += 1
+            files.append(file_name)
+        manifest[name] = {"digest": digests[name], "settings": settings, "pages": len(pages), "files": files}
+
+    for name, entry in manifest.items():
+        report.chunks += len(entry["files"])
+        if name not in stale:
+            report.chunks_reused += len(entry["files"])
+        report.files.extend(entry["files"])
+
+    keep = set(report.files) | {f"{file_name}.metadata.json" for file_name in report.files} | {MANIFEST_FILE, ".gitignore"}
+    for file_name in existing - keep:
+        os.remove(os.path.join(output_dir, file_name))
+        if not file_name.endswith(".metadata.json"):
+            report.chunks_removed += 1
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    report.seconds = time.perf_counter() - started
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+    parser = argparse.ArgumentParser(description="Pre-process owners' manuals into deduplicated knowledge base chunks.")
+    parser.add_argument("--manuals", default=os.path.join(assets_dir, "owners-manuals"))
+    parser.add_argument("--output", default=os.path.join(assets_dir, "manual-chunks"))
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--overlap-percentage", type=int, default=OVERLAP_PERCENTAGE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    process_manuals(args.manuals, args.output, args.max_tokens, args.overlap_percentage, args.workers)
@@ -0,0 +1,141 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import io
+import json
+import hashlib
+import argparse
+from typing import Dict, Iterable, Optional, Tuple
+
+THUMBNAIL_SIZE = (320, 250)
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_QUALITY = 70
+MANIFEST_FILE = "manifest.json"
+
+
+def referenced_images(data_file: str) -> Iterable[str]:
+    """
+    Collect the distinct image names referenced by the inventory preload file.
+
+    Args:
+        data_file (str): Path to the inventory preload JSON.
+
+    Returns:
+        Iterable[str]: Sorted, de-duplicated image names.
+    """
+    with open(data_file, 'r') as f:
+        data_array = json.load(f)
+    return sorted({data['images'] for data in data_array if data.get('images')})
+
+
+def render_thumbnail(source_path: str, size: Tuple[int, int] = THUMBNAIL_SIZE) -> bytes:
+    """
+    Resize and crop an image to the card size and encode it.
+
+    Args:
+        source_path (str): Path to the full-size source image.
+        size (Tuple[int, int]): Target width and height in pixels.
+
+    Returns:
+        bytes: The encoded thumbnail.
+    """
+    # Pillow is only needed at build time, never inside the frontend container
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        thumbnail = ImageOps.fit(image.convert("RGB"), size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=6)
+        return buffer.getvalue()
+
+
+def build_thumbnails(image_dir: str, output_dir: str, data_file: str) -> Dict[str, str]:
+    """
+    Produce content-addressed thumbnails for every image referenced by the inventory.
+
+    Thumbnails are written as ``<sha256>.webp`` and a manifest maps the original
+    image name to its thumbnail file, so unchanged images keep the same file name
+    across builds and stale files are removed.
+
+    Args:
+        image_dir (str): Directory holding the full-size part images.
+        output_dir (str): Directory the thumbnails and manifest are written to.
+        data_file (str): Path to the inventory preload JSON.
+
+    Returns:
+        Dict[str, str]: The manifest of image name to thumbnail file name.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {}
+
+    for image_name in referenced_images(data_file):
+        source_path = os.path.join(image_dir, image_name)
+        if not os.path.isfile(source_path):
+            print(f"Skipping thumbnail for missing image: {image_name}")
+            continue
+
+        content = render_thumbnail(source_path)
+        file_name = f"{hashlib.sha256(content).hexdigest()}.{THUMBNAIL_FORMAT.lower()}"
+        target_path = os.path.join(output_dir, file_name)
+        if not os.path.exists(target_path):
+            with open(target_path, 'wb') as f:
+                f.write(content)
+        manifest[image_name] = file_name
+
+    # Drop thumbnails that are no longer referenced
+    referenced = set(manifest.values())
+    for file_name in os.listdir(output_dir):
+        if file_name != MANIFEST_FILE and file_name not in referenced:
+            os.remove(os.path.join(output_dir, file_name))
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Built {len(referenced)} thumbnails for {len(manifest)} images into {output_dir}")
+    return manifest
+
+
+def clear_thumbnails(output_dir: str) -> None:
+    """Remove previously built thumbnails and their manifest."""
+    if not os.path.isdir(output_dir):
+        return
+    for file_name in os.listdir(output_dir):
+        path = os.path.join(output_dir, file_name)
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def build_thumbnails_if_available(image_dir: str, output_dir: str, data_file: str) -> Optional[Dict[str, str]]:
+    """
+    Build thumbnails when source images and Pillow are present, otherwise skip.
+    Without source images, thumbnails from an earlier build are removed so they
+    do not ship with the image.
+
+    Returns:
+        Optional[Dict[str, str]]: The manifest, or None if the step was skipped.
+    """
+    if not os.path.isdir(image_dir) or not any(
+        name != '.gitignore' for name in os.listdir(image_dir)
+    ):
+        clear_thumbnails(output_dir)
+        return None
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow is not installed, skipping part thumbnails")
+        return None
+    return build_thumbnails(image_dir, output_dir, data_file)
+
+
+if __name__ == "__main__":
+    assets_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+    repo_dir = os.path.dirname(os.path.dirname(assets_dir))
+
+    parser = argparse.ArgumentParser(description="Build content-addressed part thumbnails for the frontend.")
+    parser.add_argument("--images", default=os.path.join(assets_dir, "part-images"))
+    parser.add_argument("--data", default=os.path.join(assets_dir, "setup-opensearch", "inventory-index", "preload.json"))
+    parser.add_argument("--output", default=os.path.join(repo_dir, "src", "frontend", "static", "thumbnails"))
+    args = parser.parse_args()
+
+    build_thumbnails(args.images, args.output, args.data)
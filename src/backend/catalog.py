@@ -0,0 +1,180 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import mmap
+import struct
+from typing import Dict, Iterator, List, Optional
+
+# The on-disk layout must stay in sync with infra/pipeline/catalog.py
+MAGIC = b"CPCAT\x00\x00\x01"
+HEADER = struct.Struct("<8sIIIIIQQQQQQQQ")
+STRING_OFFSET = struct.Struct("<I")
+INVENTORY_RECORD = struct.Struct("<IIIIIIIIHB")
+FITMENT_DOC = struct.Struct("<IIIIIIII")
+FITMENT_PART = struct.Struct("<III")
+FITMENT_KEY = struct.Struct("<IHII")
+POSTING = struct.Struct("<I")
+YEAR = struct.Struct("<H")
+
+NONE = 0xFFFFFFFF
+KEY_SEPARATOR = "\x1f"
+
+
+class Catalog:
+    """
+    Read-only view over the binary parts catalog compiled by ``infra/pipeline/catalog.py``.
+
+    The file is memory-mapped and records are only decoded when they are accessed,
+    so opening a catalog costs the same regardless of its size.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Catalog {path} is truncated")
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.string_count, self.inventory_count, self.fitment_doc_count, self._fitment_part_count, self.fitment_key_count,
+         self._off_string_offsets, self._off_string_blob, self._off_inventory, self._off_fitment_docs,
+         self._off_fitment_parts, self._off_years, self._off_fitment_keys, self._off_postings) = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self._buffer.close()
+            raise ValueError(f"Unsupported catalog format in {path}")
+        if not self._valid_layout():
+            self._buffer.close()
+            raise ValueError(f"Catalog {path} is truncated or corrupt")
+
+    def _valid_layout(self) -> bool:
+        # Sections are written back to back, so a short or damaged file breaks one of these
+        size = len(self._buffer)
+        if not (self._off_string_offsets == HEADER.size
+                and self._off_string_blob == self._off_string_offsets + (self.string_count + 1) * STRING_OFFSET.size
+                and self._off_string_blob <= self._off_inventory
+                and self._off_fitment_docs == self._off_inventory + self.inventory_count * INVENTORY_RECORD.size
+                and self._off_fitment_parts == self._off_fitment_docs + self.fitment_doc_count * FITMENT_DOC.size
+                and self._off_years == self._off_fitment_parts + self._fitment_part_count * FITMENT_PART.size
+                and self._off_years <= self._off_fitment_keys
+                and (self._off_fitment_keys - self._off_years) % YEAR.size == 0
+                and self._off_postings == self._off_fitment_keys + self.fitment_key_count * FITMENT_KEY.size
+                and self._off_postings <= size
+                and (size - self._off_postings) % POSTING.size == 0):
+            return False
+        blob_size = STRING_OFFSET.unpack_from(self._buffer, self._off_string_blob - STRING_OFFSET.size)[0]
+        return self._off_string_blob + blob_size == self._off_inventory
+
+    def __len__(self) -> int:
+        return self.inventory_count
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        start, end = struct.unpack_from("<II", self._buffer, self._off_string_offsets + string_id * STRING_OFFSET.size)
+        return self._buffer[self._off_string_blob + start:self._off_string_blob + end]
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE:
+            return None
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def part_number(self, position: int) -> str:
+        """Part number of the inventory record at ``position`` in sorted order."""
+        string_id = struct.unpack_from("<I", self._buffer, self._off_inventory + position * INVENTORY_RECORD.size)[0]
+        return self.string(string_id)
+
+    def part_numbers(self) -> Iterator[str]:
+        for position in range(self.inventory_count):
+            yield self.part_number(position)
+
+    def record(self, position: int) -> Dict:
+        """Decode the inventory record at ``position`` into the preload document format."""
+        (part_number, manufacturer, category, part_name, description, currency, images,
+         price, rating, in_stock) = INVENTORY_RECORD.unpack_from(self._buffer, self._off_inventory + position * INVENTORY_RECORD.size)
+        record = {
+            "manufacturer": self.string(manufacturer),
+            "category": self.string(category),
+            "part_name": self.string(part_name),
+            "part_number": self.string(part_number),
+            "description": self.string(description),
+            "price": None if price == NONE else price / 100,
+            "currency": self.string(currency),
+            "in_stock": None if in_stock == 2 else bool(in_stock),
+            "rating": None if rating == 0xFFFF else rating / 100,
+            "images": self.string(images),
+        }
+        return {key: value for key, value in record.items() if value is not None}
+
+    def _lower_bound(self, part_number: bytes) -> int:
+        low, high = 0, self.inventory_count
+        while low < high:
+            middle = (low + high) // 2
+            string_id = struct.unpack_from("<I", self._buffer, self._off_inventory + middle * INVENTORY_RECORD.size)[0]
+            if self._string_bytes(string_id) < part_number:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, part_number: str) -> List[Dict]:
+        """
+        Get every inventory record with the given part number.
+
+        Args:
+            part_number (str): The exact part number, e.g. '76622-T0A-A01'.
+
+        Returns:
+            List[Dict]: Matching records, empty if the part is unknown.
+        """
+        encoded = part_number.encode('utf-8')
+        position = self._lower_bound(encoded)
+        records = []
+        while position < self.inventory_count:
+            string_id = struct.unpack_from("<I", self._buffer, self._off_inventory + position * INVENTORY_RECORD.size)[0]
+            if self._string_bytes(string_id) != encoded:
+                break
+            records.append(self.record(position))
+            position += 1
+        return records
+
+    def _fitment_doc(self, doc_id: int) -> Dict:
+        (manufacturer, make, model, category, parts_start, parts_count,
+         years_start, years_count) = FITMENT_DOC.unpack_from(self._buffer, self._off_fitment_docs + doc_id * FITMENT_DOC.size)
+        parts = []
+        for position in range(parts_start, parts_start + parts_count):
+            part_name, part_number, description = FITMENT_PART.unpack_from(self._buffer, self._off_fitment_parts + position * FITMENT_PART.size)
+            parts.append({
+                "part_name": self.string(part_name),
+                "part_number": self.string(part_number),
+                "description": self.string(description),
+            })
+        years = [year for (year,) in YEAR.iter_unpack(self._buffer[
+            self._off_years + years_start * YEAR.size:self._off_years + (years_start + years_count) * YEAR.size])]
+        return {
+            "manufacturer": self.string(manufacturer),
+            "make": self.string(make),
+            "model": self.string(model),
+            "years": years,
+            "category": self.string(category),
+            "parts": parts,
+        }
+
+    def compatible_parts(self, make: str, model: str, year: int) -> List[Dict]:
+        """
+        Get the fitment documents for a vehicle from the postings keyed by (make, model, year).
+
+        Returns:
+            List[Dict]: Documents in the compatible-parts preload format.
+        """
+        target = (f"{make.lower()}{KEY_SEPARATOR}{model.lower()}".encode('utf-8'), year)
+        low, high = 0, self.fitment_key_count
+        while low < high:
+            middle = (low + high) // 2
+            string_id, key_year, _, _ = FITMENT_KEY.unpack_from(self._buffer, self._off_fitment_keys + middle * FITMENT_KEY.size)
+            if (self._string_bytes(string_id), key_year) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.fitment_key_count:
+            return []
+        string_id, key_year, postings_start, postings_count = FITMENT_KEY.unpack_from(self._buffer, self._off_fitment_keys + low * FITMENT_KEY.size)
+        if (self._string_bytes(string_id), key_year) != target:
+            return []
+        start = self._off_postings + postings_start * POSTING.size
+        return [self._fitment_doc(doc_id) for (doc_id,) in POSTING.iter_unpack(self._buffer[start:start + postings_count * POSTING.size])]
@@ -3,6 +3,11 @@
 
 import os
 import json
+import time
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Union
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated
@@ -17,10 +22,55 @@ from requests_aws4auth import AWS4Auth
 
 import boto3
 
+from manual_search import ManualIndex
+from catalog import Catalog
+from part_lookup import PartNumberIndex
+from profiling import profiled
+from routing import EndpointRouter, RoutedClient, is_endpoint_failure, parse_endpoints
+
 tracer = Tracer()
 logger = Logger()
 app = BedrockAgentResolver()
 
+def load_manual_index() -> Optional[ManualIndex]:
+    path = os.environ.get('MANUAL_INDEX_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), "manual_index.bin"))
+    if not os.path.exists(path):
+        logger.info(f"Manual index not found at '{path}', /search_manual is disabled")
+        return None
+    index = ManualIndex(path)
+    logger.info(f"Memory-mapped manual index with {index.doc_count} passages and {index.term_count} terms")
+    return index
+
+@functools.lru_cache(maxsize=1)
+def load_catalog() -> Optional[Catalog]:
+    path = os.environ.get('CATALOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.bin"))
+    if not os.path.exists(path):
+        logger.info(f"Catalog not found at '{path}', /lookup_part_number and the inventory fallback are disabled")
+        return None
+    catalog = Catalog(path)
+    logger.info(f"Memory-mapped catalog with {len(catalog)} inventory records")
+    return catalog
+
+@functools.lru_cache(maxsize=1)
+def load_part_number_index() -> Optional[PartNumberIndex]:
+    # Built on the first /lookup_part_number call rather than at import, so other
+    # operations do not pay for the typo index on a cold start
+    catalog = load_catalog()
+    if catalog is None:
+        return None
+    index = PartNumberIndex(catalog)
+    logger.info(f"Built part number index with {len(index)} part numbers")
+    return index
+
+# Loaded once per execution environment so warm invocations only pay for the query
+manual_index = load_manual_index()
+
+MGET_CHUNK_SIZE = int(os.environ.get('MGET_CHUNK_SIZE', "100"))
+MGET_MAX_WORKERS = int(os.environ.get('MGET_MAX_WORKERS', "8"))
+CATEGORY_CACHE_TTL = float(os.environ.get('CATEGORY_CACHE_TTL', "300"))
+CATEGORY_CACHE_SIZE = int(os.environ.get('CATEGORY_CACHE_SIZE', "1024"))
+CATEGORY_AGG_SIZE = int(os.environ.get('CATEGORY_AGG_SIZE', "100"))
+
 # Updated Pydantic models for input validation
 class PartFromInventoryRequest(BaseModel):
     part_ids: Union[str, List[str]] = Field(..., description="A single part ID or a list of part IDs to retrieve detailed information of the part from the inventory. Example: '76622-T0A-A01' or ['76622-T0A-A01', '76630-T0A-A01']")
@@ -31,23 +81,120 @@ class CompatiblePartsRequest(BaseModel):
     year: int = Field(..., description="Year of the vehicle. Example: 2021")
     category: Optional[str] = Field(None, description="Category of the part. This field is optional but highly recommended for more accurate and relevant results. Example: 'Wipers' or 'Wiper Blades'")
 
-def get_search_client():
-    logger.info("Initializing search client")
-    region = os.environ['AWS_REGION']
-    host = os.environ['OPENSEARCH_ENDPOINT']
+class CategoryListRequest(BaseModel):
+    make: str = Field(..., description="Make of the vehicle. Example: 'Honda'")
+    model: str = Field(..., description="Model of the vehicle. Example: 'CR-V'")
+    year: int = Field(..., description="Year of the vehicle. Example: 2021")
+
+class PartNumberLookupRequest(BaseModel):
+    part_number: str = Field(..., description="A full, partial or possibly mistyped part number as read by the customer. Separators and case are ignored. Example: '76622-T0A' or 'FD3Z13008A'")
+    limit: int = Field(5, ge=1, le=20, description="Maximum number of prefix matches and of suggestions to return. Example: 5")
+
+class ManualSearchRequest(BaseModel):
+    query: str = Field(..., description="Keywords describing the specification to look up in the owners' manuals. Include make and model. Example: 'CR-V low beam bulb' or 'F-150 wiper blade length'")
+    top_k: int = Field(3, ge=1, le=10, description="Number of manual passages to return. Example: 3")
+
+class TTLCache:
+    """
+    Small LRU cache whose entries expire ``ttl`` seconds after they are stored.
+    Lives for the execution environment, so warm invocations share it.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+category_cache = TTLCache(CATEGORY_CACHE_TTL, CATEGORY_CACHE_SIZE)
+
+def create_opensearch_client(host: str, region: str) -> OpenSearch:
     service = 'aoss'
     credentials = boto3.Session().get_credentials()
     awsauth = AWS4Auth(credentials.access_key, credentials.secret_key, region, service, session_token=credentials.token)
 
-    client = OpenSearch(
+    return OpenSearch(
         hosts=[{'host': host, 'port': 443}],
         http_auth=awsauth,
         use_ssl=True,
         verify_certs=True,
         connection_class=RequestsHttpConnection
     )
-    logger.info("OpenSearch client initialized successfully")
-    return client
+
+# Kept for the execution environment so endpoint latency and health carry over between invocations
+search_router: Optional[EndpointRouter] = None
+
+def get_search_client():
+    """
+    Get a client for the collection in OPENSEARCH_ENDPOINT, or, when OPENSEARCH_ENDPOINTS
+    lists several collections, a client that routes each call to the fastest healthy one.
+    """
+    global search_router
+    logger.info("Initializing search client")
+    region = os.environ['AWS_REGION']
+    endpoints = os.environ.get('OPENSEARCH_ENDPOINTS', "").strip()
+    if not endpoints:
+        client = create_opensearch_client(os.environ['OPENSEARCH_ENDPOINT'], region)
+        logger.info("OpenSearch client initialized successfully")
+        return client
+
+    if search_router is None:
+        parsed = parse_endpoints(endpoints, region)
+        if not parsed:
+            raise ValueError(f"OPENSEARCH_ENDPOINTS does not list any endpoints: {endpoints!r}")
+        search_router = EndpointRouter({
+            host: create_opensearch_client(host, endpoint_region) for host, endpoint_region in parsed
+        })
+        logger.info(f"Routing searches across {len(search_router.clients)} OpenSearch endpoints")
+    logger.info("Endpoint health", extra={"endpoints": search_router.snapshot()})
+    return RoutedClient(search_router)
+
+def get_documents_by_id(client, index_name: str, ids: List[str]) -> List[Dict]:
+    """
+    Fetch documents by primary key with _mget, splitting large ID lists into chunks
+    fetched concurrently. Results keep the order of ``ids``; duplicate and unknown
+    IDs are skipped. Records that share an ID are stored as ``variants`` of one
+    document and come back as separate results with that ID.
+    """
+    ids = list(dict.fromkeys(ids))
+    chunks = [ids[i:i + MGET_CHUNK_SIZE] for i in range(0, len(ids), MGET_CHUNK_SIZE)]
+
+    def fetch(chunk: List[str]) -> List[Dict]:
+        response = client.mget(index=index_name, body={"ids": chunk})
+        results = []
+        for doc in response['docs']:
+            if not doc.get('found'):
+                continue
+            source = dict(doc["_source"])
+            variants = source.pop("variants", [])
+            results.extend({"_index": doc["_index"], "_id": doc["_id"], "_source": record} for record in [source, *variants])
+        return results
+
+    if len(chunks) <= 1:
+        return fetch(chunks[0]) if chunks else []
+
+    with ThreadPoolExecutor(max_workers=min(MGET_MAX_WORKERS, len(chunks))) as executor:
+        # map() yields in submission order, so the merged list follows the request order
+        return [doc for docs in executor.map(fetch, chunks) for doc in docs]
 
 @app.post("/get_part_from_inventory", description="Get part information from the inventory based on part ID(s).")
 @tracer.capture_method
@@ -61,24 +208,67 @@ def get_part_from_inventory(
     # Convert single part_id to list if necessary
     part_ids = request.part_ids if isinstance(request.part_ids, list) else [request.part_ids]
 
-    search_query = {
-        "query": {
-            "terms": {
-                "part_number": part_ids
-            }
-        }
-    }
-    
-    logger.info("Constructed search query", extra={"query": search_query})
-
     try:
-        logger.info(f"Executing search on index '{index_name}'")
-        results = client.search(index=index_name, body=search_query)
-        logger.info(f"Search completed successfully. Found {results['hits']['total']['value']} results.")
-        return {"results": results['hits']['hits']}
+        # Inventory documents are keyed by part_number, so this is a primary-key lookup
+        logger.info(f"Fetching {len(part_ids)} part(s) by ID from index '{index_name}'")
+        results = get_documents_by_id(client, index_name, part_ids)
+        logger.info(f"Lookup completed successfully. Found {len(results)} results.")
+        return {"results": results}
     except Exception as e:
         logger.info(f"Error searching inventory: {str(e)}")
-        raise
+        catalog = load_catalog() if is_endpoint_failure(e) else None
+        if catalog is None:
+            raise
+
+    # OpenSearch is unreachable, so answer from the build-time snapshot rather than fail the turn
+    results = [
+        {"_index": "catalog", "_id": part_id, "_source": record}
+        for part_id in dict.fromkeys(part_ids) for record in catalog.get(part_id)
+    ]
+    logger.info(f"Served {len(results)} results from the bundled catalog.")
+    return {
+        "results": results,
+        "message": "The inventory is unavailable, so these results come from a catalog snapshot. Price and stock may be out of date."
+    }
+
+def expand_fitment_hits(client, hits: List[Dict]) -> List[Dict]:
+    """
+    Rebuild fitment hits into the original response format: year ranges become the
+    list of years and part IDs are resolved against the shared parts table.
+    """
+    table_index = os.environ.get('COMPATIBLE_PARTS_TABLE_INDEX', "compatible-parts-table")
+    part_ids = [part_id for hit in hits for part_id in hit['_source'].get('part_ids', [])]
+    parts = {doc['_id']: doc['_source'] for doc in get_documents_by_id(client, table_index, part_ids)}
+
+    expanded = []
+    for hit in hits:
+        source = hit['_source']
+        years = sorted(
+            {year for year_range in source.get('year_ranges', []) for year in range(year_range['gte'], year_range['lte'] + 1)},
+            reverse=True,
+        )
+        expanded.append({
+            **{key: value for key, value in hit.items() if key != '_source'},
+            "_source": {
+                "manufacturer": source.get('manufacturer'),
+                "make": source.get('make'),
+                "model": source.get('model'),
+                "years": years,
+                "category": source.get('category'),
+                "parts": [
+                    {key: parts[part_id].get(key) for key in ('part_name', 'part_number', 'description')}
+                    for part_id in source.get('part_ids', []) if part_id in parts
+                ],
+            },
+        })
+    return expanded
+
+def vehicle_conditions(make: str, model: str, year: int) -> List[Dict]:
+    return [
+        {"match": {"make": make}},
+        {"match": {"model": model}},
+        {"term": {"year_ranges": year}}
+    ]
 
 @app.post("/get_compatible_parts", description="Get parts that are compatible with a specific vehicle make, model, and year. Using the category field is highly recommended for more accurate and relevant results.")
 @tracer.capture_method
@@ -89,17 +279,13 @@ def get_compatible_parts(
     client = get_search_client()
     index_name = os.environ.get('COMPATIBLE_PARTS_INDEX' , "compatible-parts")
 
-    must_conditions = [
-        {"match": {"make": request.make}},
-        {"match": {"model": request.model}},
-        {"term": {"years": request.year}}
-    ]
+    must_conditions = vehicle_conditions(request.make, request.model, request.year)
     
     if request.category:
         must_conditions.append({
             "multi_match": {
                 "query": request.category,
-                "fields": ["category", "parts.part_name"],
+                "fields": ["category", "part_names"],
                 "type": "best_fields",
                 "fuzziness": "AUTO"
             }
@@ -119,13 +305,107 @@ def get_compatible_parts(
         logger.info(f"Executing search on index '{index_name}'")
         results = client.search(index=index_name, body=search_query)
         logger.info(f"Search completed successfully. Found {results['hits']['total']['value']} results.")
-        return {"results": results['hits']['hits']}
+        return {"results": expand_fitment_hits(client, results['hits']['hits'])}
     except Exception as e:
         logger.info(f"Error searching compatible parts: {str(e)}")
         raise
 
+@app.post("/list_categories", description="List the part categories available for a specific vehicle make, model, and year, with the number of compatible parts in each. Use this to answer what parts are available for a vehicle before asking for a category, instead of calling get_compatible_parts without one.")
+@tracer.capture_method
+def list_categories(
+    request: Annotated[CategoryListRequest, Body(description="Vehicle information to list part categories for.")]
+) -> Dict:
+    logger.info("Received request to list categories", extra={"request": request.dict()})
+    cache_key = (request.make.lower(), request.model.lower(), request.year)
+    cached = category_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Serving categories from cache")
+        return cached
+
+    client = get_search_client()
+    index_name = os.environ.get('COMPATIBLE_PARTS_INDEX' , "compatible-parts")
+
+    # size 0 returns only the aggregation, not the fitment documents
+    search_query = {
+        "size": 0,
+        "query": {
+            "bool": {
+                "must": vehicle_conditions(request.make, request.model, request.year)
+            }
+        },
+        "aggs": {
+            "categories": {
+                "terms": {"field": "category.raw", "size": CATEGORY_AGG_SIZE},
+                "aggs": {
+                    "parts": {"cardinality": {"field": "part_ids", "precision_threshold": 1000}}
+                }
+            }
+        }
+    }
+
+    logger.info("Constructed search query", extra={"query": search_query})
+
+    try:
+        logger.info(f"Executing aggregation on index '{index_name}'")
+        results = client.search(index=index_name, body=search_query)
+        buckets = results['aggregations']['categories']['buckets']
+        logger.info(f"Aggregation completed successfully. Found {len(buckets)} categories.")
+        response = {
+            "make": request.make,
+            "model": request.model,
+            "year": request.year,
+            "categories": [
+                {"category": bucket['key'], "parts": bucket['parts']['value']}
+                for bucket in buckets
+            ]
+        }
+        category_cache.put(cache_key, response)
+        return response
+    except Exception as e:
+        logger.info(f"Error listing categories: {str(e)}")
+        raise
+
+@app.post("/lookup_part_number", description="Look up a full, partial or possibly mistyped part number. Returns exact matches, part numbers starting with it, and close matches within two edits when there is no exact match. Use this when get_part_from_inventory finds nothing for a part number the customer provided, then call get_part_from_inventory with the matching part number.")
+@tracer.capture_method
+def lookup_part_number(
+    request: Annotated[PartNumberLookupRequest, Body(description="Part number to look up.")]
+) -> Dict:
+    logger.info("Received request to look up part number", extra={"request": request.dict()})
+
+    part_number_index = load_part_number_index()
+    if part_number_index is None:
+        return {"exact": [], "prefix_matches": [], "suggestions": [], "message": "Part number lookup is not available"}
+
+    try:
+        result = part_number_index.lookup(request.part_number, request.limit)
+        logger.info(f"Part number lookup completed successfully. Found {len(result['exact'])} exact, "
+                    f"{result['prefix_match_count']} prefix and {len(result['suggestions'])} suggested matches.")
+        return result
+    except Exception as e:
+        logger.info(f"Error looking up part number: {str(e)}")
+        raise
+
+@app.post("/search_manual", description="Search the owners' manuals for exact specifications such as bulb sizes, wiper blade lengths, fluid capacities or torque values. Returns the best matching manual passages with their source manual, section and page.")
+@tracer.capture_method
+def search_manual(
+    request: Annotated[ManualSearchRequest, Body(description="Specification keywords to look up in the owners' manuals.")]
+) -> Dict:
+    logger.info("Received request to search manuals", extra={"request": request.model_dump_json()})
+
+    if manual_index is None:
+        return {"results": [], "message": "Manual search index is not available"}
+
+    try:
+        results = manual_index.search(request.query, request.top_k)
+        logger.info(f"Manual search completed successfully. Found {len(results)} results.")
+        return {"results": results}
+    except Exception as e:
+        logger.info(f"Error searching manuals: {str(e)}")
+        raise
+
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
+@profiled
 def lambda_handler(event: dict, context: LambdaContext) -> dict:
     logger.info("Lambda function invoked", extra={"event": event})
     try:
@@ -143,5 +423,5 @@ if __name__ == "__main__":
     print(app.get_openapi_json_schema(
         title="Car Parts Inventory API",
         version="1.0.0",
-        description="This API provides endpoints for querying car parts inventory and compatibility information. Use the get_part_from_inventory endpoint to retrieve specific parts from the inventory by their IDs, and the get_compatible_parts endpoint to find parts compatible with specific vehicles. For get_compatible_parts, the category field is optional but highly recommended for more accurate and relevant results."
+        description="This API provides endpoints for querying car parts inventory and compatibility information. Use the get_part_from_inventory endpoint to retrieve specific parts from the inventory by their IDs, the get_compatible_parts endpoint to find parts compatible with specific vehicles, the list_categories endpoint to list the part categories available for a vehicle, the lookup_part_number endpoint to resolve partial or mistyped part numbers, and the search_manual endpoint to look up exact specifications in the owners' manuals. For get_compatible_parts, the category field is optional but highly recommended for more accurate and relevant results."
     ))
\ No newline at end of file
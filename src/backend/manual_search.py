@@ -0,0 +1,131 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import re
+import json
+import mmap
+import math
+import heapq
+import struct
+from typing import Dict, List, Optional
+
+# The on-disk layout and tokenizer must stay in sync with infra/pipeline/bm25.py
+MAGIC = b"CPBM25\x00\x01"
+HEADER = struct.Struct("<8sIIfQQQQQ")
+TERM_ENTRY = struct.Struct("<IIII")
+POSTING = struct.Struct("<IH")
+DOC_ENTRY = struct.Struct("<IQI")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with you your".split()
+)
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[.\-/]", token) if part and part not in STOPWORDS)
+    return tokens
+
+
+class ManualIndex:
+    """
+    Read-only BM25 index over owners' manual passages, memory-mapped from the file
+    built by ``infra/pipeline/bm25.py``. Only the term table entries probed by a
+    query and the passages returned are decoded.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"Manual index {path} is truncated")
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.doc_count, self.term_count, self.average_length, self._off_term_table,
+         self._off_term_blob, self._off_postings, self._off_doc_table, self._off_doc_blob) = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self._buffer.close()
+            raise ValueError(f"Unsupported manual index format in {path}")
+        if not self._valid_layout():
+            self._buffer.close()
+            raise ValueError(f"Manual index {path} is truncated or corrupt")
+
+    def _valid_layout(self) -> bool:
+        # Sections are written back to back, so a short or damaged file breaks one of these
+        size = len(self._buffer)
+        if not (self._off_term_table == HEADER.size
+                and self._off_term_blob == self._off_term_table + self.term_count * TERM_ENTRY.size
+                and self._off_term_blob <= self._off_postings <= self._off_doc_table
+                and (self._off_doc_table - self._off_postings) % POSTING.size == 0
+                and self._off_doc_blob == self._off_doc_table + self.doc_count * DOC_ENTRY.size
+                and self._off_doc_blob <= size):
+            return False
+        if not self.doc_count:
+            return self._off_doc_blob == size
+        _, offset, length = DOC_ENTRY.unpack_from(self._buffer, self._off_doc_table + (self.doc_count - 1) * DOC_ENTRY.size)
+        return self._off_doc_blob + offset + length == size
+
+    def _term(self, position: int) -> bytes:
+        offset, length, _, _ = TERM_ENTRY.unpack_from(self._buffer, self._off_term_table + position * TERM_ENTRY.size)
+        start = self._off_term_blob + offset
+        return self._buffer[start:start + length]
+
+    def _find_term(self, term: bytes) -> Optional[int]:
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term(low) == term:
+            return low
+        return None
+
+    def _doc_length(self, doc_id: int) -> int:
+        return DOC_ENTRY.unpack_from(self._buffer, self._off_doc_table + doc_id * DOC_ENTRY.size)[0]
+
+    def passage(self, doc_id: int) -> Dict:
+        _, offset, length = DOC_ENTRY.unpack_from(self._buffer, self._off_doc_table + doc_id * DOC_ENTRY.size)
+        start = self._off_doc_blob + offset
+        return json.loads(self._buffer[start:start + length])
+
+    def search(self, query: str, top_k: int = 3) -> List[Dict]:
+        """
+        Score passages against the query with BM25.
+
+        Args:
+            query (str): Free text query, e.g. "CR-V low beam bulb".
+            top_k (int): Number of passages to return.
+
+        Returns:
+            List[Dict]: The best passages with their source, section, page and score.
+        """
+        scores: Dict[int, float] = {}
+        average_length = self.average_length or 1.0
+
+        for term in set(tokenize(query)):
+            position = self._find_term(term.encode('utf-8'))
+            if position is None:
+                continue
+            _, _, first, frequency = TERM_ENTRY.unpack_from(self._buffer, self._off_term_table + position * TERM_ENTRY.size)
+            idf = math.log(1 + (self.doc_count - frequency + 0.5) / (frequency + 0.5))
+            start = self._off_postings + first * POSTING.size
+            for doc_id, tf in POSTING.iter_unpack(self._buffer[start:start + frequency * POSTING.size]):
+                norm = K1 * (1 - B + B * self._doc_length(doc_id) / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        results = []
+        for doc_id, score in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1]):
+            passage = self.passage(doc_id)
+            passage["score"] = round(score, 4)
+            results.append(passage)
+        return results
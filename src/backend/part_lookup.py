@@ -0,0 +1,139 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple, Union
+
+NON_ALPHANUMERIC = re.compile(r"[^0-9A-Za-z]+")
+# Sorts after every normalized character, so bisecting for prefix + END finds the end of a prefix range
+PREFIX_END = "~"
+
+
+def normalize(part_number: str) -> str:
+    """Drop separators and case: '76622-t0a a01' -> '76622T0AA01'."""
+    return NON_ALPHANUMERIC.sub("", part_number).upper()
+
+
+def single_deletes(key: str) -> Iterable[str]:
+    return (key[:i] + key[i + 1:] for i in range(len(key)))
+
+
+def candidate_distance(query: str, key: str) -> int:
+    """
+    Edit distance between a query and a candidate from the single-deletion index,
+    counting an adjacent transposition as one edit. Candidates share a string after
+    at most one deletion from each side, so the distance is at most 2 and their
+    lengths differ by at most one.
+    """
+    if query == key:
+        return 0
+    if len(query) == len(key):
+        differences = [i for i, (a, b) in enumerate(zip(query, key)) if a != b]
+        if len(differences) == 1:
+            return 1
+        first = differences[0]
+        if (len(differences) == 2 and differences[1] == first + 1
+                and query[first] == key[first + 1] and query[first + 1] == key[first]):
+            return 1
+        return 2
+    shorter, longer = sorted((query, key), key=len)
+    return 1 if shorter in single_deletes(longer) else 2
+
+
+class PartNumberIndex:
+    """
+    In-memory lookup of part numbers by normalized exact match, prefix and typo.
+
+    Normalized part numbers are kept in a sorted array, so exact and prefix lookups
+    are a binary search. Typos are found with a single-deletion index: a query and
+    a part number are candidates when they share a string after deleting at most
+    one character from each. That covers every single insertion, deletion,
+    substitution and adjacent transposition. Candidates are ranked by edit distance.
+
+    Args:
+        catalog: The memory-mapped ``Catalog`` the part numbers are read from.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        groups: Dict[str, Dict[str, int]] = {}
+        for position, part_number in enumerate(catalog.part_numbers()):
+            # Duplicate inventory rows resolve to their first record
+            groups.setdefault(normalize(part_number), {}).setdefault(part_number, position)
+
+        self._keys: List[str] = sorted(groups)
+        self._parts: List[List[Tuple[str, int]]] = [list(groups[key].items()) for key in self._keys]
+
+        # Most variants belong to one key, so they map to an int and only collisions to a list
+        self._deletes: Dict[str, Union[int, List[int]]] = {}
+        for key_id, key in enumerate(self._keys):
+            for variant in {key, *single_deletes(key)}:
+                existing = self._deletes.get(variant)
+                if existing is None:
+                    self._deletes[variant] = key_id
+                elif isinstance(existing, int):
+                    self._deletes[variant] = [existing, key_id]
+                else:
+                    existing.append(key_id)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _describe(self, key_id: int, **extra) -> List[Dict]:
+        results = []
+        for part_number, position in self._parts[key_id]:
+            record = self.catalog.record(position)
+            results.append({
+                "part_number": part_number,
+                "part_name": record.get("part_name"),
+                "manufacturer": record.get("manufacturer"),
+                **extra,
+            })
+        return results
+
+    def _candidates(self, key: str) -> set:
+        candidates = set()
+        for variant in {key, *single_deletes(key)}:
+            found = self._deletes.get(variant)
+            if found is None:
+                continue
+            if isinstance(found, int):
+                candidates.add(found)
+            else:
+                candidates.update(found)
+        return candidates
+
+    def lookup(self, part_number: str, limit: int = 5) -> Dict:
+        """
+        Look up a possibly partial or mistyped part number.
+
+        Args:
+            part_number (str): Part number as read by the customer, e.g. '76622-T0A' or 'FD3Z13008A'.
+            limit (int): Maximum number of prefix matches and of suggestions.
+
+        Returns:
+            Dict: The normalized query, exact matches, prefix matches with the total
+                number of them, and suggestions within two edits when there is
+                no exact match.
+        """
+        key = normalize(part_number)
+        result = {"normalized": key, "exact": [], "prefix_matches": [], "prefix_match_count": 0, "suggestions": []}
+        if not key:
+            return result
+
+        start = bisect_left(self._keys, key)
+        end = bisect_left(self._keys, key + PREFIX_END, start)
+        if start < end and self._keys[start] == key:
+            result["exact"] = self._describe(start)
+            start += 1
+        result["prefix_match_count"] = end - start
+        for key_id in range(start, min(end, start + limit)):
+            result["prefix_matches"].extend(self._describe(key_id))
+
+        if not result["exact"]:
+            scored = [(candidate_distance(key, self._keys[key_id]), self._keys[key_id], key_id)
+                      for key_id in self._candidates(key)]
+            for distance, _, key_id in sorted(scored)[:limit]:
+                result["suggestions"].extend(self._describe(key_id, distance=distance))
+        return result
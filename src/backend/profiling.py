@@ -0,0 +1,179 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import sys
+import time
+import random
+import signal
+import functools
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aws_lambda_powertools import Logger
+
+logger = Logger(child=True)
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', "false").lower() == "true"
+# Fraction of invocations profiled without being asked; flagged requests are always profiled
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', "0"))
+PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', "5"))
+# 'wall' also samples time spent waiting on OpenSearch, 'cpu' only time on CPU
+PROFILING_CLOCK = os.environ.get('PROFILING_CLOCK', "wall")
+PROFILING_OUTPUT_DIR = os.environ.get('PROFILING_OUTPUT_DIR', "/tmp/profiles")
+PROFILING_TOP_N = int(os.environ.get('PROFILING_TOP_N', "10"))
+PROFILING_FLAG = "profile"
+
+TIMERS = {
+    "wall": (signal.ITIMER_REAL, signal.SIGALRM),
+    "cpu": (signal.ITIMER_PROF, signal.SIGPROF),
+}
+
+# Innermost frames of threads parked until there is work for them, such as idle pool workers
+PARKED_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that records the stacks of every thread on a timer signal.
+    Other threads are skipped while they are parked in a lock or condition wait, so
+    idle pool workers do not show up as the hottest functions of a wall-clock profile.
+
+    Stacks are counted in memory and written in the collapsed format
+    (``root;caller;callee count``), which flamegraph.pl and speedscope read
+    directly. Signals are delivered to the main thread, so the profiler can only
+    be started from there.
+    """
+
+    def __init__(self, interval_ms: float = PROFILING_INTERVAL_MS, clock: str = PROFILING_CLOCK):
+        self.interval = interval_ms / 1000
+        self.timer, self.signal = TIMERS[clock]
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._previous_handler = None
+        self._main_thread = threading.main_thread().ident
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _stack(self, thread_name: str, frame) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.append(thread_name)
+        return tuple(reversed(stack))
+
+    def _sample(self, signum, frame) -> None:
+        self.samples += 1
+        # The handler runs on the main thread, interrupting ``frame``
+        self.stacks[self._stack("main", frame)] += 1
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, thread_frame in sys._current_frames().items():
+            if ident != self._main_thread and not self._parked(thread_frame):
+                self.stacks[self._stack(names.get(ident, str(ident)), thread_frame)] += 1
+
+    @staticmethod
+    def _parked(frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in PARKED_FRAMES
+
+    def start(self) -> None:
+        self._previous_handler = signal.signal(self.signal, self._sample)
+        signal.setitimer(self.timer, self.interval, self.interval)
+
+    def stop(self) -> None:
+        signal.setitimer(self.timer, 0)
+        signal.signal(self.signal, self._previous_handler or signal.SIG_DFL)
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_self_time(self, top_n: int = PROFILING_TOP_N) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: The ``top_n`` functions by samples in which they were
+                the innermost frame, with the estimated time in ms and share of samples.
+        """
+        self_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack[-1]] += count
+        total = sum(self_samples.values()) or 1
+        return [
+            {"function": function, "samples": count, "selfMs": round(count * self.interval * 1000, 1),
+             "percent": round(count / total * 100, 1)}
+            for function, count in self_samples.most_common(top_n)
+        ]
+
+
+def requested(event: Dict[str, Any]) -> bool:
+    """Whether the agent session asked for this invocation to be profiled."""
+    if not isinstance(event, dict):
+        return False
+    attributes = event.get('sessionAttributes') or {}
+    return str(attributes.get(PROFILING_FLAG, "")).lower() in ("true", "1")
+
+
+def write_profile(profiler: SamplingProfiler, name: str, output_dir: str = PROFILING_OUTPUT_DIR) -> Optional[str]:
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{name}.collapsed")
+        with open(path, 'w') as f:
+            f.write(profiler.collapsed())
+        return path
+    except OSError as e:
+        logger.error(f"Failed to write profile: {e}")
+        return None
+
+
+def profiled(handler: Callable) -> Callable:
+    """
+    Profile a Lambda handler on sampled or flagged invocations.
+
+    Unless ``PROFILING_ENABLED`` is true the handler is returned unchanged, so
+    there is no overhead at all. Otherwise a ``PROFILING_SAMPLE_RATE`` fraction of
+    invocations is profiled, plus every invocation whose agent session attributes
+    set ``profile`` to true. Each profile is written as collapsed stacks to
+    ``PROFILING_OUTPUT_DIR`` and its top functions by self time are logged.
+    """
+    if not PROFILING_ENABLED:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event, context, *args, **kwargs):
+        if threading.current_thread() is not threading.main_thread() or not (
+                requested(event) or random.random() < PROFILING_SAMPLE_RATE):
+            return handler(event, context, *args, **kwargs)
+
+        profiler = SamplingProfiler()
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            return handler(event, context, *args, **kwargs)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            name = getattr(context, 'aws_request_id', None) or f"{int(time.time() * 1000)}"
+            path = write_profile(profiler, name)
+            logger.info("Invocation profile", extra={
+                "profile": {
+                    "path": path,
+                    "durationMs": round(elapsed_ms, 1),
+                    "samples": profiler.samples,
+                    "intervalMs": profiler.interval * 1000,
+                    "topSelfTime": profiler.top_self_time(),
+                }
+            })
+
+    return wrapper
@@ -0,0 +1,214 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from opensearchpy.exceptions import TransportError
+
+ROUTING_EWMA_ALPHA = float(os.environ.get('ROUTING_EWMA_ALPHA', "0.2"))
+# An endpoint is taken out of rotation when its error rate or consecutive failures reach these
+ROUTING_ERROR_THRESHOLD = float(os.environ.get('ROUTING_ERROR_THRESHOLD', "0.5"))
+ROUTING_MAX_FAILURES = int(os.environ.get('ROUTING_MAX_FAILURES', "3"))
+# Each error weighs as much as this multiple of the endpoint's latency when ranking
+ROUTING_ERROR_PENALTY = float(os.environ.get('ROUTING_ERROR_PENALTY', "4"))
+ROUTING_PROBE_INTERVAL = float(os.environ.get('ROUTING_PROBE_INTERVAL', "5"))
+# Bounds how long a probe of an unreachable endpoint holds a probe worker
+ROUTING_PROBE_TIMEOUT = float(os.environ.get('ROUTING_PROBE_TIMEOUT', "1"))
+ROUTING_PROBE_INDEX = os.environ.get('ROUTING_PROBE_INDEX', os.environ.get('INVENTORY_INDEX', "inventory"))
+
+
+def parse_endpoints(value: str, default_region: str) -> List[Tuple[str, str]]:
+    """
+    Parse a comma-separated endpoint list into (host, region) pairs. The region is
+    taken from ``host@region``, from a ``<id>.<region>.aoss.amazonaws.com`` host,
+    or else ``default_region``.
+    """
+    endpoints = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, region = entry.partition('@')
+        labels = host.split('.')
+        if not region and len(labels) > 2 and labels[2] == 'aoss':
+            region = labels[1]
+        endpoints.append((host, region or default_region))
+    return endpoints
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """Connection errors, timeouts, throttles and 5xx count against an endpoint; a bad request would fail anywhere."""
+    if isinstance(error, TransportError):
+        status = error.status_code
+        return not isinstance(status, int) or status >= 500 or status == 429
+    return True
+
+
+class EndpointStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.last_probed = 0.0
+
+    def score(self) -> float:
+        # Unmeasured endpoints rank first so every endpoint gets a latency sample
+        latency = self.latency_ms if self.latency_ms is not None else 0.0
+        return latency * (1 + ROUTING_ERROR_PENALTY * self.error_rate)
+
+
+class EndpointRouter:
+    """
+    Sends each call to the endpoint with the lowest exponentially weighted latency,
+    penalized by its weighted error rate, and fails over to the next endpoint when
+    a call fails.
+
+    Latency and errors are measured on real traffic. An endpoint that reaches the
+    error rate or consecutive failure threshold is taken out of rotation and
+    brought back after a successful probe. Probes only go to endpoints that are
+    out of rotation, at most once per ``probe_interval`` each. A call starts the
+    probes that are due on a small pool and does not wait for them, so it is never
+    slowed down by an unreachable endpoint. There is no timer thread, because a
+    Lambda execution environment is frozen between invocations. If every endpoint
+    is unhealthy, calls still go to them, best score first.
+
+    Args:
+        clients (Dict[str, Any]): OpenSearch clients by endpoint name.
+        probe (Callable[[Any], Any]): Cheap request used to probe an endpoint.
+    """
+
+    def __init__(self, clients: Dict[str, Any], probe: Optional[Callable[[Any], Any]] = None,
+                 alpha: float = ROUTING_EWMA_ALPHA, probe_interval: float = ROUTING_PROBE_INTERVAL):
+        if not clients:
+            raise ValueError("EndpointRouter needs at least one endpoint")
+        self.clients = clients
+        self.stats = {name: EndpointStats(name) for name in clients}
+        self.probe = probe or (lambda client: client.search(index=ROUTING_PROBE_INDEX, body={"size": 0},
+                                                            request_timeout=ROUTING_PROBE_TIMEOUT))
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._probing: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=len(clients), thread_name_prefix="endpoint-probe")
+
+    def ranked(self) -> List[str]:
+        with self._lock:
+            stats = sorted(self.stats.values(), key=lambda endpoint: (not endpoint.healthy, endpoint.score()))
+        return [endpoint.name for endpoint in stats]
+
+    def record(self, name: str, latency_ms: float, failed: bool) -> None:
+        with self._lock:
+            endpoint = self.stats[name]
+            endpoint.requests += 1
+            endpoint.error_rate += self.alpha * ((1.0 if failed else 0.0) - endpoint.error_rate)
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.healthy and (endpoint.consecutive_failures >= ROUTING_MAX_FAILURES
+                                         or endpoint.error_rate >= ROUTING_ERROR_THRESHOLD):
+                    endpoint.healthy = False
+                    # The first probe waits a full interval, the endpoint has only just failed
+                    endpoint.last_probed = time.monotonic()
+                return
+            endpoint.consecutive_failures = 0
+            if endpoint.latency_ms is None:
+                endpoint.latency_ms = latency_ms
+            else:
+                endpoint.latency_ms += self.alpha * (latency_ms - endpoint.latency_ms)
+
+    def call(self, operation: Callable[[Any], Any]) -> Any:
+        """
+        Run ``operation(client)`` on the best endpoint, failing over in rank order.
+
+        Raises:
+            Exception: The error from the last endpoint tried, or the first error
+                that is not an endpoint failure, such as a bad request.
+        """
+        self.probe_due()
+        error = None
+        for name in self.ranked():
+            started = time.perf_counter()
+            try:
+                result = operation(self.clients[name])
+            except Exception as e:
+                if not is_endpoint_failure(e):
+                    raise
+                self.record(name, (time.perf_counter() - started) * 1000, failed=True)
+                error = e
+                continue
+            self.record(name, (time.perf_counter() - started) * 1000, failed=False)
+            return result
+        raise error
+
+    def _probe(self, name: str) -> None:
+        started = time.perf_counter()
+        try:
+            self.probe(self.clients[name])
+        except Exception:
+            self.record(name, (time.perf_counter() - started) * 1000, failed=True)
+            return
+        finally:
+            with self._lock:
+                self._probing.discard(name)
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            endpoint = self.stats[name]
+            if not endpoint.healthy:
+                # A recovered endpoint competes on its current latency, not on what it was before it failed;
+                # if it keeps failing, the consecutive failure threshold trips it again
+                endpoint.healthy = True
+                endpoint.error_rate = 0.0
+                endpoint.consecutive_failures = 0
+                endpoint.latency_ms = latency_ms
+
+    def probe_due(self) -> List[Future]:
+        """
+        Start probes of the endpoints that are out of rotation and were not probed
+        within ``probe_interval``, without waiting for them.
+
+        Returns:
+            List[Future]: The probes that were started.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [endpoint.name for endpoint in self.stats.values()
+                   if not endpoint.healthy and endpoint.name not in self._probing
+                   and now - endpoint.last_probed >= self.probe_interval]
+            for name in due:
+                self.stats[name].last_probed = now
+                self._probing.add(name)
+        return [self._executor.submit(self._probe, name) for name in due]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"endpoint": endpoint.name, "healthy": endpoint.healthy,
+                 "latencyMs": None if endpoint.latency_ms is None else round(endpoint.latency_ms, 1),
+                 "errorRate": round(endpoint.error_rate, 3), "requests": endpoint.requests,
+                 "failures": endpoint.failures}
+                for endpoint in self.stats.values()
+            ]
+
+
+class RoutedClient:
+    """The subset of the OpenSearch client used by the action group, routed per call."""
+
+    def __init__(self, router: EndpointRouter):
+        self.router = router
+
+    def search(self, **kwargs) -> Dict:
+        return self.router.call(lambda client: client.search(**kwargs))
+
+    def mget(self, **kwargs) -> Dict:
+        return self.router.call(lambda client: client.mget(**kwargs))
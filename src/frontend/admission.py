@@ -0,0 +1,250 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+from trace_analyzer import percentile
+
+logger = logging.getLogger(__name__)
+
+# Set the rate and burst to the account's InvokeAgent quota
+AGENT_RATE_LIMIT = float(os.environ.get("AGENT_RATE_LIMIT", "10"))
+AGENT_BURST = float(os.environ.get("AGENT_BURST", "20"))
+AGENT_CONCURRENCY_LIMIT = float(os.environ.get("AGENT_CONCURRENCY_LIMIT", "10"))
+AGENT_MIN_CONCURRENCY = float(os.environ.get("AGENT_MIN_CONCURRENCY", "1"))
+AGENT_MAX_CONCURRENCY = float(os.environ.get("AGENT_MAX_CONCURRENCY", os.environ.get("AGENT_MAX_CONNECTIONS", "50")))
+AGENT_MAX_QUEUE = int(os.environ.get("AGENT_MAX_QUEUE", "100"))
+AGENT_MAX_QUEUE_WAIT = float(os.environ.get("AGENT_MAX_QUEUE_WAIT", "60"))
+AGENT_MAX_RETRIES = int(os.environ.get("AGENT_MAX_RETRIES", "4"))
+AGENT_RETRY_BASE_DELAY = float(os.environ.get("AGENT_RETRY_BASE_DELAY", "0.5"))
+AGENT_RETRY_MAX_DELAY = float(os.environ.get("AGENT_RETRY_MAX_DELAY", "8"))
+MAX_WAIT_SAMPLES = 1000
+
+# Error codes of the InvokeAgent call and of its event stream, which uses lower camel case
+THROTTLE_CODES = {"throttlingexception", "toomanyrequestsexception"}
+TRANSIENT_CODES = {"internalserverexception", "dependencyfailedexception", "badgatewayexception",
+                   "serviceunavailableexception", "serviceunavailable", "requesttimeout", "requesttimeoutexception"}
+
+
+class AdmissionRejected(Exception):
+    """The wait queue is full or a request waited longer than allowed."""
+
+
+def is_throttle(error: BaseException) -> bool:
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code", "").lower() in THROTTLE_CODES
+
+
+def is_transient(error: BaseException) -> bool:
+    """Connection failures, timeouts and 5xx responses, which the SDK would otherwise retry."""
+    if isinstance(error, (ConnectionError, HTTPClientError)):
+        return True
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return status >= 500 or error.response.get("Error", {}).get("Code", "").lower() in TRANSIENT_CODES
+    return False
+
+
+def is_retryable(error: BaseException) -> bool:
+    return is_throttle(error) or is_transient(error)
+
+
+class AdmissionController:
+    """
+    Admission control for agent invocations shared by all sessions of a process.
+
+    A request is admitted when it is at the head of a FIFO wait queue, a token is
+    available in a bucket refilled at ``rate`` per second, and fewer than ``limit``
+    requests are in flight. The concurrency limit follows AIMD: it grows by about
+    one for every ``limit`` successful calls and halves on a throttle. Throttles
+    from calls admitted before the last decrease are ignored, so one burst
+    only halves the limit once. Throttled calls and transient errors are retried
+    with full-jitter exponential backoff and go back through admission; SDK
+    retries are disabled so throttles reach the controller on the first attempt.
+    """
+
+    def __init__(self, rate: float = AGENT_RATE_LIMIT, burst: float = AGENT_BURST,
+                 limit: float = AGENT_CONCURRENCY_LIMIT, min_limit: float = AGENT_MIN_CONCURRENCY,
+                 max_limit: float = AGENT_MAX_CONCURRENCY, max_queue: int = AGENT_MAX_QUEUE,
+                 max_wait: float = AGENT_MAX_QUEUE_WAIT, max_retries: int = AGENT_MAX_RETRIES,
+                 base_delay: float = AGENT_RETRY_BASE_DELAY, max_delay: float = AGENT_RETRY_MAX_DELAY):
+        self.rate = rate
+        self.burst = burst
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._tokens = burst
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._queue: Deque[object] = deque()
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._waits: Deque[float] = deque(maxlen=MAX_WAIT_SAMPLES)
+        self._counts = {"admitted": 0, "rejected": 0, "succeeded": 0, "throttled": 0, "transient_errors": 0,
+                        "retried": 0, "failed": 0}
+        self._max_queue_depth = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    @contextmanager
+    def slot(self, on_position: Optional[Callable[[int], None]] = None) -> Iterator[float]:
+        """
+        Wait for admission and hold a concurrency slot while the block runs.
+
+        Args:
+            on_position (Optional[Callable[[int], None]]): Called with the 1-based
+                position in the wait queue whenever it changes while waiting.
+
+        Yields:
+            float: The monotonic time the call was admitted at.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds ``max_wait``.
+        """
+        ticket = object()
+        enqueued_at = time.monotonic()
+        deadline = enqueued_at + self.max_wait
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                self._counts["rejected"] += 1
+                raise AdmissionRejected("Too many requests are waiting for the assistant")
+            self._queue.append(ticket)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            position = None
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if (self._queue[0] is ticket and self._in_flight < int(self.limit)
+                            and self._tokens >= 1):
+                        break
+                    if now >= deadline:
+                        self._counts["rejected"] += 1
+                        raise AdmissionRejected("Timed out waiting for the assistant")
+
+                    current = self._queue.index(ticket) + 1
+                    if on_position and current != position:
+                        position = current
+                        # Called without the lock so a slow UI update does not stall other sessions
+                        self._condition.release()
+                        try:
+                            on_position(position)
+                        finally:
+                            self._condition.acquire()
+                        continue
+
+                    timeout = deadline - now
+                    if self._queue[0] is ticket and self._tokens < 1:
+                        timeout = min(timeout, (1 - self._tokens) / self.rate)
+                    self._condition.wait(timeout)
+            except BaseException:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            self._queue.popleft()
+            self._tokens -= 1
+            self._in_flight += 1
+            self._counts["admitted"] += 1
+            admitted_at = time.monotonic()
+            self._waits.append((admitted_at - enqueued_at) * 1000)
+            self._condition.notify_all()
+
+        try:
+            yield admitted_at
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self._counts["succeeded"] += 1
+            self.limit = min(self.max_limit, self.limit + 1 / max(self.limit, 1))
+            self._condition.notify_all()
+
+    def on_throttle(self, admitted_at: float) -> None:
+        with self._condition:
+            self._counts["throttled"] += 1
+            if admitted_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = time.monotonic()
+                logger.warning(f"Agent throttled, concurrency limit lowered to {self.limit:.1f}")
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, function: Callable[[], Any], on_position: Optional[Callable[[int], None]] = None,
+             retryable: Callable[[BaseException], bool] = is_retryable) -> Any:
+        """
+        Run ``function`` under admission control, retrying throttled attempts and transient errors.
+
+        Args:
+            function (Callable[[], Any]): One complete agent call, including reading its stream.
+            on_position (Optional[Callable[[int], None]]): See ``slot``.
+            retryable (Callable[[BaseException], bool]): Whether a failed attempt may be
+                retried; callers that already streamed output pass a stricter check.
+
+        Returns:
+            Any: The result of ``function``.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.slot(on_position) as admitted_at:
+                try:
+                    result = function()
+                except Exception as e:
+                    if is_throttle(e):
+                        self.on_throttle(admitted_at)
+                    elif is_transient(e):
+                        # Not a sign of overload, so the concurrency limit is left alone
+                        with self._condition:
+                            self._counts["transient_errors"] += 1
+                    else:
+                        with self._condition:
+                            self._counts["failed"] += 1
+                        raise
+                    if attempt == self.max_retries or not retryable(e):
+                        with self._condition:
+                            self._counts["failed"] += 1
+                        raise
+                    error = e
+                else:
+                    self.on_success()
+                    return result
+            # Back off after releasing the slot so other sessions can use it
+            delay = self.backoff(attempt)
+            with self._condition:
+                self._counts["retried"] += 1
+            logger.info(f"Retrying agent call in {delay:.2f}s (attempt {attempt + 1}): {error}")
+            time.sleep(delay)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._condition:
+            self._refill(time.monotonic())
+            waits = list(self._waits)
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": self._in_flight,
+                "concurrency_limit": round(self.limit, 2),
+                "tokens": round(self._tokens, 2),
+                "wait_p50_ms": round(percentile(waits, 50), 1),
+                "wait_p95_ms": round(percentile(waits, 95), 1),
+                **self._counts,
+            }
@@ -2,11 +2,16 @@
 # SPDX-License-Identifier: MIT-0
 
 import os
+import time
 import logging
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional, Iterator, Callable
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from admission import AdmissionController, AdmissionRejected
+from trace_analyzer import RESPONSE_STREAM_KEY
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -15,15 +20,25 @@ logger = logging.getLogger(__name__)
 AWS_REGION = os.environ.get("AWS_REGION")
 AGENT_ID = os.environ.get("AGENT_ID")
 AGENT_ALIAS_ID = os.environ.get("AGENT_ALIAS_ID")
+AGENT_MAX_CONNECTIONS = int(os.environ.get("AGENT_MAX_CONNECTIONS", "50"))
 
 # Validate required environment variables
 if not all([AWS_REGION, AGENT_ID, AGENT_ALIAS_ID]):
     raise ValueError("Missing required environment variables: AWS_REGION, AGENT_ID, or AGENT_ALIAS_ID")
 
-# Initialize Bedrock Agent Runtime client
-client = boto3.client('bedrock-agent-runtime', region_name=AWS_REGION)
+# Initialize Bedrock Agent Runtime client, sized for concurrent sessions in the API server.
+# Throttles and transient errors are retried by the admission controller, which needs to see throttles to adapt.
+client = boto3.client('bedrock-agent-runtime', region_name=AWS_REGION,
+                      config=Config(max_pool_connections=AGENT_MAX_CONNECTIONS,
+                                    retries={"mode": "standard", "max_attempts": 1}))
+
+# Shared by all sessions in the process so the agent quota is spent across them
+admission = AdmissionController()
 
-def ask_question(question: str, session_id: str, end_session: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+BUSY_MESSAGE = "The assistant is busy right now. Please try again in a moment."
+
+def ask_question(question: str, session_id: str, end_session: bool = False,
+                 on_position: Optional[Callable[[int], None]] = None) -> Tuple[str, List[Dict[str, Any]]]:
     """
     Ask a question to the Bedrock Agent and process the response.
 
@@ -31,25 +46,23 @@ def ask_question(question: str, session_id: str, end_session: bool = False) -> T
         question (str): The question to ask.
         session_id (str): The session ID.
         end_session (bool): Whether to end the session.
+        on_position (Optional[Callable[[int], None]]): Called with the queue position while waiting for admission.
 
     Returns:
         Tuple[str, List[Dict[str, Any]]]: The response and trace.
     """
     logger.info(f"Asking question: {question}")
 
+    def attempt() -> Tuple[str, List[Dict[str, Any]]]:
+        started_at = time.perf_counter()
+        response = invoke(question, session_id, end_session)
+        return process_response(response, started_at)
+
     try:
-        response = client.invoke_agent(
-            agentId=AGENT_ID,
-            agentAliasId=AGENT_ALIAS_ID,
-            sessionId=session_id,
-            endSession=end_session,
-            enableTrace=True,
-            inputText=question
-        )
-
-        logger.debug(f"Raw response: {response}")
-
-        return process_response(response)
+        return admission.call(attempt, on_position)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected question for session {session_id}: {e}")
+        return BUSY_MESSAGE, []
     except ClientError as e:
         logger.error(f"ClientError in ask_question: {e}")
         return str(e), []
@@ -57,57 +70,115 @@ def ask_question(question: str, session_id: str, end_session: bool = False) -> T
         logger.error(f"Unexpected error in ask_question: {e}")
         return str(e), []
 
-def process_response(response: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+def invoke(question: str, session_id: str, end_session: bool = False) -> Dict[str, Any]:
+    """
+    Invoke the Bedrock Agent and return the raw streaming response.
+
+    Args:
+        question (str): The question to ask.
+        session_id (str): The session ID.
+        end_session (bool): Whether to end the session.
+
+    Returns:
+        Dict[str, Any]: The raw response with the 'completion' event stream.
+    """
+    response = client.invoke_agent(
+        agentId=AGENT_ID,
+        agentAliasId=AGENT_ALIAS_ID,
+        sessionId=session_id,
+        endSession=end_session,
+        enableTrace=True,
+        inputText=question
+    )
+
+    logger.debug(f"Raw response: {response}")
+    return response
+
+def iter_completion(response: Dict[str, Any], started_at: Optional[float] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate over the completion stream as ('trace', entry) and ('chunk', text) events.
+    After the last chunk a final trace entry records when the response finished streaming.
+
+    Args:
+        response (Dict[str, Any]): The raw response from the Bedrock Agent.
+        started_at (Optional[float]): perf_counter() value when the agent was invoked.
+
+    Yields:
+        Tuple[str, Any]: The event type and the processed trace entry or chunk text.
+    """
+    if started_at is None:
+        started_at = time.perf_counter()
+    chunks, last_chunk_ms = 0, None
+
+    for step in response.get('completion', []):
+        if "trace" in step:
+            trace = []
+            process_trace(step['trace']['trace'], trace, (time.perf_counter() - started_at) * 1000)
+            for entry in trace:
+                yield "trace", entry
+        if "chunk" in step:
+            chunks, last_chunk_ms = chunks + 1, (time.perf_counter() - started_at) * 1000
+            yield "chunk", step['chunk']['bytes'].decode('utf-8')
+
+    # The answer keeps streaming after the last trace, so the turn ends with the last chunk
+    if last_chunk_ms is not None:
+        yield "trace", {RESPONSE_STREAM_KEY: {"chunks": chunks}, 'elapsedMs': round(last_chunk_ms, 1)}
+
+def process_response(response: Dict[str, Any], started_at: Optional[float] = None) -> Tuple[str, List[Dict[str, Any]]]:
     """
     Process the response from the Bedrock Agent.
 
     Args:
         response (Dict[str, Any]): The raw response from the Bedrock Agent.
+        started_at (Optional[float]): perf_counter() value when the agent was invoked.
 
     Returns:
         Tuple[str, List[Dict[str, Any]]]: The processed response and trace.
     """
-    steps = response.get('completion', [])
     trace = []
     final_response = ""
 
-    for step in steps:
-        if "trace" in step:
-            current_trace = step['trace']['trace']
-            process_trace(current_trace, trace)
-        if "chunk" in step:
-            chunk_data = step['chunk']['bytes'].decode('utf-8')
-            final_response += chunk_data
-            logger.info(f"Chunk: {chunk_data}")
+    for event, data in iter_completion(response, started_at):
+        if event == "trace":
+            trace.append(data)
+        else:
+            final_response += data
+            logger.info(f"Chunk: {data}")
 
     logger.info(f"Final response: {final_response}")
     return final_response, trace
 
-def process_trace(current_trace: Dict[str, Any], trace: List[Dict[str, Any]]) -> None:
+def process_trace(current_trace: Dict[str, Any], trace: List[Dict[str, Any]], elapsed_ms: Optional[float] = None) -> None:
     """
     Process and append trace information.
 
     Args:
         current_trace (Dict[str, Any]): The current trace to process.
         trace (List[Dict[str, Any]]): The list to append processed traces.
+        elapsed_ms (Optional[float]): Milliseconds since the agent was invoked when the trace arrived.
     """
-    for key in ['preProcessingTrace', 'orchestrationTrace']:
+    for key in ['preProcessingTrace', 'orchestrationTrace', 'postProcessingTrace']:
         if key in current_trace:
             current_trace[key].pop('modelInvocationInput', None)
             if current_trace[key]:
-                trace.append({key: current_trace[key]})
+                entry = {key: current_trace[key]}
+                if elapsed_ms is not None:
+                    entry['elapsedMs'] = round(elapsed_ms, 1)
+                trace.append(entry)
 
-def get_chat_response(prompt: str, session_id: str) -> Tuple[str, List[Dict[str, Any]]]:
+def get_chat_response(prompt: str, session_id: str,
+                      on_position: Optional[Callable[[int], None]] = None) -> Tuple[str, List[Dict[str, Any]]]:
     """
     Get a chat response for the given prompt.
 
     Args:
         prompt (str): The chat prompt.
         session_id (str): The session ID.
+        on_position (Optional[Callable[[int], None]]): Called with the queue position while waiting for admission.
 
     Returns:
         Tuple[str, List[Dict[str, Any]]]: The response and trace.
     """
     logger.info(f"Session: {session_id} asked question: {prompt}")
 
-    return ask_question(prompt, session_id)
+    return ask_question(prompt, session_id, on_position=on_position)
@@ -0,0 +1,202 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+import chatbot as agent
+from admission import AdmissionRejected, is_retryable
+from session_store import new_session_token, verify_session_token
+from trace_analyzer import TraceAggregator, build_waterfall
+
+logger = logging.getLogger(__name__)
+
+CHAT_SERVER_HOST = os.environ.get("CHAT_SERVER_HOST", "0.0.0.0")
+CHAT_SERVER_PORT = int(os.environ.get("CHAT_SERVER_PORT", "8080"))
+# Each turn holds one worker while it waits for admission and while boto3 reads the agent's event stream,
+# so by default there are enough for every turn the admission controller lets in or queues
+AGENT_WORKERS = int(os.environ.get("AGENT_WORKERS", "0")) or int(agent.admission.max_limit) + agent.admission.max_queue
+
+
+class ChatServer:
+    """
+    Headless HTTP API for the chatbot that streams agent chunks and traces as
+    server-sent events.
+
+    The blocking boto3 calls run on a thread pool and hand events back to the
+    event loop, so one process serves many sessions concurrently. The pool is
+    sized to the admission controller, which decides how many turns run at once.
+    Turns within a session are serialized because an agent session handles one
+    turn at a time. When a client disconnects, its agent stream is closed.
+    Session IDs are signed tokens issued by ``POST /sessions``, so a client
+    cannot pick the ID of someone else's agent session.
+    """
+
+    def __init__(self, workers: int = AGENT_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent")
+        self.aggregator = TraceAggregator()
+        self.session_locks: Dict[str, asyncio.Lock] = {}
+        self.session_turns: Dict[str, int] = {}
+        self.active_turns = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get("/health", self.health),
+            web.post("/sessions", self.create_session),
+            web.post("/sessions/{session_id}/messages", self.send_message),
+            web.get("/metrics", self.metrics),
+        ])
+        app.on_cleanup.append(self.close)
+        return app
+
+    async def close(self, app: web.Application) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        return web.json_response({"session_id": new_session_token()}, status=201)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.json_response({"active_turns": self.active_turns, "admission": agent.admission.metrics(),
+                                  "steps": self.aggregator.percentiles()})
+
+    async def send_message(self, request: web.Request) -> web.StreamResponse:
+        session_id = verify_session_token(request.match_info["session_id"])
+        if session_id is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "Unknown session, create one with POST /sessions"}),
+                                   content_type="application/json")
+        try:
+            body = await request.json()
+            prompt = body["prompt"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Body must be JSON with a 'prompt' field"}),
+                                     content_type="application/json")
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+        await response.prepare(request)
+
+        lock = self.session_locks.setdefault(session_id, asyncio.Lock())
+        self.session_turns[session_id] = self.session_turns.get(session_id, 0) + 1
+        self.active_turns += 1
+        try:
+            async with lock:
+                await self.stream_turn(response, session_id, prompt, bool(body.get("end_session", False)))
+        except ConnectionResetError:
+            logger.info(f"Client for session {session_id} disconnected")
+        except asyncio.CancelledError:
+            logger.info(f"Client for session {session_id} disconnected, turn cancelled")
+            raise
+        finally:
+            self.active_turns -= 1
+            self.session_turns[session_id] -= 1
+            if not self.session_turns[session_id]:
+                del self.session_turns[session_id]
+                del self.session_locks[session_id]
+        return response
+
+    async def stream_turn(self, response: web.StreamResponse, session_id: str, prompt: str, end_session: bool) -> None:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        streams = []
+
+        def put(event) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        def produce() -> None:
+            streamed = False
+
+            def attempt() -> None:
+                nonlocal streamed
+                if cancelled.is_set():
+                    return
+                started_at = time.perf_counter()
+                completion = agent.invoke(prompt, session_id, end_session)
+                streams.append(completion['completion'])
+                if cancelled.is_set():
+                    close_stream(completion['completion'])
+                    return
+                for event in agent.iter_completion(completion, started_at):
+                    if cancelled.is_set():
+                        break
+                    streamed = True
+                    put(event)
+
+            try:
+                # A failure after output was streamed cannot be retried without repeating it
+                agent.admission.call(attempt, lambda position: put(("queued", {"position": position})),
+                                     retryable=lambda e: not streamed and is_retryable(e))
+            except AdmissionRejected as e:
+                logger.warning(f"Rejected turn for session {session_id}: {e}")
+                put(("error", agent.BUSY_MESSAGE))
+            except Exception as e:
+                if cancelled.is_set():
+                    # Reading a stream that was closed because the client went away
+                    logger.info(f"Stopped agent stream for session {session_id}")
+                else:
+                    logger.error(f"Error streaming agent response for session {session_id}: {e}")
+                    put(("error", str(e)))
+            finally:
+                put(None)
+
+        logger.info(f"Session: {session_id} asked question: {prompt}")
+        producer = loop.run_in_executor(self.executor, produce)
+        final_response, trace = "", []
+        try:
+            while (event := await queue.get()) is not None:
+                kind, data = event
+                if kind == "chunk":
+                    final_response += data
+                    await send_event(response, "chunk", {"text": data})
+                elif kind == "trace":
+                    trace.append(data)
+                    await send_event(response, "trace", data)
+                elif kind == "queued":
+                    await send_event(response, "queued", data)
+                else:
+                    await send_event(response, "error", {"error": data})
+
+            waterfall = build_waterfall(trace)
+            self.aggregator.add(session_id, waterfall)
+            await send_event(response, "done", {"response": final_response, "waterfall": waterfall})
+        finally:
+            cancelled.set()
+            # Closing the stream unblocks the worker mid-read, so an abandoned turn does not keep Bedrock streaming
+            for stream in streams:
+                close_stream(stream)
+            await asyncio.shield(producer)
+
+
+def close_stream(stream: Any) -> None:
+    try:
+        stream.close()
+    except Exception as e:
+        logger.debug(f"Error closing agent stream: {e}")
+
+
+async def send_event(response: web.StreamResponse, event: str, data: Any) -> None:
+    await response.write(f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode('utf-8'))
+
+
+def main(host: str = CHAT_SERVER_HOST, port: int = CHAT_SERVER_PORT, workers: Optional[int] = None) -> None:
+    server = ChatServer(workers or AGENT_WORKERS)
+    web.run_app(server.create_app(), host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
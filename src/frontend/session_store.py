@@ -0,0 +1,317 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import hmac
+import json
+import time
+import atexit
+import base64
+import hashlib
+import secrets
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import redis
+except ImportError:  # Only needed for redis:// session stores
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# memory://, redis://host:6379/0, rediss://... or sqlite:///path/to/sessions.db
+SESSION_STORE_URL = os.environ.get("SESSION_STORE_URL", "memory://")
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(24 * 3600)))
+# Bounds how stale a cached conversation can be when a user alternates between tasks
+SESSION_CACHE_TTL_SECONDS = float(os.environ.get("SESSION_CACHE_TTL_SECONDS", "30"))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "1000"))
+SESSION_FLUSH_INTERVAL_SECONDS = float(os.environ.get("SESSION_FLUSH_INTERVAL_SECONDS", "0.5"))
+SESSION_FLUSH_BATCH_SIZE = int(os.environ.get("SESSION_FLUSH_BATCH_SIZE", "100"))
+# Signs session tokens; tasks sharing a store need the same secret to accept each other's tokens
+SESSION_SECRET = os.environ.get("SESSION_SECRET") or secrets.token_urlsafe(32)
+MAX_TRACE_TEXT = 2000
+
+
+def _signature(session_id: str, secret: str) -> str:
+    digest = hmac.new(secret.encode('utf-8'), session_id.encode('utf-8'), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode('ascii')
+
+
+def new_session_token(secret: str = SESSION_SECRET) -> str:
+    """Create a random session ID and return it as a ``<session id>.<signature>`` token."""
+    session_id = secrets.token_urlsafe(32)
+    return f"{session_id}.{_signature(session_id, secret)}"
+
+
+def verify_session_token(token: str, secret: str = SESSION_SECRET) -> Optional[str]:
+    """
+    Return the session ID of a token issued by ``new_session_token``, or None if
+    it was not signed with ``secret``. Session IDs chosen by a client are never accepted.
+    """
+    session_id, _, signature = token.rpartition(".")
+    if not session_id or not hmac.compare_digest(signature, _signature(session_id, secret)):
+        return None
+    return session_id
+
+
+def compact_trace(value: Any, max_text: int = MAX_TRACE_TEXT) -> Any:
+    """
+    Shrink a trace for storage: long strings such as the full prompt sent to the
+    model are truncated, everything else is kept.
+    """
+    if isinstance(value, dict):
+        return {key: compact_trace(item, max_text) for key, item in value.items()}
+    if isinstance(value, list):
+        return [compact_trace(item, max_text) for item in value]
+    if isinstance(value, str) and len(value) > max_text:
+        return value[:max_text] + f"... [{len(value) - max_text} characters truncated]"
+    return value
+
+
+def compact_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    if "trace" not in message:
+        return message
+    return {**message, "trace": compact_trace(message["trace"])}
+
+
+class SessionStore(ABC):
+    """
+    Conversation history shared by all frontend tasks.
+
+    Reads go through a per-process LRU cache whose entries expire after
+    ``cache_ttl`` seconds. Appended messages update the cache immediately and are
+    written to the backend in batches by a background thread, every
+    ``flush_interval`` seconds or once ``batch_size`` messages are pending.
+    Sessions expire ``ttl`` seconds after their last write.
+
+    Subclasses implement ``_read``, ``_append_many`` and ``_delete`` for a backend.
+    """
+
+    def __init__(self, ttl: int = SESSION_TTL_SECONDS, cache_ttl: float = SESSION_CACHE_TTL_SECONDS,
+                 cache_size: int = SESSION_CACHE_SIZE, flush_interval: float = SESSION_FLUSH_INTERVAL_SECONDS,
+                 batch_size: int = SESSION_FLUSH_BATCH_SIZE):
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._cache: OrderedDict = OrderedDict()
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-store-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    @abstractmethod
+    def _read(self, session_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def _append_many(self, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, session_id: str) -> None:
+        ...
+
+    def _cache_put(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        self._cache[session_id] = (time.monotonic() + self.cache_ttl, messages)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def load(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the messages of a session, oldest first, including writes still pending.
+        The returned list is a copy.
+        """
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry and entry[0] >= time.monotonic():
+                self._cache.move_to_end(session_id)
+                return list(entry[1])
+
+        # Holding the flush lock keeps pending messages from moving to the backend mid-read
+        with self._flush_lock:
+            messages = self._read(session_id)
+            with self._lock:
+                messages += self._pending.get(session_id, [])
+                self._cache_put(session_id, messages)
+                return list(messages)
+
+    def append(self, session_id: str, *messages: Dict[str, Any]) -> None:
+        """Queue messages for a session; traces are compacted before they are stored."""
+        messages = [compact_message(message) for message in messages]
+        with self._lock:
+            self._pending.setdefault(session_id, []).extend(messages)
+            self._pending_count += len(messages)
+            entry = self._cache.get(session_id)
+            if entry:
+                self._cache_put(session_id, entry[1] + messages)
+            if self._pending_count >= self.batch_size:
+                self._wake.set()
+
+    def clear(self, session_id: str) -> None:
+        with self._flush_lock:
+            with self._lock:
+                self._pending_count -= len(self._pending.pop(session_id, []))
+                self._cache_put(session_id, [])
+            self._delete(session_id)
+
+    def flush(self) -> None:
+        """Write all pending messages to the backend."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending, self._pending_count = self._pending, {}, 0
+            if not batch:
+                return
+            try:
+                self._append_many(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} sessions, retrying: {e}")
+                with self._lock:
+                    for session_id, messages in batch.items():
+                        self._pending[session_id] = messages + self._pending.get(session_id, [])
+                        self._pending_count += len(messages)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local backend; conversations do not survive a move to another task."""
+
+    def __init__(self, **kwargs):
+        self._sessions: Dict[str, Any] = {}
+        super().__init__(**kwargs)
+
+    def _read(self, session_id: str) -> List[Dict[str, Any]]:
+        expires_at, messages = self._sessions.get(session_id, (0, []))
+        return list(messages) if expires_at >= time.time() else []
+
+    def _append_many(self, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+        now = time.time()
+        for session_id, messages in batch.items():
+            stored = self._read(session_id)
+            self._sessions[session_id] = (now + self.ttl, stored + messages)
+        for session_id in [key for key, (expires_at, _) in self._sessions.items() if expires_at < now]:
+            del self._sessions[session_id]
+
+    def _delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Backend for any Redis-protocol server (Redis, Valkey, ElastiCache). Each session
+    is a list of JSON messages whose expiry is refreshed on every batch.
+    """
+
+    KEY_PREFIX = "session:"
+
+    def __init__(self, url: str, **kwargs):
+        if redis is None:
+            raise ImportError("The redis package is required for redis:// session stores")
+        self._client = redis.Redis.from_url(url, socket_timeout=5, health_check_interval=30)
+        super().__init__(**kwargs)
+
+    def _read(self, session_id: str) -> List[Dict[str, Any]]:
+        return [json.loads(item) for item in self._client.lrange(self.KEY_PREFIX + session_id, 0, -1)]
+
+    def _append_many(self, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+        # One round trip for the whole batch
+        pipeline = self._client.pipeline(transaction=False)
+        for session_id, messages in batch.items():
+            key = self.KEY_PREFIX + session_id
+            pipeline.rpush(key, *[json.dumps(message, default=str) for message in messages])
+            pipeline.expire(key, self.ttl)
+        pipeline.execute()
+
+    def _delete(self, session_id: str) -> None:
+        self._client.delete(self.KEY_PREFIX + session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local file backend for development and tests; shared only by processes on one host."""
+
+    def __init__(self, path: str, **kwargs):
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "message TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)")
+        super().__init__(**kwargs)
+
+    def _read(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            rows = self._connection.execute(
+                "SELECT message FROM messages WHERE session_id = ? AND expires_at >= ? ORDER BY id",
+                (session_id, time.time()),
+            ).fetchall()
+        return [json.loads(message) for (message,) in rows]
+
+    def _append_many(self, batch: Dict[str, List[Dict[str, Any]]]) -> None:
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._db_lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO messages (session_id, message, expires_at) VALUES (?, ?, ?)",
+                    [(session_id, json.dumps(message, default=str), expires_at)
+                     for session_id, messages in batch.items() for message in messages],
+                )
+                # A session lives as long as its latest write
+                self._connection.executemany(
+                    "UPDATE messages SET expires_at = ? WHERE session_id = ?",
+                    [(expires_at, session_id) for session_id in batch],
+                )
+                self._connection.execute("DELETE FROM messages WHERE expires_at < ?", (now,))
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def _delete(self, session_id: str) -> None:
+        with self._db_lock:
+            self._connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+
+def create_session_store(url: str = SESSION_STORE_URL, **kwargs) -> SessionStore:
+    """
+    Create the session store for a URL: ``memory://``, ``redis://host:port/db``,
+    ``rediss://...`` or ``sqlite:///path/to/sessions.db``.
+    """
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemorySessionStore(**kwargs)
+    if scheme in ("redis", "rediss"):
+        return RedisSessionStore(url, **kwargs)
+    if scheme == "sqlite":
+        return SQLiteSessionStore(url[len("sqlite:///"):] or ":memory:", **kwargs)
+    raise ValueError(f"Unsupported session store URL: {url}")
@@ -0,0 +1,85 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import re
+import json
+from typing import Any, Dict, List, Tuple
+
+def extract_structured_data(response: str) -> tuple:
+    
+    def replace_tags(match):
+        tag = match.group(1)
+        content = match.group(2)
+        return f"**{tag.capitalize()}:** {content}"
+    
+    parts = response.split("<structured_data>")
+    markdown_response = parts[0].strip()
+    structured_data_str = parts[1].split("</structured_data>")[0].strip() if len(parts) > 1 else None
+    
+    markdown_response = re.sub(r'<(question|sources)>(.*?)</\1>', replace_tags, markdown_response, flags=re.DOTALL)
+    
+    structured_data = None
+    if structured_data_str:
+        try:
+            # Remove any leading/trailing whitespace and newlines
+            structured_data_str = structured_data_str.strip()
+            # Parse the JSON data
+            parsed_data = json.loads(structured_data_str)
+            
+            # Check if the data is in the '_source' format or the 'parts' format
+            if isinstance(parsed_data, list) and all('_source' in item for item in parsed_data):
+                print("Response uses _source format")
+                structured_data = [item['_source'] for item in parsed_data]
+            elif isinstance(parsed_data, list) and all('parts' in item for item in parsed_data):
+                print("Response uses parts format")
+                structured_data = {'parts': [part for item in parsed_data for part in item['parts']]}
+            else:
+                print("Response uses no format")
+                structured_data = parsed_data
+            
+        except json.JSONDecodeError as e:
+            print(f"JSON parsing error: {e}")
+            structured_data = structured_data_str  # Keep the original string if parsing fails
+    
+    return markdown_response, structured_data
+
+def collect_parts(data: Any) -> Tuple[List[Dict], List[str]]:
+    """
+    Flatten parsed structured data into the list of parts to render as cards.
+
+    Returns:
+        Tuple[List[Dict], List[str]]: The parts and messages for entries that could not be used.
+    """
+    all_parts = []
+    errors = []
+    if isinstance(data, dict) and 'parts' in data:
+        all_parts = data['parts']
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                if 'parts' in item:
+                    all_parts.extend(item['parts'])
+                else:
+                    all_parts.append(item)
+            else:
+                errors.append(f"Unexpected data format: {item}")
+    else:
+        errors.append(f"Unexpected data format: {data}")
+    return all_parts, errors
+
+def card_text(part: Dict) -> List[str]:
+    text_content = [
+        f"Part #: {part.get('part_number', 'N/A')}",
+        part.get('description', 'No description')[:40] + "..." if len(part.get('description', '')) > 40 else part.get('description', 'No description'),
+    ]
+
+    if 'price' in part:
+        text_content.append(f"${part['price']} {part.get('currency', 'USD')}")
+
+    if 'in_stock' in part:
+        text_content.append("In Stock" if part['in_stock'] else "Out of Stock")
+
+    if 'rating' in part:
+        text_content.append(f"Rating: {part['rating']}")
+
+    return text_content
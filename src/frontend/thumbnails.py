@@ -0,0 +1,76 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Streamlit serves the app's static/ directory at /app/static when server.enableStaticServing is on
+THUMBNAIL_DIR = os.environ.get("THUMBNAIL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "thumbnails"))
+THUMBNAIL_URL_PATH = os.environ.get("THUMBNAIL_URL_PATH", "/app/static/thumbnails")
+THUMBNAIL_CACHE_SIZE = int(os.environ.get("THUMBNAIL_CACHE_SIZE", "256"))
+
+
+class ThumbnailCache:
+    """
+    Bounded LRU cache of thumbnail URLs for part images.
+
+    Thumbnails are produced at build time by ``infra/pipeline/thumbnails.py`` and
+    served as static files, so cards only carry a URL and the browser loads and
+    caches the image itself. They are content-addressed, so a cached URL never
+    goes stale. The cache saves the manifest lookup and the file check per card.
+    """
+
+    def __init__(self, directory: str = THUMBNAIL_DIR, url_path: str = THUMBNAIL_URL_PATH,
+                 max_entries: int = THUMBNAIL_CACHE_SIZE):
+        self.directory = directory
+        self.url_path = url_path.rstrip("/")
+        self.max_entries = max_entries
+        self._manifest: Optional[Dict[str, str]] = None
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> Dict[str, str]:
+        if self._manifest is None:
+            try:
+                with open(os.path.join(self.directory, "manifest.json"), 'r') as f:
+                    self._manifest = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.info(f"No thumbnail manifest available: {e}")
+                self._manifest = {}
+        return self._manifest
+
+    def get(self, image_name: Optional[str]) -> Optional[str]:
+        """
+        Get the URL of the thumbnail for an inventory image.
+
+        Args:
+            image_name (Optional[str]): The ``images`` value of an inventory record.
+
+        Returns:
+            Optional[str]: The thumbnail URL, or None if no thumbnail exists.
+        """
+        if not image_name:
+            return None
+
+        with self._lock:
+            if image_name in self._entries:
+                self._entries.move_to_end(image_name)
+                return self._entries[image_name]
+
+        file_name = self._load_manifest().get(image_name)
+        if not file_name or not os.path.isfile(os.path.join(self.directory, file_name)):
+            return None
+        url = f"{self.url_path}/{file_name}"
+
+        with self._lock:
+            self._entries[image_name] = url
+            self._entries.move_to_end(image_name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
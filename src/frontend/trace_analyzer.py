@@ -0,0 +1,170 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH")
+MAX_SAMPLES_PER_STEP = 10000
+
+TRACE_KEYS = {
+    'preProcessingTrace': 'preprocessing',
+    'orchestrationTrace': 'orchestration',
+    'postProcessingTrace': 'postprocessing',
+}
+# Added by chatbot.iter_completion when the last chunk of the answer arrives
+RESPONSE_STREAM_KEY = 'responseStream'
+
+
+def _usage(model_output: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    usage = (model_output.get('metadata') or {}).get('usage') or {}
+    return {"inputTokens": usage.get('inputTokens'), "outputTokens": usage.get('outputTokens')}
+
+
+def _reported_duration(model_output: Dict[str, Any]) -> Optional[float]:
+    # Newer agent runtimes report the model call time themselves
+    metadata = model_output.get('metadata') or {}
+    return metadata.get('totalTimeMs')
+
+
+def _invocation_name(invocation_input: Dict[str, Any]) -> str:
+    if 'actionGroupInvocationInput' in invocation_input:
+        action = invocation_input['actionGroupInvocationInput']
+        return f"{action.get('actionGroupName', '')} {action.get('verb', '').upper()} {action.get('apiPath', '')}".strip()
+    if 'knowledgeBaseLookupInput' in invocation_input:
+        return invocation_input['knowledgeBaseLookupInput'].get('knowledgeBaseId', 'knowledge base')
+    return invocation_input.get('invocationType', '').lower()
+
+
+def build_waterfall(trace: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Turn the trace of one turn into a timed waterfall of steps.
+
+    Each step ends when the event that completes it arrives (a model invocation
+    output or an observation) and starts when the previous step ended, so the steps
+    tile the turn. The answer is streamed after the last trace event, so the turn
+    ends with a ``streaming`` step when the last chunk arrived. Trace entries need
+    the ``elapsedMs`` offset recorded by ``chatbot.process_trace``; entries without
+    it are ignored.
+
+    Args:
+        trace (List[Dict[str, Any]]): The processed trace of a turn.
+
+    Returns:
+        List[Dict[str, Any]]: Steps with type, name, start, duration and token counts.
+    """
+    if not isinstance(trace, list):
+        return []
+
+    steps = []
+    invocations: Dict[str, str] = {}
+    model_steps: Dict[str, Dict[str, Any]] = {}
+    previous_end = 0.0
+
+    def add_step(step_type: str, name: str, end: float, duration: Optional[float] = None, **extra) -> Dict[str, Any]:
+        nonlocal previous_end
+        start = previous_end if duration is None else max(end - duration, 0.0)
+        step = {"step": step_type, "name": name, "startMs": round(start, 1),
+                "durationMs": round(max(end - start, 0.0), 1), **extra}
+        steps.append(step)
+        previous_end = max(previous_end, end)
+        return step
+
+    for entry in trace:
+        elapsed = entry.get('elapsedMs')
+        if elapsed is None:
+            continue
+        if RESPONSE_STREAM_KEY in entry:
+            if elapsed > previous_end:
+                add_step('streaming', "response stream", elapsed, **entry[RESPONSE_STREAM_KEY])
+            continue
+        for key, phase in TRACE_KEYS.items():
+            event = entry.get(key)
+            if not event:
+                continue
+
+            if 'invocationInput' in event:
+                invocation_input = event['invocationInput']
+                invocations[invocation_input.get('traceId', '')] = _invocation_name(invocation_input)
+
+            if 'modelInvocationOutput' in event:
+                model_output = event['modelInvocationOutput']
+                trace_id = model_output.get('traceId', '')
+                model_steps[trace_id] = add_step(phase, "model invocation", elapsed,
+                                                 _reported_duration(model_output), **_usage(model_output))
+
+            if 'observation' in event:
+                observation = event['observation']
+                trace_id = observation.get('traceId', '')
+                observation_type = observation.get('type', '')
+                if observation_type == 'ACTION_GROUP':
+                    add_step('action_group', invocations.get(trace_id, 'action group'), elapsed)
+                elif observation_type == 'KNOWLEDGE_BASE':
+                    add_step('knowledge_base', invocations.get(trace_id, 'knowledge base'), elapsed)
+                elif observation_type == 'FINISH' and trace_id in model_steps:
+                    # The model call that produced the final answer is the generation step
+                    model_steps[trace_id]['step'] = 'generation'
+                    model_steps[trace_id]['name'] = "final response"
+
+    return steps
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` for ``q`` in [0, 100]."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+class TraceAggregator:
+    """
+    Collects step durations across turns and sessions for p50/p95 by step type.
+    Keeps the most recent ``max_samples`` durations per step type.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES_PER_STEP, export_path: Optional[str] = TRACE_EXPORT_PATH):
+        self.export_path = export_path
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=max_samples))
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, waterfall: List[Dict[str, Any]]) -> None:
+        """
+        Record a turn's waterfall and append it to the JSON lines export if configured.
+        """
+        if not waterfall:
+            return
+        with self._lock:
+            for step in waterfall:
+                self._samples[step['step']].append(step['durationMs'])
+            self._samples['turn'].append(max(step['startMs'] + step['durationMs'] for step in waterfall))
+
+        if self.export_path:
+            record = {"timestamp": time.time(), "sessionId": session_id, "steps": waterfall}
+            try:
+                with self._lock, open(self.export_path, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                logger.error(f"Failed to export trace waterfall: {e}")
+
+    def percentiles(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            List[Dict[str, Any]]: Count, p50 and p95 duration in ms for each step type.
+        """
+        with self._lock:
+            samples = {step: list(values) for step, values in self._samples.items()}
+        return [
+            {"step": step, "count": len(values),
+             "p50Ms": round(percentile(values, 50), 1), "p95Ms": round(percentile(values, 95), 1)}
+            for step, values in sorted(samples.items())
+        ]
@@ -5,11 +5,14 @@ import streamlit as st
 import chatbot as agent
 import os
 import re
-import uuid
 import json
 from typing import List, Dict
 from streamlit_card import card
 from botocore.exceptions import ClientError
+from structured_data import extract_structured_data, collect_parts, card_text
+from thumbnails import ThumbnailCache
+from trace_analyzer import TraceAggregator, build_waterfall
+from session_store import SessionStore, create_session_store, new_session_token, verify_session_token
 
 WORKLOAD_PREFIX = "Parts Catalog"
 
@@ -22,9 +25,36 @@ def render_sidebar():
         with st.container():
             st.button("Clear Chat 🗑️", "clear_chat", on_click=clear_session)
 
+@st.cache_resource
+def get_thumbnail_cache() -> ThumbnailCache:
+    # Shared across sessions so each thumbnail is resolved to its static URL at most once per process
+    return ThumbnailCache()
+
+@st.cache_resource
+def get_trace_aggregator() -> TraceAggregator:
+    # Shared across sessions so step percentiles cover all conversations in this process
+    return TraceAggregator()
+
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    # Conversations live outside the process so any task behind the load balancer can serve them
+    return create_session_store()
+
+def get_session_id() -> str:
+    # A signed session token is kept in the URL so a reconnect to another task resumes the conversation;
+    # the server issues the random ID, so a client cannot pick or guess one to open someone else's history
+    token = st.query_params.get("session")
+    session_id = verify_session_token(token) if token else None
+    if session_id is None:
+        token = new_session_token()
+        session_id = verify_session_token(token)
+        st.query_params["session"] = token
+    return session_id
+
 def clear_session():
     print("Clearing session...")
     st.session_state.messages = []
+    get_session_store().clear(st.session_state.id)
 
 def render_structured_data(data):
     if isinstance(data, str):
@@ -34,20 +64,9 @@ def render_structured_data(data):
             st.error("Failed to parse structured data")
             return
 
-    all_parts = []
-    if isinstance(data, dict) and 'parts' in data:
-        all_parts = data['parts']
-    elif isinstance(data, list):
-        for item in data:
-            if isinstance(item, dict):
-                if 'parts' in item:
-                    all_parts.extend(item['parts'])
-                else:
-                    all_parts.append(item)
-            else:
-                st.error(f"Unexpected data format: {item}")
-    else:
-        st.error(f"Unexpected data format: {data}")
+    all_parts, errors = collect_parts(data)
+    for error in errors:
+        st.error(error)
 
     # Display parts in rows of 4
     for i in range(0, len(all_parts), 4):
@@ -57,44 +76,6 @@ def render_structured_data(data):
                 with cols[j]:
                     render_card(all_parts[i + j], i + j)
 
-def extract_structured_data(response: str) -> tuple:
-    
-    def replace_tags(match):
-        tag = match.group(1)
-        content = match.group(2)
-        return f"**{tag.capitalize()}:** {content}"
-    
-    parts = response.split("<structured_data>")
-    markdown_response = parts[0].strip()
-    structured_data_str = parts[1].split("</structured_data>")[0].strip() if len(parts) > 1 else None
-    
-    markdown_response = re.sub(r'<(question|sources)>(.*?)</\1>', replace_tags, markdown_response, flags=re.DOTALL)
-    
-    structured_data = None
-    if structured_data_str:
-        try:
-            # Remove any leading/trailing whitespace and newlines
-            structured_data_str = structured_data_str.strip()
-            # Parse the JSON data
-            parsed_data = json.loads(structured_data_str)
-            
-            # Check if the data is in the '_source' format or the 'parts' format
-            if isinstance(parsed_data, list) and all('_source' in item for item in parsed_data):
-                print("Response uses _source format")
-                structured_data = [item['_source'] for item in parsed_data]
-            elif isinstance(parsed_data, list) and all('parts' in item for item in parsed_data):
-                print("Response uses parts format")
-                structured_data = {'parts': [part for item in parsed_data for part in item['parts']]}
-            else:
-                print("Response uses no format")
-                structured_data = parsed_data
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {e}")
-            structured_data = structured_data_str  # Keep the original string if parsing fails
-    
-    return markdown_response, structured_data
-
 def render_card(part: Dict, index: int):
     colors = [
         "#E8F0FE", "#F0F4F8", "#E6F3FF", "#F5F5F5",
@@ -103,23 +84,10 @@ def render_card(part: Dict, index: int):
     
     bg_color = colors[index % len(colors)]
     
-    text_content = [
-        f"Part #: {part.get('part_number', 'N/A')}",
-        part.get('description', 'No description')[:40] + "..." if len(part.get('description', '')) > 40 else part.get('description', 'No description'),
-    ]
-
-    if 'price' in part:
-        text_content.append(f"${part['price']} {part.get('currency', 'USD')}")
-
-    if 'in_stock' in part:
-        text_content.append("In Stock" if part['in_stock'] else "Out of Stock")
-
-    if 'rating' in part:
-        text_content.append(f"Rating: {part['rating']}")
-
     card(
         title=part.get("part_name", "Unknown Part"),
-        text=text_content,
+        text=card_text(part),
+        image=get_thumbnail_cache().get(part.get("images")),
         styles={
             "card": {
                 "width": "100%",
@@ -144,11 +112,28 @@ def render_card(part: Dict, index: int):
         }
     )
 
+def render_trace(message: Dict):
+    with st.expander("Trace", expanded=False):
+        if message.get("waterfall"):
+            st.markdown("**Latency waterfall**")
+            st.dataframe(message["waterfall"], use_container_width=True, hide_index=True)
+            st.markdown("**All sessions (ms by step type)**")
+            st.dataframe(get_trace_aggregator().percentiles(), use_container_width=True, hide_index=True)
+        st.json(message["trace"], expanded=True)
+
 def get_agent_response(prompt: str):
+    queue_notice = st.empty()
+
+    def show_position(position: int):
+        queue_notice.info(f"The assistant is busy. You are number {position} in line.")
+
     try:
-        response, trace = agent.get_chat_response(prompt, st.session_state.id)
+        response, trace = agent.get_chat_response(prompt, st.session_state.id, on_position=show_position)
+        queue_notice.empty()
         if not trace:
             trace = dict()
+        waterfall = build_waterfall(trace)
+        get_trace_aggregator().add(st.session_state.id, waterfall)
         markdown_response, structured_data = extract_structured_data(response)
         print("Structured data: ", structured_data)
     except Exception as e:
@@ -156,12 +141,14 @@ def get_agent_response(prompt: str):
         markdown_response = f"An unexpected error occurred: {e}"
         structured_data = None
         trace = dict()
+        waterfall = []
 
     return {
         "role": "assistant",
         "content": markdown_response,
         "structured_data": structured_data,
-        "trace": trace
+        "trace": trace,
+        "waterfall": waterfall
     }
 
 st.set_page_config(
@@ -173,10 +160,10 @@ st.set_page_config(
 st.header(f"Parts Catalog Agent", divider='blue')
 
 if "id" not in st.session_state:
-    st.session_state.id = str(uuid.uuid4())[1:8]
+    st.session_state.id = get_session_id()
 
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = get_session_store().load(st.session_state.id)
 
 render_sidebar()
 
@@ -186,11 +173,11 @@ for message in st.session_state.messages:
         if "structured_data" in message and message["structured_data"]:
             render_structured_data(message["structured_data"])
         if "trace" in message and message["role"] == "assistant":
-            with st.expander("Trace", expanded=False):
-                st.json(message["trace"], expanded=True)
+            render_trace(message)
 
 if prompt := st.chat_input("How can I help?"):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    user_message = {"role": "user", "content": prompt}
+    st.session_state.messages.append(user_message)
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -198,11 +185,11 @@ if prompt := st.chat_input("How can I help?"):
         response = get_agent_response(prompt)
 
         st.session_state.messages.append(response)
+        get_session_store().append(st.session_state.id, user_message, response)
         with st.chat_message("assistant"):
             st.markdown(response["content"])
             if response["structured_data"]:
                 render_structured_data(response["structured_data"])
-            with st.expander("Trace", expanded=False):
-                st.json(response["trace"], expanded=True)
+            render_trace(response)
 
     st.rerun()
\ No newline at end of file
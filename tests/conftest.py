@@ -0,0 +1,40 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import sys
+import importlib
+import importlib.util
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The Lambda, the frontend and the build pipeline import their modules by file name, so put their directories on the path
+for path in (
+    os.path.join(ROOT_DIR, "src", "backend"),
+    os.path.join(ROOT_DIR, "src", "frontend"),
+    os.path.join(ROOT_DIR, "infra"),
+    os.path.join(ROOT_DIR, "infra", "assets", "setup-opensearch"),
+):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def backend_index():
+    """The action group Lambda module, which shares its file name with the setup-opensearch handler."""
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("POWERTOOLS_TRACE_DISABLED", "true")
+    spec = importlib.util.spec_from_file_location("backend_index", os.path.join(ROOT_DIR, "src", "backend", "index.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def chatbot():
+    """The agent client module, configured for a fake agent."""
+    for name, value in (("AWS_REGION", "us-east-1"), ("AGENT_ID", "AGENT"), ("AGENT_ALIAS_ID", "ALIAS")):
+        os.environ.setdefault(name, value)
+    return importlib.import_module("chatbot")
@@ -0,0 +1,177 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import time
+import threading
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+from admission import AdmissionController, AdmissionRejected, is_retryable, is_throttle, is_transient
+
+
+def client_error(code: str, status: int = 400) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+                       "InvokeAgent")
+
+
+def controller(**kwargs) -> AdmissionController:
+    settings = dict(rate=1000, burst=1000, limit=4, min_limit=1, max_limit=8, max_queue=100, max_wait=5,
+                    max_retries=3, base_delay=0, max_delay=0)
+    settings.update(kwargs)
+    return AdmissionController(**settings)
+
+
+def test_error_classification():
+    assert is_throttle(client_error("ThrottlingException"))
+    assert is_throttle(client_error("throttlingException"))
+    assert is_transient(client_error("InternalServerException", 500))
+    assert is_transient(client_error("badGatewayException"))
+    assert is_transient(EndpointConnectionError(endpoint_url="https://bedrock"))
+    assert is_transient(ReadTimeoutError(endpoint_url="https://bedrock"))
+    assert not is_retryable(client_error("ValidationException"))
+    assert not is_retryable(ValueError("bad input"))
+
+
+def test_additive_increase():
+    admission = controller(limit=2)
+    for _ in range(4):
+        admission.call(lambda: None)
+    # +1/limit per success: 2 -> 2.5 -> 2.9 -> 3.24 -> 3.55
+    assert admission.limit == pytest.approx(3.55, abs=0.01)
+
+
+def test_multiplicative_decrease_once_per_burst():
+    admission = controller(limit=8)
+    admitted_at = time.monotonic()
+    admission.on_throttle(admitted_at)
+    assert admission.limit == 4
+    # A call admitted before the decrease belongs to the same burst
+    admission.on_throttle(admitted_at)
+    assert admission.limit == 4
+    admission.on_throttle(time.monotonic())
+    assert admission.limit == 2
+    for _ in range(5):
+        admission.on_throttle(time.monotonic())
+    assert admission.limit == 1
+
+
+def test_throttles_are_retried_and_lower_the_limit():
+    admission = controller(limit=8)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise client_error("ThrottlingException")
+        return "ok"
+
+    assert admission.call(flaky) == "ok"
+    metrics = admission.metrics()
+    assert (metrics["throttled"], metrics["retried"], metrics["succeeded"]) == (2, 2, 1)
+    assert admission.limit < 8
+
+
+def test_transient_errors_are_retried_without_lowering_the_limit():
+    admission = controller(limit=4)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise client_error("InternalServerException", 500)
+        return "ok"
+
+    assert admission.call(flaky) == "ok"
+    assert admission.metrics()["transient_errors"] == 1
+    assert admission.limit > 4
+
+
+def test_non_retryable_errors_fail_immediately():
+    admission = controller()
+    attempts = []
+
+    def invalid():
+        attempts.append(1)
+        raise client_error("ValidationException")
+
+    with pytest.raises(ClientError):
+        admission.call(invalid)
+    assert len(attempts) == 1
+    assert admission.metrics()["failed"] == 1
+
+
+def test_retries_stop_when_the_caller_says_so():
+    admission = controller()
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise client_error("ThrottlingException")
+
+    with pytest.raises(ClientError):
+        admission.call(throttled, retryable=lambda e: False)
+    assert len(attempts) == 1
+    with pytest.raises(ClientError):
+        admission.call(throttled)
+    assert len(attempts) == 1 + 4
+
+
+def test_token_bucket_limits_rate():
+    admission = controller(rate=50, burst=5, limit=100)
+    started = time.monotonic()
+    for _ in range(15):
+        with admission.slot():
+            pass
+    # 5 from the burst, then 10 more at 50 per second
+    assert time.monotonic() - started == pytest.approx(0.2, abs=0.1)
+
+
+def test_concurrency_limit_and_fifo_positions():
+    admission = controller(limit=1)
+    release = threading.Event()
+    order, positions = [], []
+
+    def hold():
+        with admission.slot():
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    while admission.metrics()["in_flight"] == 0:
+        time.sleep(0.001)
+
+    def wait(name):
+        with admission.slot(on_position=lambda position: positions.append((name, position))):
+            order.append(name)
+
+    waiters = []
+    for name in ("first", "second"):
+        waiters.append(threading.Thread(target=wait, args=(name,)))
+        waiters[-1].start()
+        while admission.metrics()["queue_depth"] < len(waiters):
+            time.sleep(0.001)
+    assert admission.metrics()["in_flight"] == 1
+
+    release.set()
+    for thread in [holder, *waiters]:
+        thread.join(5)
+    assert order == ["first", "second"]
+    assert ("first", 1) in positions and ("second", 2) in positions
+
+
+def test_wait_timeout_is_rejected():
+    admission = controller(limit=1, max_wait=0.05)
+    with admission.slot():
+        with pytest.raises(AdmissionRejected, match="Timed out"):
+            with admission.slot():
+                pass
+    assert admission.metrics()["rejected"] == 1
+    assert admission.metrics()["queue_depth"] == 0
+
+
+def test_full_queue_is_rejected():
+    admission = controller(max_queue=0)
+    with pytest.raises(AdmissionRejected, match="Too many"):
+        with admission.slot():
+            pass
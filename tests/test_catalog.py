@@ -0,0 +1,109 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+
+import catalog as reader
+from catalog import Catalog
+from pipeline import catalog as compiler
+
+INVENTORY = [
+    {"manufacturer": "Honda", "category": "Wipers", "part_name": "Wiper Blade", "part_number": "76622-T0A-A01",
+     "description": "26 in. driver side", "price": 24.99, "currency": "USD", "in_stock": True, "rating": 4.5,
+     "images": "wiper.png"},
+    {"manufacturer": "Honda", "category": "Filters", "part_name": "Oil Filter", "part_number": "15400-PLM-A02",
+     "price": 8.5, "currency": "USD", "in_stock": False},
+    {"manufacturer": "Honda", "category": "Filters", "part_name": "Oil Filter", "part_number": "15400-PLM-A02",
+     "price": 9.25, "currency": "USD"},
+    {"manufacturer": "Hondá", "category": "Lighting", "part_name": "Headlight Bulb", "part_number": "33115-TLA-A01"},
+]
+
+COMPATIBLE_PARTS = [
+    {"manufacturer": "Honda", "make": "Honda", "model": "CR-V", "years": [2020, 2021], "category": "Wipers",
+     "parts": [{"part_name": "Wiper Blade", "part_number": "76622-T0A-A01", "description": "26 in."}]},
+    {"manufacturer": "Honda", "make": "Honda", "model": "CR-V", "years": [2021], "category": "Filters",
+     "parts": [{"part_name": "Oil Filter", "part_number": "15400-PLM-A02", "description": None}]},
+]
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    compiler.compile_catalog(INVENTORY, COMPATIBLE_PARTS, path)
+    return path
+
+
+def test_round_trip(catalog_path):
+    catalog = Catalog(catalog_path)
+    assert len(catalog) == len(INVENTORY)
+    assert list(catalog.part_numbers()) == sorted(data["part_number"] for data in INVENTORY)
+    assert catalog.get("76622-T0A-A01") == [INVENTORY[0]]
+    assert catalog.get("33115-TLA-A01") == [INVENTORY[3]]
+
+
+def test_duplicate_part_numbers_are_all_returned(catalog_path):
+    prices = sorted(record["price"] for record in Catalog(catalog_path).get("15400-PLM-A02"))
+    assert prices == [8.5, 9.25]
+
+
+def test_unknown_part_number(catalog_path):
+    catalog = Catalog(catalog_path)
+    assert catalog.get("00000-XXX-000") == []
+    assert catalog.get("") == []
+
+
+def test_compatible_parts_lookup(catalog_path):
+    catalog = Catalog(catalog_path)
+    assert [doc["category"] for doc in catalog.compatible_parts("honda", "cr-v", 2021)] == ["Wipers", "Filters"]
+    only_2020 = catalog.compatible_parts("Honda", "CR-V", 2020)
+    assert only_2020 == [COMPATIBLE_PARTS[0]]
+    assert catalog.compatible_parts("Honda", "CR-V", 2019) == []
+    assert catalog.compatible_parts("Honda", "Civic", 2021) == []
+
+
+def test_empty_catalog(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    compiler.compile_catalog([], [], path)
+    catalog = Catalog(path)
+    assert len(catalog) == 0
+    assert catalog.get("76622-T0A-A01") == []
+    assert catalog.compatible_parts("Honda", "CR-V", 2021) == []
+
+
+@pytest.mark.parametrize("size", [0, 10, compiler.HEADER.size, -1])
+def test_truncated_file_is_rejected(catalog_path, size):
+    with open(catalog_path, 'rb') as f:
+        data = f.read()
+    with open(catalog_path, 'wb') as f:
+        f.write(data[:size])
+    with pytest.raises(ValueError):
+        Catalog(catalog_path)
+
+
+def test_wrong_magic_is_rejected(catalog_path):
+    with open(catalog_path, 'r+b') as f:
+        f.write(b"NOTACAT!")
+    with pytest.raises(ValueError, match="Unsupported"):
+        Catalog(catalog_path)
+
+
+def test_corrupt_counts_are_rejected(catalog_path):
+    with open(catalog_path, 'rb') as f:
+        header = list(compiler.HEADER.unpack(f.read(compiler.HEADER.size)))
+    # Claim more inventory records than the section holds
+    header[2] += 1
+    with open(catalog_path, 'r+b') as f:
+        f.write(compiler.HEADER.pack(*header))
+    with pytest.raises(ValueError):
+        Catalog(catalog_path)
+
+
+@pytest.mark.parametrize("name", [
+    "MAGIC", "HEADER", "STRING_OFFSET", "INVENTORY_RECORD", "FITMENT_DOC", "FITMENT_PART", "FITMENT_KEY", "POSTING", "YEAR",
+    "NONE", "KEY_SEPARATOR",
+])
+def test_layout_matches_compiler(name):
+    expected, actual = getattr(compiler, name), getattr(reader, name)
+    if hasattr(expected, "format"):
+        expected, actual = expected.format, actual.format
+    assert actual == expected
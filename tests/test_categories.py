@@ -0,0 +1,133 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError
+
+BUCKETS = [
+    {"key": "Wipers", "doc_count": 3, "parts": {"value": 7}},
+    {"key": "Filters", "doc_count": 2, "parts": {"value": 4}},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSearchClient:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.error = None
+        self.requests = []
+
+    def search(self, index, body):
+        self.requests.append((index, body))
+        if self.error:
+            raise self.error
+        return {"hits": {"total": {"value": sum(bucket["doc_count"] for bucket in self.buckets)}, "hits": []},
+                "aggregations": {"categories": {"buckets": self.buckets}}}
+
+
+@pytest.fixture
+def clock(backend_index, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(backend_index.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def search_client(backend_index, monkeypatch):
+    client = FakeSearchClient()
+    monkeypatch.setattr(backend_index, "get_search_client", lambda: client)
+    monkeypatch.setattr(backend_index, "category_cache", backend_index.TTLCache(ttl=300, max_entries=16))
+    return client
+
+
+def list_categories(backend_index, make="Honda", model="CR-V", year=2021):
+    return backend_index.list_categories(backend_index.CategoryListRequest(make=make, model=model, year=year))
+
+
+def test_entries_expire_after_ttl(backend_index, clock):
+    cache = backend_index.TTLCache(ttl=10, max_entries=4)
+    cache.put("key", "value")
+
+    clock.now += 10
+    assert cache.get("key") == "value"
+    clock.now += 0.1
+    assert cache.get("key") is None
+    assert "key" not in cache._entries
+
+
+def test_put_renews_expiry(backend_index, clock):
+    cache = backend_index.TTLCache(ttl=10, max_entries=4)
+    cache.put("key", "old")
+    clock.now += 8
+    cache.put("key", "new")
+    clock.now += 8
+
+    assert cache.get("key") == "new"
+
+
+def test_least_recently_used_entry_is_evicted(backend_index, clock):
+    cache = backend_index.TTLCache(ttl=10, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_missing_key(backend_index):
+    assert backend_index.TTLCache(ttl=10, max_entries=2).get("missing") is None
+
+
+def test_aggregation_is_mapped_to_categories(backend_index, search_client):
+    response = list_categories(backend_index)
+
+    assert response == {"make": "Honda", "model": "CR-V", "year": 2021, "categories": [
+        {"category": "Wipers", "parts": 7},
+        {"category": "Filters", "parts": 4},
+    ]}
+    index, body = search_client.requests[0]
+    assert index == "compatible-parts"
+    assert body["size"] == 0
+    assert body["query"]["bool"]["must"] == backend_index.vehicle_conditions("Honda", "CR-V", 2021)
+    categories = body["aggs"]["categories"]
+    assert categories["terms"] == {"field": "category.raw", "size": backend_index.CATEGORY_AGG_SIZE}
+    assert categories["aggs"]["parts"]["cardinality"]["field"] == "part_ids"
+
+
+def test_vehicle_without_parts(backend_index, search_client):
+    search_client.buckets = []
+
+    assert list_categories(backend_index, model="Civic")["categories"] == []
+
+
+def test_categories_are_cached_case_insensitively(backend_index, search_client, clock):
+    first = list_categories(backend_index)
+
+    assert list_categories(backend_index, make="HONDA", model="cr-v") == first
+    assert len(search_client.requests) == 1
+
+    list_categories(backend_index, year=2020)
+    assert len(search_client.requests) == 2
+
+    clock.now += 301
+    list_categories(backend_index)
+    assert len(search_client.requests) == 3
+
+
+def test_errors_are_not_cached(backend_index, search_client):
+    search_client.error = OpenSearchConnectionError("N/A", "unreachable", None)
+    with pytest.raises(OpenSearchConnectionError):
+        list_categories(backend_index)
+
+    search_client.error = None
+    assert len(list_categories(backend_index)["categories"]) == 2
+    assert len(search_client.requests) == 2
@@ -0,0 +1,63 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import time
+import threading
+
+import pytest
+
+from feed import iter_batches, merge_changes, updatable_fields
+
+
+def test_batches_by_size():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches(range(5), 2, max_wait=10)) == [[0, 1], [2, 3], [4]]
+
+
+def test_partial_batch_flushes_while_input_is_idle():
+    resume = threading.Event()
+
+    def slow_changes():
+        yield 1
+        yield 2
+        # Like tail -f: no more input until the producer writes again
+        resume.wait(5)
+        yield 3
+
+    started = time.monotonic()
+    batches = iter_batches(slow_changes(), 100, max_wait=0.1)
+    assert next(batches) == [1, 2]
+    assert time.monotonic() - started < 2
+    resume.set()
+    assert list(batches) == [[3]]
+
+
+def test_reader_errors_are_raised():
+    def failing_changes():
+        yield 1
+        raise OSError("stream closed")
+
+    with pytest.raises(OSError):
+        list(iter_batches(failing_changes(), 100, max_wait=10))
+
+
+def test_merge_changes():
+    changes = [
+        {"part_number": "A", "price": 10.0},
+        {"part_number": "A", "in_stock": False, "description": "ignored"},
+        {"part_number": "A", "price": 9.5},
+        {"price": 1.0},
+        {"part_number": "B", "description": "only unknown fields"},
+    ]
+    updates, rejected = merge_changes(changes, {"price", "in_stock"})
+    assert updates == {"A": {"price": 9.5, "in_stock": False}}
+    assert rejected == 2
+
+
+def test_updatable_fields():
+    fields = updatable_fields()
+
+    assert {"price", "in_stock", "description"} <= fields
+    assert "part_number" not in fields
+    # Variants are stored as a whole by the setup handler, not patched field by field
+    assert "variants" not in fields
@@ -0,0 +1,46 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+from fitment import build_fitment_documents, merge_year_ranges, part_id
+
+WIPER = {"part_name": "Wiper Blade", "part_number": "76622-T0A-A01", "description": "26 in. driver side"}
+FILTER = {"part_name": "Oil Filter", "part_number": "15400-PLM-A02", "description": "Engine oil filter"}
+
+
+def test_merge_year_ranges():
+    assert merge_year_ranges([2021, 2019, 2020, 2023, 2020]) == [{"gte": 2019, "lte": 2021}, {"gte": 2023, "lte": 2023}]
+    assert merge_year_ranges([]) == []
+
+
+def test_part_id_is_content_derived():
+    assert part_id(WIPER) == part_id(dict(reversed(list(WIPER.items()))))
+    assert part_id(WIPER) != part_id(dict(WIPER, description="24 in. passenger side"))
+
+
+def test_build_fitment_documents_shares_parts():
+    preload = [
+        {"manufacturer": "Honda", "make": "Honda", "model": "CR-V", "years": [2020, 2021, 2022], "category": "Wipers",
+         "parts": [WIPER]},
+        {"manufacturer": "Honda", "make": "Honda", "model": "Civic", "years": [2018, 2022], "category": "Maintenance",
+         "parts": [WIPER, FILTER]},
+    ]
+    documents, parts_table = build_fitment_documents(preload)
+
+    assert len(parts_table) == 2
+    assert {part["part_id"] for part in parts_table} == {part_id(WIPER), part_id(FILTER)}
+    assert documents[0]["year_ranges"] == [{"gte": 2020, "lte": 2022}]
+    assert documents[1]["year_ranges"] == [{"gte": 2018, "lte": 2018}, {"gte": 2022, "lte": 2022}]
+    assert documents[1]["part_ids"] == [part_id(WIPER), part_id(FILTER)]
+    assert documents[1]["part_names"] == ["Wiper Blade", "Oil Filter"]
+    assert "parts" not in documents[0] and "years" not in documents[0]
+
+
+def test_round_trip_restores_years_and_parts():
+    preload = [{"manufacturer": "Honda", "make": "Honda", "model": "CR-V", "years": [2021, 2019, 2020],
+                "category": "Wipers", "parts": [WIPER, FILTER]}]
+    documents, parts_table = build_fitment_documents(preload)
+    table = {part["part_id"]: {k: v for k, v in part.items() if k != "part_id"} for part in parts_table}
+
+    years = sorted(year for year_range in documents[0]["year_ranges"] for year in range(year_range["gte"], year_range["lte"] + 1))
+    assert years == sorted(preload[0]["years"])
+    assert [table[key] for key in documents[0]["part_ids"]] == preload[0]["parts"]
@@ -0,0 +1,162 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import os
+import threading
+
+import pytest
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError, TransportError
+
+from index import group_records
+from pipeline import catalog as compiler
+
+PRELOAD_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "infra", "assets", "setup-opensearch", "inventory-index", "preload.json")
+
+INVENTORY = [
+    {"manufacturer": "Honda", "category": "Wipers", "part_name": "Wiper Blade", "part_number": "76622-T0A-A01",
+     "price": 24.99, "currency": "USD", "in_stock": True},
+    {"manufacturer": "Honda", "category": "Filters", "part_name": "Oil Filter", "part_number": "15400-PLM-A02",
+     "price": 8.5, "currency": "USD"},
+]
+
+
+class FakeIndexClient:
+    """Serves _mget from documents keyed by ID, like the inventory index."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def mget(self, index, body):
+        with self._lock:
+            self.requests.append(list(body["ids"]))
+        return {"docs": [
+            {"_index": index, "_id": doc_id, "found": True, "_source": self.documents[doc_id]}
+            if doc_id in self.documents else {"_index": index, "_id": doc_id, "found": False}
+            for doc_id in body["ids"]
+        ]}
+
+
+def keyed(records):
+    documents, _ = group_records(records, "part_number")
+    return {document["part_number"]: document for document in documents}
+
+
+class UnavailableClient:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def mget(self, **kwargs):
+        raise self.error
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch, backend_index):
+    path = str(tmp_path / "catalog.bin")
+    compiler.compile_catalog(INVENTORY, [], path)
+    monkeypatch.setenv("CATALOG_PATH", path)
+    backend_index.load_catalog.cache_clear()
+    yield path
+    backend_index.load_catalog.cache_clear()
+
+
+def get_parts(backend_index, monkeypatch, client, part_ids):
+    monkeypatch.setattr(backend_index, "get_search_client", lambda: client)
+    return backend_index.get_part_from_inventory(backend_index.PartFromInventoryRequest(part_ids=part_ids))
+
+
+def test_unreachable_inventory_falls_back_to_catalog(backend_index, monkeypatch, catalog_file):
+    client = UnavailableClient(OpenSearchConnectionError("N/A", "unreachable", None))
+
+    response = get_parts(backend_index, monkeypatch, client, ["15400-PLM-A02", "00000-XXX-000", "15400-PLM-A02"])
+
+    assert response["results"] == [{"_index": "catalog", "_id": "15400-PLM-A02", "_source": INVENTORY[1]}]
+    assert "out of date" in response["message"]
+
+
+def test_bad_request_is_not_served_from_catalog(backend_index, monkeypatch, catalog_file):
+    client = UnavailableClient(TransportError(400, "parsing_exception", {}))
+
+    with pytest.raises(TransportError):
+        get_parts(backend_index, monkeypatch, client, "76622-T0A-A01")
+
+
+def test_no_fallback_without_catalog(backend_index, monkeypatch, tmp_path):
+    monkeypatch.setenv("CATALOG_PATH", str(tmp_path / "missing.bin"))
+    backend_index.load_catalog.cache_clear()
+    client = UnavailableClient(OpenSearchConnectionError("N/A", "unreachable", None))
+
+    try:
+        with pytest.raises(OpenSearchConnectionError):
+            get_parts(backend_index, monkeypatch, client, "76622-T0A-A01")
+    finally:
+        backend_index.load_catalog.cache_clear()
+
+
+def test_group_records_keeps_variants():
+    wiper, filter_a, filter_b = INVENTORY[0], INVENTORY[1], {**INVENTORY[1], "price": 9.25, "in_stock": False}
+
+    documents, conflicts = group_records([wiper, filter_a, dict(wiper), filter_b, dict(filter_b)], "part_number")
+
+    assert documents == [wiper, {**filter_a, "variants": [filter_b]}]
+    assert conflicts == {"15400-PLM-A02": ["in_stock", "price"]}
+
+
+def test_documents_keep_request_order(backend_index):
+    client = FakeIndexClient(keyed(INVENTORY))
+
+    results = backend_index.get_documents_by_id(client, "inventory", ["15400-PLM-A02", "76622-T0A-A01"])
+
+    assert [(doc["_index"], doc["_id"]) for doc in results] == [
+        ("inventory", "15400-PLM-A02"), ("inventory", "76622-T0A-A01")]
+    assert [doc["_source"] for doc in results] == [INVENTORY[1], INVENTORY[0]]
+
+
+def test_duplicate_and_unknown_ids_are_skipped(backend_index):
+    client = FakeIndexClient(keyed(INVENTORY))
+
+    results = backend_index.get_documents_by_id(
+        client, "inventory", ["76622-T0A-A01", "00000-XXX-000", "76622-T0A-A01"])
+
+    assert [doc["_id"] for doc in results] == ["76622-T0A-A01"]
+    assert client.requests == [["76622-T0A-A01", "00000-XXX-000"]]
+    assert backend_index.get_documents_by_id(client, "inventory", []) == []
+
+
+def test_variants_are_returned_as_separate_results(backend_index):
+    variant = {**INVENTORY[1], "price": 9.25}
+    client = FakeIndexClient(keyed(INVENTORY + [variant]))
+
+    results = backend_index.get_documents_by_id(client, "inventory", ["15400-PLM-A02", "76622-T0A-A01"])
+
+    assert [doc["_id"] for doc in results] == ["15400-PLM-A02", "15400-PLM-A02", "76622-T0A-A01"]
+    assert [doc["_source"] for doc in results] == [INVENTORY[1], variant, INVENTORY[0]]
+    # The stored document is not modified by flattening
+    assert client.documents["15400-PLM-A02"]["variants"] == [variant]
+
+
+def test_large_id_lists_are_fetched_in_chunks(backend_index, monkeypatch):
+    monkeypatch.setattr(backend_index, "MGET_CHUNK_SIZE", 3)
+    documents = {f"P-{number:02d}": {"part_number": f"P-{number:02d}"} for number in range(10)}
+    client = FakeIndexClient(documents)
+    ids = [f"P-{number:02d}" for number in reversed(range(12))]
+
+    results = backend_index.get_documents_by_id(client, "inventory", ids)
+
+    assert [doc["_id"] for doc in results] == [doc_id for doc_id in ids if doc_id in documents]
+    assert sorted(client.requests) == sorted([ids[0:3], ids[3:6], ids[6:9], ids[9:12]])
+
+
+def test_preload_records_all_survive_indexing(backend_index):
+    with open(PRELOAD_FILE) as f:
+        records = json.load(f)
+    client = FakeIndexClient(keyed(records))
+
+    results = backend_index.get_documents_by_id(client, "inventory", [record["part_number"] for record in records])
+
+    distinct = {json.dumps(record, sort_keys=True) for record in records}
+    assert len(results) == len(distinct)
+    assert {json.dumps(doc["_source"], sort_keys=True) for doc in results} == distinct
@@ -0,0 +1,76 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+
+from manual_search import ManualIndex, tokenize
+from pipeline import bm25
+
+PASSAGES = [
+    {"source": "crv.pdf", "section": "Bulbs", "page": 12, "text": "Low beam headlight bulb H11, high beam 9005."},
+    {"source": "crv.pdf", "section": "Wipers", "page": 40, "text": "Wiper blade length 26 in. driver side, 17 in. passenger."},
+    {"source": "civic.pdf", "section": "Oil", "page": 8, "text": "Use 0W-20 engine oil. Capacity 3.7 L with filter."},
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = str(tmp_path / "manual_index.bin")
+    bm25.write_index(PASSAGES, path)
+    return path
+
+
+def test_tokenizers_match():
+    text = "The CR-V uses 5W-30 oil and an H11/9005 bulb."
+    assert tokenize(text) == bm25.tokenize(text)
+    assert "cr-v" in tokenize(text) and "cr" in tokenize(text) and "v" in tokenize(text)
+
+
+def test_round_trip(index_path):
+    index = ManualIndex(index_path)
+    assert index.doc_count == len(PASSAGES)
+    for doc_id, passage in enumerate(PASSAGES):
+        assert index.passage(doc_id) == passage
+
+
+def test_search_ranks_matching_passage_first(index_path):
+    index = ManualIndex(index_path)
+    results = index.search("low beam bulb", top_k=2)
+    assert results[0]["section"] == "Bulbs"
+    assert results[0]["score"] > 0
+    assert index.search("0w-20 oil")[0]["section"] == "Oil"
+    assert index.search("transmission") == []
+
+
+def test_empty_index(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    assert bm25.write_index([], path) == (0, 0)
+    assert ManualIndex(path).search("bulb") == []
+
+
+@pytest.mark.parametrize("size", [0, 10, bm25.HEADER.size, -1])
+def test_truncated_file_is_rejected(index_path, size):
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    with open(index_path, 'wb') as f:
+        f.write(data[:size])
+    with pytest.raises(ValueError):
+        ManualIndex(index_path)
+
+
+def test_wrong_magic_is_rejected(index_path):
+    with open(index_path, 'r+b') as f:
+        f.write(b"NOTBM25!")
+    with pytest.raises(ValueError, match="Unsupported"):
+        ManualIndex(index_path)
+
+
+def test_corrupt_offsets_are_rejected(index_path):
+    with open(index_path, 'rb') as f:
+        header = list(bm25.HEADER.unpack(f.read(bm25.HEADER.size)))
+    # Point the document table past the end of the file
+    header[7] += 1 << 20
+    with open(index_path, 'r+b') as f:
+        f.write(bm25.HEADER.pack(*header))
+    with pytest.raises(ValueError):
+        ManualIndex(index_path)
@@ -0,0 +1,143 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import os
+
+import pytest
+
+from pipeline import manuals
+
+
+def make_pdf(pages):
+    """Write a minimal PDF with one text line per entry on each page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "\n".join(["BT /F1 12 Tf 14 TL 72 720 Td"] + [f"({line}) Tj T*" for line in lines] + ["ET"])
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    content, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(content))
+        content += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    content += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return content
+
+
+def words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_normalize_text():
+    text = "Re\u00adplace the \ufb01lter  and\t check the  hose-\nclamps.\n12\nPage 3 / 40\n\n\n\nTorque to 25 Nm."
+
+    assert manuals.normalize_text(text) == "Replace the filter and check the hoseclamps.\n\nTorque to 25 Nm."
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("Wiper Blades", True),
+    ("3.2 replacing the bulbs", True),
+    ("MAINTENANCE SCHEDULE", True),
+    ("Oil Filter (Engine)", True),
+    ("Check the oil level", False),
+    ("The driver side blade is 26 in. long.", False),
+    ("Check the following:", False),
+    ("", False),
+    ("2024", False),
+    (" ".join(["Word"] * 11), False),
+])
+def test_is_heading(line, expected):
+    assert manuals.is_heading(line) is expected
+
+
+def test_split_sections_tracks_paragraph_pages():
+    pages = [
+        (1, "Introductory text\nwithout a heading."),
+        (2, "Wiper Blades\nThe driver side blade\nis 26 in. long.\n\nReplace blades every year."),
+        (3, "Check the blades for cracks."),
+        (4, "Headlights\nLow beam bulb is H11."),
+    ]
+
+    assert manuals.split_sections(pages) == [
+        ("", [(1, "Introductory text without a heading.")]),
+        ("Wiper Blades", [
+            (2, "The driver side blade is 26 in. long."),
+            (2, "Replace blades every year."),
+            (3, "Check the blades for cracks."),
+        ]),
+        ("Headlights", [(4, "Low beam bulb is H11.")]),
+    ]
+
+
+def test_split_sections_keeps_paragraph_start_page():
+    pages = [(5, "Coolant\nUse the long life coolant"), (6, "mixed 50/50 with water.")]
+
+    assert manuals.split_sections(pages) == [("Coolant", [(5, "Use the long life coolant"), (6, "mixed 50/50 with water.")])]
+
+
+def test_chunks_respect_sections_and_overlap():
+    sections = [
+        ("Oil", [(3, words("a", 12)), (3, words("b", 12)), (4, words("c", 5)), (5, words("d", 12))]),
+        ("Bulbs", [(6, words("e", 4))]),
+    ]
+
+    chunks = manuals.chunk_sections("crv.pdf", sections, max_tokens=31, overlap_percentage=20)
+
+    assert [(chunk.section, chunk.page) for chunk in chunks] == [("Oil", 3), ("Oil", 4), ("Bulbs", 6)]
+    assert chunks[0].text == f"Oil\n\n{words('a', 12)}\n\n{words('b', 12)}\n\n{words('c', 5)}"
+    # The short trailing paragraph is carried over and sets the page of the next chunk
+    assert chunks[1].text == f"Oil\n\n{words('c', 5)}\n\n{words('d', 12)}"
+    assert chunks[2].text == f"Bulbs\n\n{words('e', 4)}"
+    assert all(chunk.source == "crv.pdf" for chunk in chunks)
+    assert all(manuals.count_tokens(chunk.text) <= 31 for chunk in chunks)
+
+
+def test_oversized_paragraphs_are_split_in_order():
+    paragraph = "One two three four. Five six seven eight nine ten eleven twelve. Done."
+
+    chunks = manuals.chunk_sections("crv.pdf", [("", [(7, paragraph)])], max_tokens=6, overlap_percentage=0)
+
+    assert [chunk.text for chunk in chunks] == ["One two three four.", "Five six seven", "eight nine ten eleven twelve.", "Done."]
+    assert {chunk.page for chunk in chunks} == {7}
+
+
+def test_process_manuals_reuses_unchanged_manuals(tmp_path):
+    manuals_dir, output_dir = tmp_path / "manuals", tmp_path / "chunks"
+    manuals_dir.mkdir()
+    (manuals_dir / "crv.pdf").write_bytes(make_pdf([
+        ["Wiper Blades", "The driver side blade is 26 in. long."],
+        ["Headlights", "Low beam bulb is H11."],
+    ]))
+
+    first = manuals.process_manuals(str(manuals_dir), str(output_dir), max_workers=1)
+
+    assert (first.manuals, first.manuals_reused, first.pages) == (1, 0, 2)
+    assert (first.chunks, first.chunks_written) == (2, 2)
+    pages = {}
+    for file_name in first.files:
+        with open(output_dir / f"{file_name}.metadata.json") as f:
+            attributes = json.load(f)["metadataAttributes"]
+        pages[attributes["section"]] = attributes["page"]
+    assert pages == {"Wiper Blades": 1, "Headlights": 2}
+
+    second = manuals.process_manuals(str(manuals_dir), str(output_dir), max_workers=1)
+
+    assert (second.manuals_reused, second.pages, second.chunks_written, second.chunks_removed) == (1, 0, 0, 0)
+    assert second.chunks_reused == 2
+    assert second.files == first.files
+
+    # Other settings invalidate the manifest entry, and chunk files that are no longer produced are removed
+    third = manuals.process_manuals(str(manuals_dir), str(output_dir), max_tokens=8, max_workers=1)
+
+    assert (third.manuals_reused, third.pages) == (0, 2)
+    assert third.chunks_removed == len(set(first.files) - set(third.files))
+    assert sorted(os.listdir(output_dir)) == sorted(
+        [manuals.MANIFEST_FILE] + third.files + [f"{file_name}.metadata.json" for file_name in third.files])
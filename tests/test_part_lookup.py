@@ -0,0 +1,57 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+
+from catalog import Catalog
+from part_lookup import PartNumberIndex, candidate_distance, normalize
+from pipeline.catalog import compile_catalog
+
+PART_NUMBERS = ["76622-T0A-A01", "76622-T0A-A02", "76630-TLA-A01", "FD3Z-13008-A", "15400-PLM-A02"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    compile_catalog([{"part_number": number, "part_name": f"Part {number}"} for number in PART_NUMBERS], [], path)
+    return PartNumberIndex(Catalog(path))
+
+
+def test_normalize():
+    assert normalize("76622-t0a a01") == "76622T0AA01"
+
+
+@pytest.mark.parametrize("query, key, distance", [
+    ("ABC", "ABC", 0),
+    ("ABD", "ABC", 1),
+    ("ACB", "ABC", 1),
+    ("AB", "ABC", 1),
+    ("ABCD", "ABC", 1),
+    ("XBD", "ABC", 2),
+])
+def test_candidate_distance(query, key, distance):
+    assert candidate_distance(query, key) == distance
+
+
+def test_exact_match_ignores_separators_and_case(index):
+    result = index.lookup("fd3z13008a")
+    assert [part["part_number"] for part in result["exact"]] == ["FD3Z-13008-A"]
+    assert result["suggestions"] == []
+
+
+def test_prefix_matches(index):
+    result = index.lookup("76622-T0A", limit=1)
+    assert result["prefix_match_count"] == 2
+    assert [part["part_number"] for part in result["prefix_matches"]] == ["76622-T0A-A01"]
+
+
+def test_typo_suggestions(index):
+    # Transposed digits and a dropped character
+    suggestions = index.lookup("15400-PLM-A20")["suggestions"]
+    assert suggestions[0]["part_number"] == "15400-PLM-A02" and suggestions[0]["distance"] == 1
+    assert index.lookup("76630-TL-A01")["suggestions"][0]["part_number"] == "76630-TLA-A01"
+    assert index.lookup("99999-XXX-X99")["suggestions"] == []
+
+
+def test_empty_query(index):
+    assert index.lookup(" - ")["exact"] == []
@@ -0,0 +1,121 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import sys
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import profiling
+from profiling import SamplingProfiler, requested
+
+
+def profiler_with(stacks) -> SamplingProfiler:
+    profiler = SamplingProfiler(interval_ms=5)
+    profiler.stacks = Counter(stacks)
+    return profiler
+
+
+def test_top_self_time():
+    profiler = profiler_with({
+        ("main", "handler", "mget"): 6,
+        ("main", "handler"): 2,
+        ("worker", "fetch", "mget"): 2,
+        ("main", "handler", "json"): 1,
+        ("main", "handler", "sort"): 1,
+    })
+
+    top = profiler.top_self_time(top_n=2)
+
+    assert top == [
+        {"function": "mget", "samples": 8, "selfMs": 40.0, "percent": 66.7},
+        {"function": "handler", "samples": 2, "selfMs": 10.0, "percent": 16.7},
+    ]
+    assert SamplingProfiler().top_self_time() == []
+
+
+def test_collapsed_stacks():
+    profiler = profiler_with({("main", "handler", "mget"): 3, ("worker", "fetch"): 5})
+
+    assert profiler.collapsed() == "worker;fetch 5\nmain;handler;mget 3\n"
+    assert SamplingProfiler().collapsed() == ""
+
+
+@pytest.mark.parametrize("event, expected", [
+    ({"sessionAttributes": {"profile": "true"}}, True),
+    ({"sessionAttributes": {"profile": "TRUE"}}, True),
+    ({"sessionAttributes": {"profile": "1"}}, True),
+    ({"sessionAttributes": {"profile": "false"}}, False),
+    ({"sessionAttributes": {}}, False),
+    ({"sessionAttributes": None}, False),
+    ({}, False),
+    (None, False),
+    ("profile", False),
+])
+def test_requested(event, expected):
+    assert requested(event) is expected
+
+
+def test_parked_threads_are_not_sampled():
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            sum(range(1000))
+
+    waiting = threading.Thread(target=stop.wait, name="waiting")
+    busy = threading.Thread(target=spin, name="busy")
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="idle-pool")
+    executor.submit(lambda: None).result()
+    waiting.start()
+    busy.start()
+    try:
+        time.sleep(0.05)
+        profiler = SamplingProfiler()
+        profiler._sample(None, sys._getframe())
+    finally:
+        stop.set()
+        waiting.join()
+        busy.join()
+        executor.shutdown()
+
+    threads = {stack[0] for stack in profiler.stacks}
+    assert "main" in threads and "busy" in threads
+    assert "waiting" not in threads
+    assert not any(name.startswith("idle-pool") for name in threads)
+
+
+def test_handler_is_not_wrapped_when_disabled(monkeypatch):
+    def handler(event, context):
+        return "result"
+
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+
+    assert profiling.profiled(handler) is handler
+
+
+def test_requested_invocations_are_profiled(monkeypatch):
+    written = []
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling, "write_profile", lambda profiler, name: written.append((profiler, name)) or name)
+
+    def busy_handler(event, context):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        return "result"
+
+    handler = profiling.profiled(busy_handler)
+
+    assert handler({"sessionAttributes": {}}, None) == "result"
+    assert written == []
+
+    assert handler({"sessionAttributes": {"profile": "true"}}, None) == "result"
+    assert len(written) == 1
+    profiler, _ = written[0]
+    assert profiler.samples > 0
+    assert any("busy_handler" in frame for stack in profiler.stacks for frame in stack)
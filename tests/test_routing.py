@@ -0,0 +1,184 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import time
+import threading
+
+import pytest
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError, TransportError
+
+from routing import EndpointRouter, RoutedClient, is_endpoint_failure, parse_endpoints
+
+
+class FakeClient:
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.error = None
+        self.calls = 0
+
+    def search(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.error:
+            raise self.error
+        return {"endpoint": self.name}
+
+    mget = search
+
+
+def router(*clients, probe_interval=60.0, **kwargs) -> EndpointRouter:
+    return EndpointRouter({client.name: client for client in clients}, probe=lambda client: client.search(),
+                          probe_interval=probe_interval, **kwargs)
+
+
+def down() -> Exception:
+    return OpenSearchConnectionError("N/A", "unreachable", None)
+
+
+def test_parse_endpoints():
+    assert parse_endpoints("abc.us-west-2.aoss.amazonaws.com, other.example.com@eu-west-1,,plain", "us-east-1") == [
+        ("abc.us-west-2.aoss.amazonaws.com", "us-west-2"),
+        ("other.example.com", "eu-west-1"),
+        ("plain", "us-east-1"),
+    ]
+    assert parse_endpoints(" , ", "us-east-1") == []
+
+
+def test_router_needs_endpoints():
+    with pytest.raises(ValueError):
+        EndpointRouter({})
+
+
+def test_endpoint_failures():
+    assert is_endpoint_failure(down())
+    assert is_endpoint_failure(TransportError(503, "unavailable"))
+    assert is_endpoint_failure(TransportError(429, "throttled"))
+    assert not is_endpoint_failure(TransportError(400, "bad request"))
+
+
+def test_routes_to_lowest_latency():
+    fast, slow = FakeClient("fast", 0.001), FakeClient("slow", 0.02)
+    routed = router(slow, fast)
+    for _ in range(10):
+        routed.call(lambda client: client.search())
+    assert routed.ranked() == ["fast", "slow"]
+    fast.calls = slow.calls = 0
+    for _ in range(10):
+        assert RoutedClient(routed).search(index="inventory")["endpoint"] == "fast"
+    assert slow.calls == 0
+
+
+def test_ewma_latency():
+    routed = router(FakeClient("a"), alpha=0.5)
+    routed.record("a", 10.0, failed=False)
+    routed.record("a", 20.0, failed=False)
+    assert routed.stats["a"].latency_ms == pytest.approx(15.0)
+
+
+def test_fails_over_and_trips_unhealthy_endpoint():
+    primary, secondary = FakeClient("primary"), FakeClient("secondary", 0.005)
+    routed = router(primary, secondary)
+    # Unmeasured endpoints are tried first, so both have a latency afterwards
+    for _ in range(2):
+        routed.call(lambda client: client.search())
+    primary.error = down()
+    for _ in range(3):
+        assert routed.call(lambda client: client.search())["endpoint"] == "secondary"
+    assert not routed.stats["primary"].healthy
+    calls = primary.calls
+    routed.call(lambda client: client.search())
+    assert primary.calls == calls
+
+
+def test_bad_request_is_not_failed_over():
+    primary, secondary = FakeClient("primary"), FakeClient("secondary", 0.005)
+    routed = router(primary, secondary)
+    primary.error = TransportError(400, "bad request")
+    with pytest.raises(TransportError):
+        routed.call(lambda client: client.search())
+    assert secondary.calls == 0
+    assert routed.stats["primary"].healthy
+
+
+def test_raises_last_error_when_every_endpoint_fails():
+    a, b = FakeClient("a"), FakeClient("b")
+    routed = router(a, b)
+    a.error = b.error = down()
+    with pytest.raises(OpenSearchConnectionError):
+        routed.call(lambda client: client.search())
+
+
+def trip(routed, client):
+    client.error = down()
+    for _ in range(3):
+        routed.call(lambda c: c.search())
+    assert not routed.stats[client.name].healthy
+
+
+def test_unhealthy_endpoint_recovers_after_probe():
+    primary, secondary = FakeClient("primary"), FakeClient("secondary", 0.005)
+    routed = router(primary, secondary, probe_interval=0.05)
+    trip(routed, primary)
+
+    primary.error = None
+    time.sleep(0.06)
+    # The call that finds the probe due starts it in the background
+    assert routed.call(lambda client: client.search())["endpoint"] == "secondary"
+    deadline = time.monotonic() + 2
+    while not routed.stats["primary"].healthy and time.monotonic() < deadline:
+        time.sleep(0.005)
+    stats = routed.stats["primary"]
+    assert stats.healthy and stats.error_rate == 0.0 and stats.consecutive_failures == 0
+    assert routed.call(lambda client: client.search())["endpoint"] == "primary"
+
+
+def test_calls_do_not_wait_for_probes():
+    primary, secondary = FakeClient("primary"), FakeClient("secondary")
+    release = threading.Event()
+    probes = []
+
+    def probe(client):
+        probes.append(client.name)
+        release.wait(5)
+
+    routed = EndpointRouter({"primary": primary, "secondary": secondary}, probe=probe, probe_interval=0)
+    trip(routed, primary)
+    try:
+        started = time.perf_counter()
+        for _ in range(5):
+            assert routed.call(lambda client: client.search())["endpoint"] == "secondary"
+        assert time.perf_counter() - started < 1
+        # A probe that is still running is not started again
+        assert probes == ["primary"]
+    finally:
+        release.set()
+        routed.close()
+
+
+def test_only_unhealthy_endpoints_are_probed():
+    probes = []
+    primary, secondary = FakeClient("primary"), FakeClient("secondary", 0.005)
+    routed = EndpointRouter({"primary": primary, "secondary": secondary},
+                            probe=lambda client: probes.append(client.name), probe_interval=0)
+    for _ in range(5):
+        routed.call(lambda client: client.search())
+    assert routed.probe_due() == []
+    assert probes == []
+    # Latency of healthy endpoints comes from the calls themselves
+    assert routed.stats["primary"].latency_ms is not None and routed.stats["secondary"].latency_ms is not None
+
+
+def test_probes_are_rate_limited():
+    primary, secondary = FakeClient("primary"), FakeClient("secondary", 0.005)
+    routed = router(primary, secondary, probe_interval=0.2)
+    trip(routed, primary)
+    calls = primary.calls
+
+    # Nothing is due until a full interval after the endpoint was taken out of rotation
+    assert routed.probe_due() == []
+    time.sleep(0.21)
+    for future in routed.probe_due():
+        future.result()
+    assert routed.probe_due() == []
+    assert primary.calls == calls + 1
@@ -0,0 +1,182 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from admission import AdmissionController
+from session_store import verify_session_token
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.append(BENCHMARKS_DIR)
+
+from fake_agent import FakeAgentClient, StreamProfile  # noqa: E402
+
+
+class ClosableStream:
+    """Stands in for the botocore event stream, which raises once closed from another thread."""
+
+    def __init__(self, events):
+        self._events = iter(events)
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed.is_set():
+            raise ValueError("I/O operation on closed stream")
+        return next(self._events)
+
+    def close(self):
+        self.closed.set()
+
+
+class RecordingAgentClient(FakeAgentClient):
+    def __init__(self, profile):
+        super().__init__(profile)
+        self.session_ids = []
+        self.streams = []
+
+    def invoke_agent(self, **kwargs):
+        response = super().invoke_agent(**kwargs)
+        response["completion"] = ClosableStream(response["completion"])
+        self.session_ids.append(kwargs["sessionId"])
+        self.streams.append(response["completion"])
+        return response
+
+
+def parse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def agent(chatbot, monkeypatch):
+    client = RecordingAgentClient(StreamProfile(parts=2, orchestration_steps=1, chunk_size=16, answer_words=20))
+    monkeypatch.setattr(chatbot, "client", client)
+    monkeypatch.setattr(chatbot, "admission", AdmissionController(rate=1000, burst=1000, max_queue=10, max_wait=5))
+    return client
+
+
+def serve(test):
+    """Run ``test(client, server)`` against a chat server on a local port."""
+    import server as chat_server
+
+    async def run():
+        server = chat_server.ChatServer(workers=4)
+        async with TestClient(TestServer(server.create_app())) as client:
+            await test(client, server)
+
+    asyncio.run(run())
+
+
+async def new_session(client):
+    response = await client.post("/sessions")
+    assert response.status == 201
+    return (await response.json())["session_id"]
+
+
+def test_sessions_are_signed_tokens(agent):
+    async def test(client, server):
+        first, second = await new_session(client), await new_session(client)
+        assert first != second
+        assert verify_session_token(first) is not None
+
+    serve(test)
+
+
+@pytest.mark.parametrize("session_id", ["my-session", "abc.def"])
+def test_unsigned_session_ids_are_rejected(agent, session_id):
+    async def test(client, server):
+        response = await client.post(f"/sessions/{session_id}/messages", json={"prompt": "Hello"})
+        assert response.status == 404
+        token = await new_session(client)
+        response = await client.post(f"/sessions/{token}x/messages", json={"prompt": "Hello"})
+        assert response.status == 404
+
+    serve(test)
+    assert agent.session_ids == []
+
+
+def test_body_without_prompt_is_rejected(agent):
+    async def test(client, server):
+        token = await new_session(client)
+        response = await client.post(f"/sessions/{token}/messages", data="not json")
+        assert response.status == 400
+
+    serve(test)
+
+
+def test_turn_streams_traces_chunks_and_done(agent):
+    async def test(client, server):
+        token = await new_session(client)
+        response = await client.post(f"/sessions/{token}/messages", json={"prompt": "What wipers fit a 2021 CR-V?"})
+        assert response.status == 200
+        assert response.headers["Content-Type"] == "text/event-stream"
+        events = parse_events(await response.text())
+
+        kinds = [kind for kind, _ in events]
+        first_chunk = kinds.index("chunk")
+        assert set(kinds[:first_chunk]) == {"trace"}
+        assert kinds[first_chunk:-2] == ["chunk"] * (len(kinds) - first_chunk - 2)
+        # The turn ends with the time the last chunk arrived, then the summary
+        assert kinds[-2:] == ["trace", "done"]
+        assert "responseStream" in events[-2][1]
+
+        done = events[-1][1]
+        assert done["response"] == "".join(data["text"] for kind, data in events if kind == "chunk")
+        assert "<structured_data>" in done["response"]
+        assert [step["step"] for step in done["waterfall"]][-2:] == ["generation", "streaming"]
+        assert agent.session_ids == [verify_session_token(token)]
+        assert server.active_turns == 0 and not server.session_locks
+
+    serve(test)
+
+
+def test_busy_agent_returns_error_event(agent, chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "admission", AdmissionController(rate=1000, burst=1000, max_queue=0))
+
+    async def test(client, server):
+        token = await new_session(client)
+        response = await client.post(f"/sessions/{token}/messages", json={"prompt": "Hello"})
+        events = parse_events(await response.text())
+
+        assert events == [("error", {"error": chatbot.BUSY_MESSAGE}),
+                          ("done", {"response": "", "waterfall": []})]
+
+    serve(test)
+    assert agent.session_ids == []
+
+
+def test_client_disconnect_closes_agent_stream(agent):
+    agent.profile.chunk_size = 4
+    agent.profile.chunk_delay = 0.02
+
+    async def test(client, server):
+        token = await new_session(client)
+        response = await client.post(f"/sessions/{token}/messages", json={"prompt": "Hello"})
+        async for line in response.content:
+            if line.startswith(b"event: chunk"):
+                break
+        response.close()
+
+        deadline = time.monotonic() + 5
+        while server.active_turns and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        assert server.active_turns == 0 and not server.session_locks
+
+    serve(test)
+    assert len(agent.streams) == 1
+    assert agent.streams[0].closed.is_set()
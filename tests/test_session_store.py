@@ -0,0 +1,56 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import pytest
+
+from session_store import (MemorySessionStore, SessionStore, SQLiteSessionStore, compact_message,
+                           new_session_token, verify_session_token)
+
+
+def test_session_tokens():
+    token = new_session_token("secret")
+    session_id = verify_session_token(token, "secret")
+    assert session_id and len(session_id) >= 43
+    assert new_session_token("secret") != token
+    assert verify_session_token(token, "other secret") is None
+
+
+@pytest.mark.parametrize("token", ["", "abc", "abc.", ".sig", "my-own-session-id"])
+def test_client_chosen_ids_are_rejected(token):
+    assert verify_session_token(token, "secret") is None
+
+
+def test_tampered_token_is_rejected():
+    session_id, _, signature = new_session_token("secret").rpartition(".")
+    assert verify_session_token(f"{session_id}x.{signature}", "secret") is None
+
+
+def test_incomplete_backend_fails_on_creation():
+    class ReadOnlyStore(SessionStore):
+        def _read(self, session_id):
+            return []
+
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
+
+
+@pytest.mark.parametrize("create", [
+    lambda: MemorySessionStore(flush_interval=60),
+    lambda: SQLiteSessionStore(":memory:", flush_interval=60),
+])
+def test_append_flush_load_clear(create):
+    store = create()
+    try:
+        question = {"role": "user", "content": "Which wipers fit?"}
+        answer = {"role": "assistant", "content": "26 in.", "trace": [{"prompt": "x" * 5000}]}
+        store.append("a", question, answer)
+        store.flush()
+        store._cache.clear()
+        loaded = store.load("a")
+        assert loaded == [question, compact_message(answer)]
+        assert len(loaded[1]["trace"][0]["prompt"]) < 5000
+        assert store.load("b") == []
+        store.clear("a")
+        assert store.load("a") == []
+    finally:
+        store.close()
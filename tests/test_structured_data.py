@@ -0,0 +1,54 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+
+from structured_data import card_text, collect_parts, extract_structured_data
+
+PART = {"part_number": "76622-T0A-A01", "description": "Wiper blade, 26 in. driver side for 2017-2022 CR-V",
+        "price": 24.99, "currency": "USD", "in_stock": False, "rating": 4.5}
+
+
+def wrap(data) -> str:
+    return f"Here is the wiper blade.\n<structured_data>{json.dumps(data)}</structured_data>"
+
+
+def test_source_format():
+    text, data = extract_structured_data(wrap([{"_index": "inventory", "_id": "1", "_source": PART}]))
+    assert text == "Here is the wiper blade."
+    assert data == [PART]
+
+
+def test_parts_format_is_flattened():
+    _, data = extract_structured_data(wrap([{"make": "Honda", "parts": [PART]}, {"make": "Honda", "parts": [PART]}]))
+    assert data == {"parts": [PART, PART]}
+
+
+def test_question_and_sources_tags():
+    text, data = extract_structured_data("<question>Which wiper?</question> Use 26 in. <sources>manual p. 40</sources>")
+    assert text == "**Question:** Which wiper? Use 26 in. **Sources:** manual p. 40"
+    assert data is None
+
+
+def test_invalid_json_is_kept_as_text():
+    _, data = extract_structured_data("Answer <structured_data>{not json</structured_data>")
+    assert data == "{not json"
+
+
+def test_collect_parts():
+    assert collect_parts({"parts": [PART]}) == ([PART], [])
+    assert collect_parts([PART, {"parts": [PART]}]) == ([PART, PART], [])
+    parts, errors = collect_parts([PART, "stray text"])
+    assert parts == [PART] and len(errors) == 1
+    assert collect_parts("plain text")[0] == []
+
+
+def test_card_text():
+    assert card_text(PART) == [
+        "Part #: 76622-T0A-A01",
+        "Wiper blade, 26 in. driver side for 2017...",
+        "$24.99 USD",
+        "Out of Stock",
+        "Rating: 4.5",
+    ]
+    assert card_text({}) == ["Part #: N/A", "No description"]
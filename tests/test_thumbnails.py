@@ -0,0 +1,102 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+import os
+
+import pytest
+
+from thumbnails import ThumbnailCache
+from pipeline import thumbnails as builder
+
+
+def write_inventory(path, images):
+    with open(path, 'w') as f:
+        json.dump([{"part_number": str(i), "images": image} for i, image in enumerate(images)], f)
+    return str(path)
+
+
+def write_image(path, color):
+    Image = pytest.importorskip("PIL.Image")
+    Image.new("RGB", (640, 480), color).save(str(path))
+
+
+@pytest.fixture
+def thumbnail_dir(tmp_path):
+    directory = tmp_path / "thumbnails"
+    directory.mkdir()
+    for name in ("a.webp", "b.webp", "c.webp"):
+        (directory / name).write_bytes(b"webp")
+    (directory / builder.MANIFEST_FILE).write_text(json.dumps(
+        {"a.png": "a.webp", "b.png": "b.webp", "c.png": "c.webp", "gone.png": "gone.webp"}))
+    return str(directory)
+
+
+def test_build_thumbnails(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    write_image(images / "red.png", "red")
+    write_image(images / "blue.png", "blue")
+    data_file = write_inventory(tmp_path / "preload.json", ["red.png", "blue.png", "red.png", "missing.png", ""])
+    output = tmp_path / "thumbnails"
+    output.mkdir()
+    (output / "stale.webp").write_bytes(b"old")
+
+    manifest = builder.build_thumbnails(str(images), str(output), data_file)
+
+    assert sorted(manifest) == ["blue.png", "red.png"]
+    assert manifest["red.png"] != manifest["blue.png"]
+    assert all(name.endswith(".webp") for name in manifest.values())
+    assert sorted(os.listdir(output)) == sorted([builder.MANIFEST_FILE, *manifest.values()])
+    with open(output / builder.MANIFEST_FILE) as f:
+        assert json.load(f) == manifest
+
+    # Content addressed, so a rebuild keeps the same file names
+    assert builder.build_thumbnails(str(images), str(output), data_file) == manifest
+
+
+def test_empty_image_dir_clears_thumbnails(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    (images / ".gitignore").write_text("*\n")
+    output = tmp_path / "thumbnails"
+    output.mkdir()
+    (output / "old.webp").write_bytes(b"old")
+    (output / builder.MANIFEST_FILE).write_text("{}")
+    data_file = write_inventory(tmp_path / "preload.json", ["old.png"])
+
+    assert builder.build_thumbnails_if_available(str(images), str(output), data_file) is None
+    assert os.listdir(output) == []
+
+    assert builder.build_thumbnails_if_available(str(tmp_path / "missing"), str(output), data_file) is None
+
+
+def test_thumbnail_urls(thumbnail_dir):
+    cache = ThumbnailCache(thumbnail_dir, url_path="/app/static/thumbnails/")
+
+    assert cache.get("a.png") == "/app/static/thumbnails/a.webp"
+    assert cache.get("gone.png") is None
+    assert cache.get("unknown.png") is None
+    assert cache.get(None) is None
+    assert cache.get("") is None
+
+
+def test_missing_manifest(tmp_path):
+    assert ThumbnailCache(str(tmp_path)).get("a.png") is None
+
+
+def test_thumbnail_cache_evicts_least_recently_used(thumbnail_dir):
+    cache = ThumbnailCache(thumbnail_dir, max_entries=2)
+
+    cache.get("a.png")
+    cache.get("b.png")
+    cache.get("a.png")
+    cache.get("c.png")
+
+    assert list(cache._entries) == ["a.png", "c.png"]
+
+    # Cached URLs are served without touching the file system again
+    os.remove(os.path.join(thumbnail_dir, "a.webp"))
+    os.remove(os.path.join(thumbnail_dir, "b.webp"))
+    assert cache.get("a.png") == "/app/static/thumbnails/a.webp"
+    assert cache.get("b.png") is None
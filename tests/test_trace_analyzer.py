@@ -0,0 +1,148 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+import json
+
+import pytest
+
+from trace_analyzer import RESPONSE_STREAM_KEY, TraceAggregator, build_waterfall, percentile
+
+
+def model_output(trace_id, elapsed_ms, key="orchestrationTrace", total_time_ms=None, usage=None):
+    metadata = {}
+    if total_time_ms is not None:
+        metadata["totalTimeMs"] = total_time_ms
+    if usage:
+        metadata["usage"] = usage
+    return {key: {"modelInvocationOutput": {"traceId": trace_id, "metadata": metadata}}, "elapsedMs": elapsed_ms}
+
+
+def invocation(trace_id, elapsed_ms, **invocation_input):
+    return {"orchestrationTrace": {"invocationInput": {"traceId": trace_id, **invocation_input}}, "elapsedMs": elapsed_ms}
+
+
+def observation(trace_id, elapsed_ms, observation_type):
+    return {"orchestrationTrace": {"observation": {"traceId": trace_id, "type": observation_type}}, "elapsedMs": elapsed_ms}
+
+
+TRACE = [
+    model_output("pre", 100.0, key="preProcessingTrace", usage={"inputTokens": 50, "outputTokens": 5}),
+    invocation("t1", 150.0, actionGroupInvocationInput={"actionGroupName": "parts", "verb": "post",
+                                                        "apiPath": "/get_compatible_parts"}),
+    model_output("t1", 300.0, total_time_ms=120.0),
+    observation("t1", 450.0, "ACTION_GROUP"),
+    invocation("t2", 460.0, knowledgeBaseLookupInput={"knowledgeBaseId": "KB123", "text": "wipers"}),
+    observation("t2", 700.0, "KNOWLEDGE_BASE"),
+    model_output("t3", 900.0, usage={"inputTokens": 1200, "outputTokens": 80}),
+    observation("t3", 905.0, "FINISH"),
+    {RESPONSE_STREAM_KEY: {"chunks": 4}, "elapsedMs": 1250.0},
+]
+
+
+def test_waterfall_steps():
+    steps = build_waterfall(TRACE)
+
+    assert [(step["step"], step["name"]) for step in steps] == [
+        ("preprocessing", "model invocation"),
+        ("orchestration", "model invocation"),
+        ("action_group", "parts POST /get_compatible_parts"),
+        ("knowledge_base", "KB123"),
+        ("generation", "final response"),
+        ("streaming", "response stream"),
+    ]
+    assert steps[0]["inputTokens"] == 50 and steps[0]["outputTokens"] == 5
+    assert steps[1]["inputTokens"] is None
+    assert steps[4]["inputTokens"] == 1200 and steps[4]["outputTokens"] == 80
+    assert steps[5]["chunks"] == 4
+
+
+def test_waterfall_steps_tile_the_turn():
+    steps = build_waterfall(TRACE)
+
+    # Without a reported duration a step starts where the previous one ended
+    assert [(step["startMs"], step["durationMs"]) for step in steps] == [
+        (0.0, 100.0), (180.0, 120.0), (300.0, 150.0), (450.0, 250.0), (700.0, 200.0), (900.0, 350.0),
+    ]
+    assert steps[-1]["startMs"] + steps[-1]["durationMs"] == 1250.0
+
+
+def test_reported_model_time_is_used():
+    step = build_waterfall([model_output("t1", 500.0, total_time_ms=200.0)])[0]
+
+    assert (step["startMs"], step["durationMs"]) == (300.0, 200.0)
+
+
+def test_entries_without_elapsed_time_are_ignored():
+    trace = [{key: value for key, value in entry.items() if key != "elapsedMs"} for entry in TRACE[:3]] + TRACE[3:4]
+
+    steps = build_waterfall(trace)
+
+    assert [(step["step"], step["startMs"], step["durationMs"]) for step in steps] == [("action_group", 0.0, 450.0)]
+    assert build_waterfall({}) == []
+    assert build_waterfall([]) == []
+
+
+def test_chunks_before_the_last_trace_add_no_step():
+    trace = [model_output("t1", 300.0), {RESPONSE_STREAM_KEY: {"chunks": 1}, "elapsedMs": 250.0}]
+
+    assert [step["step"] for step in build_waterfall(trace)] == ["orchestration"]
+
+
+@pytest.mark.parametrize("q, expected", [(0, 1.0), (50, 5.0), (95, 10.0), (100, 10.0)])
+def test_percentile(q, expected):
+    assert percentile([float(value) for value in range(10, 0, -1)], q) == expected
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 50) == 0.0
+
+
+def test_aggregator_percentiles(tmp_path):
+    export_path = str(tmp_path / "waterfalls.jsonl")
+    aggregator = TraceAggregator(max_samples=100, export_path=export_path)
+
+    for turn in range(20):
+        aggregator.add(f"session-{turn % 2}", [
+            {"step": "orchestration", "startMs": 0.0, "durationMs": float(turn + 1)},
+            {"step": "streaming", "startMs": float(turn + 1), "durationMs": 100.0},
+        ])
+    aggregator.add("session-0", [])
+
+    assert aggregator.percentiles() == [
+        {"step": "orchestration", "count": 20, "p50Ms": 10.0, "p95Ms": 19.0},
+        {"step": "streaming", "count": 20, "p50Ms": 100.0, "p95Ms": 100.0},
+        {"step": "turn", "count": 20, "p50Ms": 110.0, "p95Ms": 119.0},
+    ]
+    with open(export_path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 20
+    assert records[0]["sessionId"] == "session-0" and len(records[0]["steps"]) == 2
+
+
+def test_aggregator_keeps_recent_samples():
+    aggregator = TraceAggregator(max_samples=3, export_path=None)
+
+    for duration in (1000.0, 1.0, 2.0, 3.0):
+        aggregator.add("session", [{"step": "orchestration", "startMs": 0.0, "durationMs": duration}])
+
+    assert aggregator.percentiles()[0] == {"step": "orchestration", "count": 3, "p50Ms": 2.0, "p95Ms": 3.0}
+
+
+def test_turn_ends_with_the_last_chunk(chatbot):
+    response = {"completion": [
+        {"trace": {"trace": {"orchestrationTrace": {"modelInvocationInput": {"text": "prompt"},
+                                                    "observation": {"traceId": "t1", "type": "FINISH"}}}}},
+        {"chunk": {"bytes": b"Wiper blades "}},
+        {"chunk": {"bytes": b"are 26 in."}},
+    ]}
+
+    events = list(chatbot.iter_completion(response))
+
+    assert [kind for kind, _ in events] == ["trace", "chunk", "chunk", "trace"]
+    assert "modelInvocationInput" not in events[0][1]["orchestrationTrace"]
+    assert events[-1][1][RESPONSE_STREAM_KEY] == {"chunks": 2}
+    assert events[-1][1]["elapsedMs"] >= events[0][1]["elapsedMs"]
+
+
+def test_no_stream_entry_without_chunks(chatbot):
+    assert list(chatbot.iter_completion({"completion": []})) == []